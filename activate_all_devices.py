@@ -4,13 +4,18 @@ Activate All ThingsBoard Devices
 Generates and sends data to all devices including demo sources
 """
 
-import requests
+import os
+import sys
 import json
 import time
-import random
 from datetime import datetime, timezone
-from influxdb_client import InfluxDBClient, Point
-from influxdb_client.client.write_api import SYNCHRONOUS
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts'))
+from influx_writer import get_writer
+import http_client
+from synthetic_data import generate_sensor_value
+import instrumentation
+import thingsboard_gateway
 
 # Configuration
 INFLUXDB_URL = "http://localhost:8086"
@@ -19,11 +24,17 @@ INFLUXDB_ORG = "mikroklima"
 INFLUXDB_BUCKET = "mikroklima_data"
 FROST_URL = "http://localhost:8091/FROST-Server/v1.1"
 TB_URL = "http://localhost:8080"
+TB_MQTT_HOST = "localhost"
+TB_MQTT_PORT = 1883
 
 # Load ThingsBoard credentials
 with open('config/thingsboard_credentials.json', 'r') as f:
     TB_DEVICE_TOKENS = json.load(f)
 
+# Gateway mode: all devices in one MQTT message instead of one HTTP POST each
+TB_GATEWAY_TOKEN = TB_DEVICE_TOKENS.get(thingsboard_gateway.TB_GATEWAY_DEVICE)
+TB_USE_GATEWAY = thingsboard_gateway.HAS_PAHO and bool(TB_GATEWAY_TOKEN)
+
 # Device configurations with simulated data
 DEVICES = {
     'DWD_01975': {
@@ -58,45 +69,6 @@ DEVICES = {
     }
 }
 
-def generate_sensor_value(sensor_type, location_name):
-    """Generate realistic sensor values based on type and location"""
-
-    # Base temperatures by location
-    temp_base = {
-        'Hamburg': 5,
-        'Osnabrück': 6,
-        'Tunisia': 18,
-        'Alexandria': 20,
-        'Hurghada': 25
-    }
-
-    base_temp = 15  # default
-    for loc in temp_base:
-        if loc.lower() in location_name.lower():
-            base_temp = temp_base[loc]
-            break
-
-    if sensor_type == 'Temperature':
-        return round(base_temp + random.uniform(-3, 3), 2)
-    elif sensor_type == 'Humidity':
-        return round(random.uniform(40, 80), 2)
-    elif sensor_type == 'Pressure':
-        return round(random.uniform(1010, 1025), 2)
-    elif sensor_type == 'Wind Speed':
-        return round(random.uniform(2, 15), 2)
-    elif sensor_type == 'PM10':
-        return round(random.uniform(10, 30), 2)
-    elif sensor_type == 'PM2.5':
-        return round(random.uniform(5, 15), 2)
-    elif sensor_type == 'NO2':
-        return round(random.uniform(15, 45), 2)
-    elif sensor_type == 'O3':
-        return round(random.uniform(30, 70), 2)
-    elif sensor_type == 'Soil Moisture':
-        return round(random.uniform(20, 60), 2)
-    else:
-        return round(random.uniform(10, 30), 2)
-
 def send_to_thingsboard(device_key, telemetry):
     """Send data to ThingsBoard"""
     if device_key not in TB_DEVICE_TOKENS:
@@ -107,8 +79,9 @@ def send_to_thingsboard(device_key, telemetry):
     url = f"{TB_URL}/api/v1/{access_token}/telemetry"
 
     try:
-        response = requests.post(url, json=telemetry, timeout=5)
+        response = http_client.post(url, json=telemetry, timeout=5)
         response.raise_for_status()
+        instrumentation.record_points('Thingsboard', len(telemetry))
         return True
     except Exception as e:
         print(f"  ✗ ThingsBoard error: {e}")
@@ -117,20 +90,20 @@ def send_to_thingsboard(device_key, telemetry):
 def send_to_influxdb(source, location, measurements):
     """Send data to InfluxDB"""
     try:
-        client = InfluxDBClient(url=INFLUXDB_URL, token=INFLUXDB_TOKEN, org=INFLUXDB_ORG)
-        write_api = client.write_api(write_options=SYNCHRONOUS)
+        writer = get_writer(url=INFLUXDB_URL, token=INFLUXDB_TOKEN, org=INFLUXDB_ORG, bucket=INFLUXDB_BUCKET)
 
         for measurement in measurements:
-            point = Point("microclimate") \
-                .tag("source", source) \
-                .tag("sensor_type", measurement['type']) \
-                .tag("location", f"{location['lat']},{location['lon']}") \
-                .field("value", measurement['value']) \
-                .time(datetime.now(timezone.utc))
-
-            write_api.write(bucket=INFLUXDB_BUCKET, record=point)
+            writer.write(
+                "microclimate",
+                tags={
+                    "source": source,
+                    "sensor_type": measurement['type'],
+                    "location": f"{location['lat']},{location['lon']}",
+                },
+                fields={"value": float(measurement['value'])},
+                timestamp=datetime.now(timezone.utc)
+            )
 
-        client.close()
         return True
     except Exception as e:
         print(f"  ✗ InfluxDB error: {e}")
@@ -148,13 +121,13 @@ def send_to_frost(source, location, measurements):
         }
 
         # Try to create or get Thing
-        response = requests.post(f"{FROST_URL}/Things", json=thing_data, timeout=5)
+        response = http_client.post(f"{FROST_URL}/Things", json=thing_data, timeout=5)
 
         if response.status_code == 201:
             thing_id = response.json()['@iot.id']
         else:
             # Thing might exist, try to get it
-            search_response = requests.get(
+            search_response = http_client.get(
                 f"{FROST_URL}/Things?$filter=name eq '{thing_name}'",
                 timeout=5
             )
@@ -177,7 +150,7 @@ def send_to_frost(source, location, measurements):
                 "coordinates": [location['lon'], location['lat']]
             }
         }
-        requests.post(f"{FROST_URL}/Things({thing_id})/Locations", json=location_data, timeout=5)
+        http_client.post(f"{FROST_URL}/Things({thing_id})/Locations", json=location_data, timeout=5)
 
         return True
     except Exception as e:
@@ -190,6 +163,9 @@ def main():
     print("=" * 70)
     print()
 
+    instrumentation.instrument_requests()
+    gateway_telemetry = {}
+
     for device_key, config in DEVICES.items():
         print(f"📡 {config['name']}")
         print(f"  Location: {config['location']['lat']:.4f}°N, {config['location']['lon']:.4f}°E")
@@ -209,8 +185,13 @@ def main():
 
         print(f"\n  Pushing to platforms:")
 
-        # Send to ThingsBoard
-        if send_to_thingsboard(device_key, telemetry):
+        # Send to ThingsBoard (gateway mode: collected and published once below)
+        if TB_USE_GATEWAY:
+            gateway_telemetry[device_key] = [
+                thingsboard_gateway.telemetry_record(datetime.now(timezone.utc), telemetry)
+            ]
+            print(f"    ✓ ThingsBoard (queued for gateway)")
+        elif send_to_thingsboard(device_key, telemetry):
             print(f"    ✓ ThingsBoard")
 
         # Send to InfluxDB
@@ -224,6 +205,20 @@ def main():
         print()
         time.sleep(1)
 
+    if gateway_telemetry:
+        publisher = thingsboard_gateway.get_publisher(TB_GATEWAY_TOKEN, host=TB_MQTT_HOST, port=TB_MQTT_PORT)
+        ok = publisher.send(gateway_telemetry)
+        print(f"ThingsBoard gateway: {len(gateway_telemetry)} devices in "
+              f"{publisher.stats['messages']} MQTT message(s) {'✓' if ok else '✗'}")
+        publisher.close()
+
+    writer = get_writer(url=INFLUXDB_URL, token=INFLUXDB_TOKEN, org=INFLUXDB_ORG, bucket=INFLUXDB_BUCKET)
+    instrumentation.write_self_metrics(writer, job='activate_all_devices')
+    writer.close()
+    print(f"InfluxDB: {writer.stats['points_flushed']} points flushed, {writer.stats['points_failed']} failed")
+    instrumentation.print_summary()
+    print()
+
     print("=" * 70)
     print("✓ All devices activated!")
     print("=" * 70)
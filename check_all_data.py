@@ -1,150 +1,259 @@
 #!/usr/bin/env python3
 """
 Quick check of data in all platforms
+
+- ThingsBoard: all devices (paged), latest telemetry fetched concurrently
+- InfluxDB:    one grouped Flux query (points + last write per source)
+- FROST:       one paged Datastreams query with the latest Observation
+               ($expand, $top=1) instead of counting all Observations
 """
 
+import csv
+import io
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
 import requests
-import json
-
-print("=" * 80)
-print("DATA STATUS CHECK - ALL PLATFORMS")
-print("=" * 80)
-print()
-
-# 1. THINGSBOARD
-print("🔷 THINGSBOARD DEVICES")
-print("-" * 80)
-try:
-    # Login
-    login_response = requests.post(
-        "http://localhost:8080/api/auth/login",
-        json={"username": "tenant@thingsboard.org", "password": "tenant"},
-        timeout=5
-    )
-    token = login_response.json()['token']
 
-    # Get devices
-    devices_response = requests.get(
-        "http://localhost:8080/api/tenant/devices?pageSize=20",
-        headers={"X-Authorization": f"Bearer {token}"},
-        timeout=5
-    )
-    devices = devices_response.json()['data']
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts'))
+from thingsboard_setup import make_session, fetch_existing_devices
+import http_client
 
-    print(f"{'Device Name':<45} {'Label':<35} {'Status'}")
-    print("-" * 80)
-    for device in devices:
-        name = device['name']
-        label = device.get('label', 'N/A')
-
-        # Get telemetry to check if active
-        device_id = device['id']['id']
-        telemetry_response = requests.get(
-            f"http://localhost:8080/api/plugins/telemetry/DEVICE/{device_id}/values/timeseries?keys=temperature",
-            headers={"X-Authorization": f"Bearer {token}"},
-            timeout=5
-        )
+TB_URL = "http://localhost:8080"
+TB_USERNAME = "tenant@thingsboard.org"
+TB_PASSWORD = "tenant"
 
-        has_data = len(telemetry_response.json()) > 0
-        status = "✅ ACTIVE" if has_data else "⚠️  INACTIVE"
-        print(f"{name:<45} {label:<35} {status}")
+INFLUXDB_URL = "http://localhost:8086"
+INFLUXDB_TOKEN = "mikroklima-super-secret-token"
+INFLUXDB_ORG = "mikroklima"
+INFLUXDB_BUCKET = "mikroklima_data"
 
-    print(f"\n Total Devices: {len(devices)}")
-except Exception as e:
-    print(f"❌ Error: {e}")
+FROST_URL = "http://localhost:8091/FROST-Server/v1.1"
 
-print("\n")
+TB_WORKERS = 32          # concurrent latest-telemetry requests
+ACTIVE_WINDOW = 24 * 3600  # seconds; older latest values count as stale
+FROST_PAGE_SIZE = 1000
+TIMEOUT = 10
 
-# 2. INFLUXDB
-print("🔶 INFLUXDB DATA")
-print("-" * 80)
-try:
-    from influxdb_client import InfluxDBClient
+# Grouped per source in one query; unit/string fields and self-metrics are not counted
+INFLUX_STATUS_QUERY = f'''
+data = from(bucket: "{INFLUXDB_BUCKET}")
+    |> range(start: -24h)
+    |> filter(fn: (r) => r._field == "value" and r._measurement != "mikroklima_self")
+    |> group(columns: ["source"])
+data |> count() |> yield(name: "count")
+data |> last() |> keep(columns: ["source", "_time"]) |> yield(name: "last")
+'''
 
-    client = InfluxDBClient(
-        url="http://localhost:8086",
-        token="mikroklima-super-secret-token",
-        org="mikroklima"
-    )
 
-    query_api = client.query_api()
+def format_age(seconds):
+    if seconds is None:
+        return "-"
+    if seconds < 3600:
+        return f"{seconds / 60:.0f} min ago"
+    if seconds < 86400:
+        return f"{seconds / 3600:.1f} h ago"
+    return f"{seconds / 86400:.1f} d ago"
+
 
-    # Count measurements by source
-    query = '''
-    from(bucket: "mikroklima_data")
-        |> range(start: -24h)
-        |> group(columns: ["source"])
-        |> count()
-        |> group()
-    '''
+def parse_time(value):
+    """ISO 8601 (also FROST intervals 'start/end') -> aware datetime"""
+    if not value:
+        return None
+    value = value.split('/')[-1].replace('Z', '+00:00')
+    # Flux returns nanosecond fractions, fromisoformat takes at most microseconds
+    if '.' in value:
+        head, rest = value.split('.', 1)
+        n_digits = len(rest) - len(rest.lstrip('0123456789'))
+        value = f"{head}.{rest[:min(n_digits, 6)]}{rest[n_digits:]}"
+    return datetime.fromisoformat(value)
 
-    result = query_api.query(query)
 
-    print(f"{'Source':<45} {'Measurements (24h)'}")
+# ============================================================================
+# THINGSBOARD
+# ============================================================================
+
+def tb_latest_ts(session, device_id):
+    """Newest telemetry timestamp (epoch ms) over all keys of a device, None if none"""
+    response = session.get(f"{TB_URL}/api/plugins/telemetry/DEVICE/{device_id}/values/timeseries",
+                           timeout=TIMEOUT)
+    response.raise_for_status()
+    latest = [entry["ts"] for values in response.json().values() for entry in values]
+    return max(latest) if latest else None
+
+
+def check_thingsboard():
+    print("🔷 THINGSBOARD DEVICES")
     print("-" * 80)
+    try:
+        login_response = http_client.post(
+            f"{TB_URL}/api/auth/login",
+            json={"username": TB_USERNAME, "password": TB_PASSWORD},
+            timeout=TIMEOUT
+        )
+        login_response.raise_for_status()
+        session = make_session(login_response.json()['token'], TB_WORKERS)
+
+        devices = sorted(fetch_existing_devices(session, TB_URL).values(), key=lambda d: d['name'])
+
+        def latest(device):
+            try:
+                return tb_latest_ts(session, device['id']['id'])
+            except requests.exceptions.RequestException:
+                return "error"
+
+        with ThreadPoolExecutor(max_workers=TB_WORKERS) as executor:
+            latest_ts = list(executor.map(latest, devices))
 
-    sources = {}
-    for table in result:
-        for record in table.records:
-            source = record.values.get('source', 'Unknown')
-            count = record.values.get('_value', 0)
-            if source in sources:
-                sources[source] += count
+        now = time.time()
+        counts = {"active": 0, "stale": 0, "inactive": 0, "error": 0}
+        print(f"{'Device Name':<45} {'Label':<20} {'Status'}")
+        print("-" * 80)
+        for device, ts in zip(devices, latest_ts):
+            if ts == "error":
+                status, key = "❌ ERROR", "error"
+            elif ts is None:
+                status, key = "⚠️  INACTIVE", "inactive"
+            elif now - ts / 1000 <= ACTIVE_WINDOW:
+                status, key = f"✅ ACTIVE ({format_age(now - ts / 1000)})", "active"
             else:
-                sources[source] = count
+                status, key = f"⏸  STALE ({format_age(now - ts / 1000)})", "stale"
+            counts[key] += 1
+            label = (device.get('label') or 'N/A')[:20]
+            print(f"{device['name'][:45]:<45} {label:<20} {status}")
 
-    for source, count in sorted(sources.items()):
-        print(f"{source:<45} {count:>10}")
+        print(f"\n Total Devices: {len(devices)} ({counts['active']} active, {counts['stale']} stale, "
+              f"{counts['inactive']} inactive, {counts['error']} errors)")
+        session.close()
+    except Exception as e:
+        print(f"❌ Error: {e}")
 
-    print(f"\n Total Sources: {len(sources)}")
-    client.close()
-except Exception as e:
-    print(f"❌ Error: {e}")
 
-print("\n")
+# ============================================================================
+# INFLUXDB
+# ============================================================================
 
-# 3. FROST SERVER
-print("🔵 FROST SERVER THINGS")
-print("-" * 80)
-try:
-    response = requests.get(
-        "http://localhost:8091/FROST-Server/v1.1/Things?$select=name,description&$count=true",
-        timeout=5
+def influx_query(query):
+    """Run a Flux query over the HTTP API; returns the rows of all result sections as dicts"""
+    response = http_client.post(
+        f"{INFLUXDB_URL}/api/v2/query",
+        params={"org": INFLUXDB_ORG},
+        headers={"Authorization": f"Token {INFLUXDB_TOKEN}", "Accept": "application/csv"},
+        json={"query": query, "type": "flux", "dialect": {"header": True, "annotations": []}},
+        timeout=TIMEOUT
     )
-    data = response.json()
+    response.raise_for_status()
+    # Each yield/schema starts a new CSV section (separated by an empty line)
+    rows = []
+    for section in response.text.replace('\r\n', '\n').split('\n\n'):
+        if section.strip():
+            rows.extend(csv.DictReader(io.StringIO(section)))
+    return rows
 
-    things = data.get('value', [])
-    total_count = data.get('@iot.count', 0)
 
-    print(f"{'Thing Name':<45} {'Description'}")
+def check_influxdb():
+    print("🔶 INFLUXDB DATA")
     print("-" * 80)
-    for thing in things[:10]:  # Show first 10
-        name = thing.get('name', 'N/A')
-        desc = thing.get('description', 'N/A')[:33]
-        print(f"{name:<45} {desc}")
+    try:
+        sources = {}
+        for row in influx_query(INFLUX_STATUS_QUERY):
+            entry = sources.setdefault(row.get('source') or 'Unknown', {"count": 0, "last": None})
+            if row.get('result') == 'count':
+                entry["count"] += int(row['_value'])
+            elif row.get('result') == 'last':
+                entry["last"] = parse_time(row['_time'])
 
-    if total_count > 10:
-        print(f"... and {total_count - 10} more")
+        now = datetime.now(timezone.utc)
+        print(f"{'Source':<45} {'Measurements (24h)':>18}  {'Last write'}")
+        print("-" * 80)
+        for source, entry in sorted(sources.items()):
+            age = (now - entry["last"]).total_seconds() if entry["last"] else None
+            print(f"{source:<45} {entry['count']:>18}  {format_age(age)}")
 
-    print(f"\n Total Things: {total_count}")
+        print(f"\n Total Sources: {len(sources)}")
+    except Exception as e:
+        print(f"❌ Error: {e}")
 
-    # Get observation count
-    obs_response = requests.get(
-        "http://localhost:8091/FROST-Server/v1.1/Observations?$count=true&$top=0",
-        timeout=5
-    )
-    obs_count = obs_response.json().get('@iot.count', 0)
-    print(f" Total Observations: {obs_count}")
-
-except Exception as e:
-    print(f"❌ Error: {e}")
-
-print("\n")
-print("=" * 80)
-print("✅ Check complete!")
-print("=" * 80)
-print("\n💡 To view data:")
-print("  - ThingsBoard Dashboard: http://localhost:8080")
-print("  - InfluxDB Data Explorer: http://localhost:8086")
-print("  - FROST Server API: http://localhost:8091/FROST-Server/v1.1")
-print("\n📖 See VIEW_DATA_GUIDE.md for detailed instructions")
+
+# ============================================================================
+# FROST SERVER
+# ============================================================================
+
+def frost_datastreams_latest():
+    """All Datastreams with Thing name and the phenomenonTime of their newest Observation"""
+    url = f"{FROST_URL}/Datastreams"
+    params = {
+        "$select": "id,name",
+        "$expand": "Thing($select=name),"
+                   "Observations($select=phenomenonTime;$orderby=phenomenonTime desc;$top=1)",
+        "$top": FROST_PAGE_SIZE,
+    }
+    datastreams = []
+    while url:
+        response = http_client.get(url, params=params, timeout=TIMEOUT)
+        response.raise_for_status()
+        data = response.json()
+        datastreams.extend(data.get('value', []))
+        url, params = data.get('@iot.nextLink'), None
+    return datastreams
+
+
+def check_frost():
+    print("🔵 FROST SERVER THINGS")
+    print("-" * 80)
+    try:
+        things = {}
+        for ds in frost_datastreams_latest():
+            thing = ds.get('Thing', {}).get('name', 'N/A')
+            observations = ds.get('Observations', [])
+            latest = parse_time(observations[0]['phenomenonTime']) if observations else None
+            entry = things.setdefault(thing, {"datastreams": 0, "with_data": 0, "latest": None})
+            entry["datastreams"] += 1
+            if latest:
+                entry["with_data"] += 1
+                entry["latest"] = max(entry["latest"], latest) if entry["latest"] else latest
+
+        now = datetime.now(timezone.utc)
+        print(f"{'Thing Name':<45} {'Datastreams':>11}  {'Latest observation'}")
+        print("-" * 80)
+        for name, entry in sorted(things.items()):
+            age = (now - entry["latest"]).total_seconds() if entry["latest"] else None
+            print(f"{name[:45]:<45} {entry['with_data']:>5}/{entry['datastreams']:<5}  {format_age(age)}")
+
+        print(f"\n Total Things with Datastreams: {len(things)}")
+        print(f" Total Datastreams: {sum(e['datastreams'] for e in things.values())} "
+              f"({sum(e['with_data'] for e in things.values())} with observations)")
+    except Exception as e:
+        print(f"❌ Error: {e}")
+
+
+def main():
+    print("=" * 80)
+    print("DATA STATUS CHECK - ALL PLATFORMS")
+    print("=" * 80)
+    print()
+
+    # The three platforms are independent; each check prints its own block
+    start = time.perf_counter()
+    check_thingsboard()
+    print("\n")
+    check_influxdb()
+    print("\n")
+    check_frost()
+
+    print("\n")
+    print("=" * 80)
+    print(f"✅ Check complete! ({time.perf_counter() - start:.1f}s)")
+    print("=" * 80)
+    print("\n💡 To view data:")
+    print("  - ThingsBoard Dashboard: http://localhost:8080")
+    print("  - InfluxDB Data Explorer: http://localhost:8086")
+    print("  - FROST Server API: http://localhost:8091/FROST-Server/v1.1")
+    print("\n📖 See VIEW_DATA_GUIDE.md for detailed instructions")
+
+
+if __name__ == "__main__":
+    main()
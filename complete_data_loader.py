@@ -1,16 +1,31 @@
 #!/usr/bin/env python3
 """
 Mikroklima Hamburg - Complete Data Integration System (FIXED VERSION)
-REAL DATA: OpenSenseMap, Mobilithek Dormagen, Open-Meteo Egypt
+REAL DATA: source plugins from config/sources.json
+(OpenSenseMap, sensor.community, Open-Meteo, DWD, Hamburg HaLm)
 All data pushed to: FROST Server, InfluxDB, Thingsboard
 """
 
-import requests
+import argparse
+import os
+import signal
+import sys
 import json
+import math
 import time
 from datetime import datetime, timezone
-from influxdb_client import InfluxDBClient, Point
-from influxdb_client.client.write_api import SYNCHRONOUS
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts'))
+from influx_writer import get_writer, series_key, format_fields
+from measurement import MeasurementBatch
+from source_plugins import load_sources
+import http_client
+from cycle_engine import run_cycle, print_timings
+from scheduler import Scheduler
+from online_metrics import LiveComparison
+from plausibility import PlausibilityFilter, MODES as FILTER_MODES
+import instrumentation
+import thingsboard_gateway
 
 # CONFIGURATION
 
@@ -26,27 +41,32 @@ FROST_URL = "http://localhost:8091/FROST-Server/v1.1"
 # Thingsboard Configuration
 TB_URL = "http://localhost:8080"
 TB_CREDENTIALS_FILE = "config/thingsboard_credentials.json"
+TB_MQTT_HOST = "localhost"
+TB_MQTT_PORT = 1883
 
-# Data Source Configuration - REAL APIs
-OPENSENSEMAP_BOX_IDS = [
-    "67937b67c326f20007ef99ca",  # Hamburg Iserbrook-Ost (WORKING!)
-    "5eba5fbad46fb8001c799786",
-    "57000b8745fd40c8196ad04c",
-]
-
-# Mobilithek Dormagen - sensor.community
-MOBILITHEK_DORMAGEN = {
-    "latitude": 51.0946,
-    "longitude": 6.8407,
-    "radius": 5  # km
-}
+# Data sources: plugins from config/sources.json (type, options, interval, timeout, tb_device)
+SOURCES_CONFIG = "config/sources.json"
 
-# Open-Meteo Egypt Configuration (Cairo coordinates)
-OPEN_METEO_EGYPT = {
-    "latitude": 30.0444,
-    "longitude": 31.2357,
-    "location": "Cairo, Egypt"
-}
+# Concurrency: bounded worker pool, push timeout (seconds); fetch timeouts are set per source
+MAX_WORKERS = 6
+PUSH_TIMEOUT = 30
+
+# Daemon mode: random jitter on each source's polling interval (fraction of interval)
+SCHEDULE_JITTER = 0.05
+
+# Daemon mode: live comparison of hourly means per station pair (source names)
+COMPARISON_PAIRS = [('OpenSenseMap', 'Mobilithek Dormagen')]
+COMPARISON_SENSOR_TYPE = 'Temperature'
+COMPARISON_REPORT_INTERVAL = 3600
+
+# Self-monitoring: HTTP/write metrics as Prometheus endpoint (--metrics-port)
+# and/or as points in their own InfluxDB measurement
+SELF_METRICS_MEASUREMENT = "mikroklima_self"
+SELF_METRICS_INTERVAL = 300
+
+# Plausibility filter between fetch and push: 'drop', 'tag' or 'off'
+FILTER_MODE = 'drop'
+plausibility_filter = None
 
 # Load Thingsboard credentials and prevents the program from crashing.
 try:
@@ -56,288 +76,56 @@ except FileNotFoundError:
     print(f"⚠ Warning: {TB_CREDENTIALS_FILE} not found.")
     TB_DEVICE_TOKENS = {}
 
+# Gateway mode (MQTT, one connection for all devices) if paho-mqtt and a gateway token are available
+TB_GATEWAY_TOKEN = TB_DEVICE_TOKENS.get(thingsboard_gateway.TB_GATEWAY_DEVICE)
+TB_USE_GATEWAY = thingsboard_gateway.HAS_PAHO and bool(TB_GATEWAY_TOKEN)
 
 
 # ============================================================================
-# REAL DATA FETCHERS
+# DATA PUSHERS - PLATFORM A/B/C
 # ============================================================================
 
-def fetch_opensensemap_data():
-    """REAL DATA: Fetch from OpenSenseMap API"""
-    print("OPENSENSEMAP [REAL DATA]")
-    
-    for box_id in OPENSENSEMAP_BOX_IDS:
-        try:
-            url = f"https://api.opensensemap.org/boxes/{box_id}"
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            
-            box_data = response.json()
-            measurements = []
-            
-            box_name = box_data.get('name', 'Unknown')
-            location = box_data.get('currentLocation', {})
-            lat = location.get('coordinates', [0, 0])[1] if location else 0
-            lon = location.get('coordinates', [0, 0])[0] if location else 0
-            
-            print(f"  Box: {box_name}")
-            print(f"  Location: {lat:.4f}°N, {lon:.4f}°E")
-            
-            if 'sensors' in box_data:
-                for sensor in box_data['sensors']:
-                    if 'lastMeasurement' in sensor and sensor['lastMeasurement']:
-                        try:
-                            sensor_title = sensor.get('title', '').lower()
-                            last_measurement = sensor['lastMeasurement']
-                            value = float(last_measurement['value'])
-                            timestamp = last_measurement['createdAt']
-                            unit = sensor.get('unit', '')
-                            
-                            # Determine sensor type
-                            if 'temp' in sensor_title or 'temperatur' in sensor_title:
-                                sensor_type = 'Temperature'
-                            elif 'feuchte' in sensor_title or 'humidity' in sensor_title:
-                                sensor_type = 'Humidity'
-                            elif 'druck' in sensor_title or 'pressure' in sensor_title:
-                                sensor_type = 'Pressure'
-                            elif 'pm10' in sensor_title:
-                                sensor_type = 'PM10'
-                            elif 'pm2.5' in sensor_title or 'pm25' in sensor_title:
-                                sensor_type = 'PM2.5'
-                            else:
-                                sensor_type = sensor.get('title', 'Unknown')
-                            
-                            measurements.append({
-                                'source': 'OpenSenseMap',
-                                'location': box_name,
-                                'lat': lat,
-                                'lon': lon,
-                                'sensor_type': sensor_type,
-                                'value': value,
-                                'unit': unit,
-                                'timestamp': timestamp,
-                                'data_type': 'REAL'
-                            })
-                            
-                        except (ValueError, KeyError) as e:
-                            continue
-            
-            if measurements:
-                print(f"Fetched {len(measurements)} measurements")
-                for m in measurements:
-                    print(f"    - {m['sensor_type']}: {m['value']} {m['unit']}")
-                return measurements
-                
-        except Exception as e:
-            print(f"Box {box_id[:8]}... error: {e}")
-            continue
-    
-    print(" All boxes failed")
-    return []
-
-
-def fetch_mobilithek_dormagen_data():
-    """REAL DATA: Fetch from Mobilithek Dormagen (sensor.community)"""
-    print("\n MOBILITHEK DORMAGEN [REAL DATA]")
-    
-    try:
-        # sensor.community API - get sensors in Dormagen area
-        lat = MOBILITHEK_DORMAGEN['latitude']
-        lon = MOBILITHEK_DORMAGEN['longitude']
-        radius = MOBILITHEK_DORMAGEN['radius']
-        
-        url = f"https://data.sensor.community/airrohr/v1/filter/area={lat},{lon},{radius}"
-        
-        print(f"  Searching area: {lat}°N, {lon}°E (radius {radius}km)")
-        
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        
-        measurements = []
-        sensors_found = set()
-        
-        # Process first 10 sensors (to avoid overwhelming)
-        for sensor_data in data[:10]:
-            if 'sensordatavalues' in sensor_data:
-                sensor_id = sensor_data.get('sensor', {}).get('id', 'unknown')
-                location_data = sensor_data.get('location', {})
-                sensor_lat = location_data.get('latitude', lat)
-                sensor_lon = location_data.get('longitude', lon)
-                location_name = f"Dormagen Sensor {sensor_id}"
-                
-                sensors_found.add(sensor_id)
-                
-                for value_data in sensor_data['sensordatavalues']:
-                    try:
-                        value_type = value_data['value_type']
-                        value = float(value_data['value'])
-                        
-                        # Map sensor types
-                        if value_type == 'P1':
-                            sensor_type = 'PM10'
-                            unit = 'µg/m³'
-                        elif value_type == 'P2':
-                            sensor_type = 'PM2.5'
-                            unit = 'µg/m³'
-                        elif value_type == 'temperature':
-                            sensor_type = 'Temperature'
-                            unit = '°C'
-                        elif value_type == 'humidity':
-                            sensor_type = 'Humidity'
-                            unit = '%'
-                        else:
-                            sensor_type = value_type
-                            unit = ''
-                        
-                        measurements.append({
-                            'source': 'Mobilithek Dormagen',
-                            'location': location_name,
-                            'lat': sensor_lat,
-                            'lon': sensor_lon,
-                            'sensor_type': sensor_type,
-                            'value': value,
-                            'unit': unit,
-                            'timestamp': sensor_data.get('timestamp', get_iso_timestamp()),
-                            'data_type': 'REAL'
-                        })
-                    except (ValueError, KeyError):
-                        continue
-        
-        if measurements:
-            print(f"   Found {len(sensors_found)} sensors")
-            print(f"   Fetched {len(measurements)} measurements")
-            
-            # Show sample
-            for m in measurements[:5]:
-                print(f"    - {m['sensor_type']}: {m['value']} {m['unit']}")
-            if len(measurements) > 5:
-                print(f"    ... and {len(measurements)-5} more")
-            
-            return measurements
-        else:
-            print("  ⚠ No data found")
-            return []
-            
-    except Exception as e:
-        print(f"  ✗ Error: {e}")
-        return []
+def get_influx_writer():
+    """Shared buffered InfluxDB writer (one client for the whole process)"""
+    return get_writer(url=INFLUXDB_URL, token=INFLUXDB_TOKEN, org=INFLUXDB_ORG, bucket=INFLUXDB_BUCKET)
 
 
-def fetch_open_meteo_egypt_data():
-    """REAL DATA: Fetch from Open-Meteo Egypt"""
-    print("\n OPEN-METEO EGYPT [REAL DATA]")
-    
-    try:
-        url = "https://api.open-meteo.com/v1/forecast"
-        params = {
-            'latitude': OPEN_METEO_EGYPT['latitude'],
-            'longitude': OPEN_METEO_EGYPT['longitude'],
-            'current': 'temperature_2m,relative_humidity_2m,pressure_msl,wind_speed_10m,wind_direction_10m',
-            'timezone': 'Africa/Cairo'
-        }
-        
-        print(f"  Location: {OPEN_METEO_EGYPT['location']}")
-        
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        
-        current = data.get('current', {})
-        timestamp = current.get('time', get_iso_timestamp())
-        
-        measurements = [
-            {
-                'source': 'Open-Meteo Egypt',
-                'location': OPEN_METEO_EGYPT['location'],
-                'lat': OPEN_METEO_EGYPT['latitude'],
-                'lon': OPEN_METEO_EGYPT['longitude'],
-                'sensor_type': 'Temperature',
-                'value': float(current.get('temperature_2m', 0)),
-                'unit': '°C',
-                'timestamp': timestamp,
-                'data_type': 'REAL'
-            },
-            {
-                'source': 'Open-Meteo Egypt',
-                'location': OPEN_METEO_EGYPT['location'],
-                'lat': OPEN_METEO_EGYPT['latitude'],
-                'lon': OPEN_METEO_EGYPT['longitude'],
-                'sensor_type': 'Humidity',
-                'value': float(current.get('relative_humidity_2m', 0)),
-                'unit': '%',
-                'timestamp': timestamp,
-                'data_type': 'REAL'
-            },
-            {
-                'source': 'Open-Meteo Egypt',
-                'location': OPEN_METEO_EGYPT['location'],
-                'lat': OPEN_METEO_EGYPT['latitude'],
-                'lon': OPEN_METEO_EGYPT['longitude'],
-                'sensor_type': 'Pressure',
-                'value': float(current.get('pressure_msl', 0)),
-                'unit': 'hPa',
-                'timestamp': timestamp,
-                'data_type': 'REAL'
-            },
-            {
-                'source': 'Open-Meteo Egypt',
-                'location': OPEN_METEO_EGYPT['location'],
-                'lat': OPEN_METEO_EGYPT['latitude'],
-                'lon': OPEN_METEO_EGYPT['longitude'],
-                'sensor_type': 'Wind Speed',
-                'value': float(current.get('wind_speed_10m', 0)),
-                'unit': 'km/h',
-                'timestamp': timestamp,
-                'data_type': 'REAL'
-            },
-            {
-                'source': 'Open-Meteo Egypt',
-                'location': OPEN_METEO_EGYPT['location'],
-                'lat': OPEN_METEO_EGYPT['latitude'],
-                'lon': OPEN_METEO_EGYPT['longitude'],
-                'sensor_type': 'Wind Direction',
-                'value': float(current.get('wind_direction_10m', 0)),
-                'unit': '°',
-                'timestamp': timestamp,
-                'data_type': 'REAL'
-            }
-        ]
-        
-        print(f"   Fetched {len(measurements)} measurements")
-        for m in measurements:
-            print(f"    - {m['sensor_type']}: {m['value']} {m['unit']}")
-        
-        return measurements
-        
-    except Exception as e:
-        print(f"   Error: {e}")
-        return []
-
+def influx_lines(measurements):
+    """MeasurementBatch -> line protocol; the tag set is serialized once per station/sensor"""
+    series = {}
+    lines = []
+    for row, value in enumerate(measurements.values):
+        if not math.isfinite(value):
+            continue
+        quality = measurements.quality(row)
+        key = (measurements.station_ids[row], measurements.sensor_ids[row], quality)
+        prefix = series.get(key)
+        if prefix is None:
+            st = measurements.stations[key[0]]
+            sensor_type, unit = measurements.sensors[key[1]]
+            prefix = series[key] = (
+                series_key("environment", {
+                    "source": st.source,
+                    "location": st.location,
+                    "sensor_type": sensor_type,
+                    "data_type": st.data_type or 'UNKNOWN',
+                    # Only set in filter mode 'tag'
+                    "quality": quality,
+                }),
+                format_fields({"unit": unit}),
+            )
+        flags = measurements.flags.get(row) if measurements.flags else None
+        fields = f"value={value!r},{prefix[1]}"
+        if flags:
+            fields += "," + format_fields({"quality_flags": flags})
+        lines.append(f"{prefix[0]} {fields} {measurements.ts[row]}")
+    return lines
 
-# ============================================================================
-# DATA PUSHERS - PLATFORM A/B/C
-# ============================================================================
 
 def push_to_influxdb(measurements):
-    """PLATFORM A: Push to InfluxDB"""
+    """PLATFORM A: Push to InfluxDB (queued, written in batches by the shared writer)"""
     try:
-        client = InfluxDBClient(url=INFLUXDB_URL, token=INFLUXDB_TOKEN, org=INFLUXDB_ORG)
-        write_api = client.write_api(write_options=SYNCHRONOUS)
-        
-        for measurement in measurements:
-            point = Point("environment") \
-                .tag("source", measurement['source']) \
-                .tag("location", measurement['location']) \
-                .tag("sensor_type", measurement['sensor_type']) \
-                .tag("data_type", measurement.get('data_type', 'UNKNOWN')) \
-                .field("value", float(measurement['value'])) \
-                .field("unit", measurement['unit']) \
-                .time(measurement['timestamp'])
-            
-            write_api.write(bucket=INFLUXDB_BUCKET, record=point)
-        
-        client.close()
+        get_influx_writer().write_lines(influx_lines(measurements))
         return True
     except Exception as e:
         print(f"   InfluxDB error: {e}")
@@ -348,7 +136,7 @@ def push_to_frost(measurements):
     """PLATFORM B: Push to FROST Server (connectivity check only)"""
     try:
         # Check if FROST is accessible
-        response = requests.get(f"{FROST_URL}/Things", timeout=5)
+        response = http_client.get(f"{FROST_URL}/Things", timeout=5)
         if response.status_code == 200:
             # NOTE: This only verifies FROST is reachable
             # Actual data upload requires creating Things/Datastreams first
@@ -359,37 +147,51 @@ def push_to_frost(measurements):
         return False
 
 
+def tb_telemetry_key(sensor_type, unit):
+    return f"{sensor_type}_{unit}".replace(' ', '_').replace('/', '_')
+
+
+def tb_telemetry_records(measurements):
+    """MeasurementBatch -> [{"ts": epoch_ms, "values": {...}}], one record per timestamp (NaN/inf skipped)"""
+    keys = [tb_telemetry_key(sensor_type, unit) for sensor_type, unit in measurements.sensors]
+    by_ts = {}
+    for value, ts, sensor_id in zip(measurements.values, measurements.ts, measurements.sensor_ids):
+        if math.isfinite(value):
+            by_ts.setdefault(ts // 1_000_000, {})[keys[sensor_id]] = value
+    return [{"ts": ts, "values": values} for ts, values in sorted(by_ts.items())]
+
+
+def push_to_thingsboard_gateway(device_key, measurements):
+    """PLATFORM C via MQTT gateway: timestamped values, one persistent connection"""
+    records = tb_telemetry_records(measurements)
+    if not records:
+        return False
+    publisher = thingsboard_gateway.get_publisher(TB_GATEWAY_TOKEN, host=TB_MQTT_HOST, port=TB_MQTT_PORT)
+    return publisher.send({device_key: records})
+
+
 def push_to_thingsboard(source, measurements):
     """PLATFORM C: Push to Thingsboard"""
     try:
-        device_key_map = {
-            'OpenSenseMap': 'OpenSenseMap_5df93d3b39652b001b8cd9d2',
-            'Mobilithek Dormagen': 'DWD_01975',
-            'Open-Meteo Egypt': 'Egypt',
-        }
-
-        device_key = device_key_map.get(source)
-        if not device_key or device_key not in TB_DEVICE_TOKENS:
+        device_key = SOURCES[source].tb_device if source in SOURCES else None
+        if not device_key:
+            return False
+        if TB_USE_GATEWAY:
+            return push_to_thingsboard_gateway(device_key, measurements)
+        if device_key not in TB_DEVICE_TOKENS:
             return False
 
         access_token = TB_DEVICE_TOKENS[device_key]
         url = f"{TB_URL}/api/v1/{access_token}/telemetry"
 
-        telemetry = {}
-        for m in measurements:
-            # Skip invalid values (NaN, None, inf)
-            value = m['value']
-            if value is None or (isinstance(value, float) and (value != value or value == float('inf') or value == float('-inf'))):
-                continue
-
-            key = f"{m['sensor_type']}_{m['unit']}".replace(' ', '_').replace('/', '_')
-            telemetry[key] = value
-
-        if not telemetry:
+        # ts/values array keeps each measurement's own timestamp
+        records = tb_telemetry_records(measurements)
+        if not records:
             return False
 
-        response = requests.post(url, json=telemetry, timeout=10)
+        response = http_client.post(url, json=records, timeout=10)
         response.raise_for_status()
+        instrumentation.record_points('Thingsboard', sum(len(r['values']) for r in records))
         return True
 
     except Exception as e:
@@ -397,12 +199,24 @@ def push_to_thingsboard(source, measurements):
         return False
 
 
+SOURCES = load_sources(SOURCES_CONFIG)
+
+PUSHERS = {
+    'InfluxDB': lambda source, data: push_to_influxdb(data),
+    'FROST': lambda source, data: push_to_frost(data),
+    'Thingsboard': push_to_thingsboard,
+}
+
+
 # ============================================================================
 # MAIN
 # ============================================================================
 
-def get_iso_timestamp():
-    return datetime.now(timezone.utc).isoformat()
+def run_sources(names):
+    """Fetch the given sources and push them to all platforms concurrently"""
+    sources = {name: (SOURCES[name].fetch_latest, SOURCES[name].timeout) for name in names}
+    return run_cycle(sources, PUSHERS, max_workers=MAX_WORKERS, push_timeout=PUSH_TIMEOUT,
+                     filter_fn=plausibility_filter)
 
 
 def load_data_cycle():
@@ -414,60 +228,136 @@ def load_data_cycle():
     print(" REAL DATA SOURCES:")
     print("-" * 70)
     
-    all_measurements = []
+    # Fetches and pushes run concurrently; each source is pushed as soon as it arrives
+    cycle = run_sources(list(SOURCES))
     
-    # Source 1: OpenSenseMap
-    osm_data = fetch_opensensemap_data()
-    if osm_data:
-        all_measurements.extend(osm_data)
-        
-        print("\n  Pushing to platforms:")
-        if push_to_influxdb(osm_data):
-            print("     InfluxDB")
-        if push_to_frost(osm_data):
-            print("     FROST")
-        if push_to_thingsboard('OpenSenseMap', osm_data):
-            print("     Thingsboard")
+    all_measurements = MeasurementBatch()
+    print("\n  Pushed to platforms:")
+    for source, report in cycle['sources'].items():
+        # Empty, failed or timed-out sources keep the report's initial [] instead of a batch
+        if report['measurements']:
+            all_measurements.extend(report['measurements'])
+        platforms = [p for p, push in report['pushes'].items() if push['status'] == 'ok']
+        print(f"    {source}: {', '.join(platforms) if platforms else '-'}")
     
-    # Source 2: Mobilithek Dormagen
-    mobilithek_data = fetch_mobilithek_dormagen_data()
-    if mobilithek_data:
-        all_measurements.extend(mobilithek_data)
-        
-        print("\n  Pushing to platforms:")
-        if push_to_influxdb(mobilithek_data):
-            print("     InfluxDB")
-        if push_to_frost(mobilithek_data):
-            print("     FROST")
-        if push_to_thingsboard('Mobilithek Dormagen', mobilithek_data):
-            print("     Thingsboard")
+    writer = get_influx_writer()
+    instrumentation.write_self_metrics(writer, SELF_METRICS_MEASUREMENT, job='cycle')
+    flush_start = time.perf_counter()
+    writer.flush()
+    flush_time = time.perf_counter() - flush_start
+    instrumentation.record_stage('flush', flush_time, platform='InfluxDB')
+    stats = writer.stats
+    print(f"\n  InfluxDB: {stats['points_flushed']} points flushed, "
+          f"{stats['points_failed']} failed, {stats['retries']} retries ({flush_time:.2f}s)")
     
-    # Source 3: Open-Meteo Egypt
-    egypt_data = fetch_open_meteo_egypt_data()
-    if egypt_data:
-        all_measurements.extend(egypt_data)
-        
-        print("\n  Pushing to platforms:")
-        if push_to_influxdb(egypt_data):
-            print("     InfluxDB")
-        if push_to_frost(egypt_data):
-            print("     FROST")
-        if push_to_thingsboard('Open-Meteo Egypt', egypt_data):
-            print("     Thingsboard")
+    print_timings(cycle)
+    if plausibility_filter is not None:
+        filter_stats = plausibility_filter.stats
+        print(f"\n  Plausibility filter ({plausibility_filter.mode}): {filter_stats['rejected']} of "
+              f"{filter_stats['checked']} values suspect {filter_stats['by_check'] or ''}")
+    instrumentation.print_summary()
     
     print("\n" + "="*70)
     print(f" Cycle complete - {len(all_measurements)} total measurements")
     print("="*70 + "\n")
 
 
+def run_source_job(name, live=None):
+    """Daemon job: one source, one fetch/push round"""
+    cycle = run_sources([name])
+    report = cycle['sources'][name]
+    if live is not None:
+        # O(1) per reading, no history rescan
+        for m in report['measurements']:
+            if m.sensor_type == COMPARISON_SENSOR_TYPE and not m.flags:
+                # m.ts is epoch ns; LiveComparison reads bare numbers as epoch seconds
+                live.add(m.source, datetime.fromtimestamp(m.ts / 1e9, timezone.utc), m.value,
+                         reading_id=m.location)
+    platforms = [p for p, push in report['pushes'].items() if push['status'] == 'ok']
+    filtered = f", {report['filtered']} filtered" if report['filtered'] else ""
+    print(f"[{datetime.now().strftime('%H:%M:%S')}] {name}: {len(report['measurements'])} measurements{filtered} "
+          f"[{report['status']}] -> {', '.join(platforms) if platforms else '-'} "
+          f"({cycle['wall_time']:.2f}s)")
+
+
+def run_daemon():
+    """Long-running service: every source polled at its own interval"""
+    print(" MODE: daemon (Ctrl+C / SIGTERM to stop)\n")
+    
+    live = LiveComparison(COMPARISON_PAIRS)
+    
+    def report_comparison():
+        live.save()
+        print(f"[{datetime.now().strftime('%H:%M:%S')}] Live comparison ({COMPARISON_SENSOR_TYPE}, hourly means):")
+        live.print_summary()
+    
+    scheduler = Scheduler(max_workers=MAX_WORKERS)
+    for name, source in SOURCES.items():
+        scheduler.add_job(name, lambda name=name: run_source_job(name, live), source.interval,
+                          jitter=source.interval * SCHEDULE_JITTER)
+        print(f"  {name:<22} every {source.interval}s ({source.type_name})")
+    scheduler.add_job('Comparison', report_comparison, COMPARISON_REPORT_INTERVAL, run_immediately=False)
+    scheduler.add_job('Self-metrics',
+                      lambda: instrumentation.write_self_metrics(get_influx_writer(), SELF_METRICS_MEASUREMENT,
+                                                                 job='daemon'),
+                      SELF_METRICS_INTERVAL, run_immediately=False)
+    print()
+    
+    def handle_signal(signum, frame):
+        print(f"\n  Received signal {signum}, shutting down...")
+        scheduler.stop()
+    
+    signal.signal(signal.SIGINT, handle_signal)
+    signal.signal(signal.SIGTERM, handle_signal)
+    
+    scheduler.run()
+    
+    # Graceful shutdown: write everything still buffered
+    writer = get_influx_writer()
+    instrumentation.write_self_metrics(writer, SELF_METRICS_MEASUREMENT, job='daemon')
+    writer.close()
+    live.save()
+    print("\n  Job statistics:")
+    scheduler.print_stats()
+    print("\n  Live comparison:")
+    live.print_summary()
+    print(f"  InfluxDB: {writer.stats['points_flushed']} points flushed, "
+          f"{writer.stats['points_failed']} failed")
+    instrumentation.print_summary()
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Mikroklima Hamburg real data loader")
+    parser.add_argument('--daemon', action='store_true',
+                        help='keep running and poll every source at its own interval')
+    parser.add_argument('--metrics-port', type=int, default=None,
+                        help='serve Prometheus metrics on this port (/metrics)')
+    parser.add_argument('--filter', choices=list(FILTER_MODES) + ['off'], default=FILTER_MODE,
+                        help='plausibility filter: drop or tag suspect values (default: %(default)s)')
+    args = parser.parse_args()
+    
+    global plausibility_filter
+    if args.filter != 'off':
+        plausibility_filter = PlausibilityFilter(mode=args.filter)
+    
+    instrumentation.instrument_requests()
+    if args.metrics_port:
+        instrumentation.start_metrics_server(args.metrics_port)
+    
     print("\n" + "="*70)
     print("MIKROKLIMA HAMBURG - REAL DATA LOADER")
     print("="*70)
-    print("\n REAL DATA: OpenSenseMap | Mobilithek Dormagen | Open-Meteo Egypt")
-    print(" PLATFORMS: FROST | InfluxDB | Thingsboard\n")
+    print(f"\n REAL DATA: {' | '.join(SOURCES)}")
+    print(" PLATFORMS: FROST | InfluxDB | Thingsboard"
+          f" ({'MQTT gateway' if TB_USE_GATEWAY else 'HTTP'})")
+    print(f" FILTER: plausibility {args.filter}\n")
+    if args.metrics_port:
+        print(f" METRICS: http://localhost:{args.metrics_port}/metrics\n")
     
-    load_data_cycle()
+    if args.daemon:
+        run_daemon()
+    else:
+        load_data_cycle()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Parallel sensor.community Archive Downloader
+Downloads daily archive CSVs (archive.sensor.community) for many sensors
+and days with a bounded worker pool and a per-host rate limiter. Each file
+is streamed straight into the columnar store; days already stored are
+skipped.
+"""
+
+import threading
+import time
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
+
+import pandas as pd
+
+import http_client
+from columnar_store import HAS_PYARROW, write_measurements, source_path
+
+ARCHIVE_URL = "https://archive.sensor.community"
+SENSOR_TYPES = ['sds011', 'bme280', 'dht22']
+
+DEFAULT_WORKERS = 8
+DEFAULT_RATE_PER_HOST = 5.0   # requests per second
+STORE_SOURCE = 'sensor_community'
+
+
+class RateLimiter:
+    """Token bucket per host, shared by all worker threads"""
+
+    def __init__(self, rate: float, burst: int = None):
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self._buckets = {}  # host -> (tokens, last_refill)
+        self._lock = threading.Lock()
+
+    def acquire(self, url: str):
+        host = urlparse(url).netloc
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                tokens, last = self._buckets.get(host, (self.burst, now))
+                tokens = min(self.burst, tokens + (now - last) * self.rate)
+                if tokens >= 1:
+                    self._buckets[host] = (tokens - 1, now)
+                    return
+                self._buckets[host] = (tokens, now)
+                wait = (1 - tokens) / self.rate
+            time.sleep(wait)
+
+
+def find_area_sensors(lat: float, lon: float, radius_km: float, timeout: int = 10) -> set:
+    """IDs of sensors currently reporting within radius_km of lat/lon"""
+    url = f"https://data.sensor.community/airrohr/v1/filter/area={lat},{lon},{radius_km}"
+    response = http_client.get(url, timeout=timeout)
+    response.raise_for_status()
+    return {entry.get('sensor', {}).get('id') for entry in response.json()} - {None}
+
+
+def archive_url(date_str: str, sensor_type: str, sensor_id) -> str:
+    return f"{ARCHIVE_URL}/{date_str}/{date_str}_{sensor_type}_sensor_{sensor_id}.csv"
+
+
+def is_stored(sensor_id, date_str: str) -> bool:
+    """True if the store already holds this sensor/day partition"""
+    return os.path.isdir(os.path.join(source_path(STORE_SOURCE), f"sensor_id={sensor_id}", f"date={date_str}"))
+
+
+class ArchiveDownloader:
+    """Downloads (sensor, day) archive files concurrently"""
+
+    def __init__(self, max_workers: int = DEFAULT_WORKERS, rate_per_host: float = DEFAULT_RATE_PER_HOST,
+                 timeout: int = 60, write_store: bool = HAS_PYARROW):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.write_store = write_store
+        self.limiter = RateLimiter(rate_per_host)
+        self.session = http_client.create_session(pool_size=max_workers, timeout=timeout)
+        # A sensor has one type; remember it to avoid probing the others every day
+        self._sensor_types = {}
+        self._store_lock = threading.Lock()
+        self.stats = {"files": 0, "records": 0, "skipped": 0, "missing": 0, "errors": 0}
+        self.outcomes = {}
+
+    def _types_for(self, sensor_id):
+        known = self._sensor_types.get(sensor_id)
+        return [known] + [t for t in SENSOR_TYPES if t != known] if known else SENSOR_TYPES
+
+    def fetch_day(self, sensor_id, date_str: str):
+        """Download one sensor/day; returns a DataFrame or None if no file exists"""
+        for sensor_type in self._types_for(sensor_id):
+            url = archive_url(date_str, sensor_type, sensor_id)
+            self.limiter.acquire(url)
+            resp = self.session.get(url, stream=True, timeout=self.timeout)
+            if resp.status_code == 404:
+                resp.close()
+                continue
+            resp.raise_for_status()
+            resp.raw.decode_content = True
+            # Parsed while streaming, the file is never held as a whole in memory
+            df = pd.read_csv(resp.raw, sep=';', on_bad_lines='skip')
+            resp.close()
+            self._sensor_types[sensor_id] = sensor_type
+            df['sensor_id'] = sensor_id
+            df['sensor_type'] = sensor_type
+            df['date'] = date_str
+            return df
+        return None
+
+    def _task(self, sensor_id, date_str: str):
+        df = self.fetch_day(sensor_id, date_str)
+        if df is None:
+            return sensor_id, date_str, None
+        if self.write_store:
+            with self._store_lock:
+                write_measurements(df, STORE_SOURCE)
+        return sensor_id, date_str, df
+
+    def download(self, sensor_ids, dates, skip_existing: bool = True, keep_frames: bool = False):
+        """
+        Download every (sensor, date) combination.
+
+        dates: list of 'YYYY-MM-DD' strings
+        keep_frames: also return the DataFrames (for CSV export / no pyarrow)
+        Returns the list of DataFrames if keep_frames, else an empty list.
+        """
+        tasks = [(sensor_id, date_str) for sensor_id in sensor_ids for date_str in dates]
+        return self.download_tasks(tasks, skip_existing=skip_existing, keep_frames=keep_frames)
+
+    def download_tasks(self, tasks, skip_existing: bool = True, keep_frames: bool = False):
+        """
+        Download a list of (sensor_id, date) pairs. The outcome of each pair
+        ("ok", "missing", "stored" or "error") is recorded in self.outcomes.
+        """
+        pending = []
+        for sensor_id, date_str in tasks:
+            if skip_existing and self.write_store and is_stored(sensor_id, date_str):
+                self.stats["skipped"] += 1
+                self.outcomes[(sensor_id, date_str)] = "stored"
+                continue
+            pending.append((sensor_id, date_str))
+
+        frames = []
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="archive") as executor:
+            futures = {executor.submit(self._task, s, d): (s, d) for s, d in pending}
+            for future in as_completed(futures):
+                sensor_id, date_str = futures[future]
+                try:
+                    _, _, df = future.result()
+                except Exception as e:
+                    self.stats["errors"] += 1
+                    self.outcomes[(sensor_id, date_str)] = "error"
+                    print(f"    ✗ {sensor_id} {date_str}: {e}")
+                    continue
+                if df is None:
+                    self.stats["missing"] += 1
+                    self.outcomes[(sensor_id, date_str)] = "missing"
+                    continue
+                self.stats["files"] += 1
+                self.stats["records"] += len(df)
+                self.outcomes[(sensor_id, date_str)] = "ok"
+                print(f"    ✓ {sensor_id} {date_str} ({df['sensor_type'].iloc[0]}): {len(df)} records")
+                if keep_frames:
+                    frames.append(df)
+        return frames
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+As-of Join on Sorted Timestamps
+Pairs each reading of one series with the closest reading of another
+(merge_asof semantics) using np.searchsorted on int64 epoch-ns arrays, so
+raw 5-minute citizen-science data can be compared with hourly reference
+data at native resolution instead of resampling both sides first.
+
+Cost: one sort of the right side plus a binary search per left row,
+O((n + m) log m).
+"""
+
+import numpy as np
+import pandas as pd
+
+DIRECTIONS = ("backward", "forward", "nearest")
+
+
+def to_ns(values) -> np.ndarray:
+    """Timestamps -> int64 epoch ns (UTC); naive timestamps are taken as UTC"""
+    ts = pd.to_datetime(pd.Series(values).reset_index(drop=True))
+    if ts.dt.tz is not None:
+        ts = ts.dt.tz_convert('UTC').dt.tz_localize(None)
+    return ts.to_numpy(dtype='datetime64[ns]').astype(np.int64)
+
+
+def _tolerance_ns(tolerance) -> int:
+    if tolerance is None:
+        return None
+    return int(pd.Timedelta(tolerance).value)
+
+
+def asof_indices(left_ns: np.ndarray, right_ns: np.ndarray, tolerance=None,
+                 direction: str = "nearest", allow_exact_matches: bool = True) -> np.ndarray:
+    """
+    For every left timestamp the index of the matching right timestamp, -1
+    if there is none. right_ns must be sorted ascending.
+
+    direction: "backward" (last right <= left), "forward" (first right >= left)
+               or "nearest" (ties go backward, like pandas.merge_asof)
+    tolerance: max distance (Timedelta, "30min", ...), None = unlimited
+    """
+    if direction not in DIRECTIONS:
+        raise ValueError(f"direction must be one of {DIRECTIONS}, got {direction!r}")
+    left_ns = np.asarray(left_ns, dtype=np.int64)
+    right_ns = np.asarray(right_ns, dtype=np.int64)
+    m = len(right_ns)
+    if m == 0:
+        return np.full(len(left_ns), -1, dtype=np.int64)
+
+    back = np.searchsorted(right_ns, left_ns, side="right" if allow_exact_matches else "left") - 1
+    fwd = np.searchsorted(right_ns, left_ns, side="left" if allow_exact_matches else "right")
+    back_ok = back >= 0
+    fwd_ok = fwd < m
+    back_dist = np.where(back_ok, left_ns - right_ns[np.clip(back, 0, m - 1)], np.iinfo(np.int64).max)
+    fwd_dist = np.where(fwd_ok, right_ns[np.clip(fwd, 0, m - 1)] - left_ns, np.iinfo(np.int64).max)
+
+    if direction == "backward":
+        idx, dist = np.where(back_ok, back, -1), back_dist
+    elif direction == "forward":
+        idx, dist = np.where(fwd_ok, fwd, -1), fwd_dist
+    else:
+        use_back = back_dist <= fwd_dist
+        idx = np.where(use_back, np.where(back_ok, back, -1), np.where(fwd_ok, fwd, -1))
+        dist = np.minimum(back_dist, fwd_dist)
+
+    tol = _tolerance_ns(tolerance)
+    if tol is not None:
+        idx = np.where(dist <= tol, idx, -1)
+    return idx
+
+
+def asof_join(left: pd.DataFrame, right: pd.DataFrame, on: str = 'timestamp_utc',
+              value_cols: list = None, tolerance=None, direction: str = "nearest",
+              suffixes: tuple = ('_left', '_right'), how: str = "inner") -> pd.DataFrame:
+    """
+    Join right onto left by nearest timestamp.
+
+    Result columns: on (left time), on + suffixes[1] (matched right time) and
+    every value column with both suffixes. how="inner" keeps matched rows only,
+    how="left" keeps all left rows (NaN where unmatched).
+    """
+    value_cols = value_cols or ['value']
+    left_ns = to_ns(left[on])
+    right_ns = to_ns(right[on])
+
+    # Both sides sorted once; the right side is what searchsorted needs
+    left_order = np.argsort(left_ns, kind="stable")
+    right_order = np.argsort(right_ns, kind="stable")
+    left_ns, right_ns = left_ns[left_order], right_ns[right_order]
+
+    idx = asof_indices(left_ns, right_ns, tolerance, direction)
+    matched = idx >= 0
+    if how == "inner":
+        left_order, left_ns, idx, matched = left_order[matched], left_ns[matched], idx[matched], matched[matched]
+    elif how != "left":
+        raise ValueError(f"how must be 'inner' or 'left', got {how!r}")
+
+    if len(right_ns) == 0:
+        right_ns, right_order = np.zeros(1, dtype=np.int64), np.zeros(1, dtype=np.int64)
+    safe = np.where(matched, idx, 0)
+    right_rows = right_order[safe]
+
+    result = pd.DataFrame({on: pd.to_datetime(left_ns)})
+    result[on + suffixes[1]] = pd.to_datetime(right_ns[safe]).where(matched)
+    for col in value_cols:
+        result[col + suffixes[0]] = left[col].to_numpy()[left_order]
+        right_values = right[col].to_numpy(dtype=np.float64) if len(right) else np.full(1, np.nan)
+        result[col + suffixes[1]] = np.where(matched, right_values[right_rows], np.nan)
+    return result
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Local HTTP Stand-ins for Benchmarks
+Minimal FROST, InfluxDB and ThingsBoard endpoints on 127.0.0.1 that accept
+what the loaders send, count requests / bytes / points, and can add a fixed
+latency per request to mimic a remote server.
+"""
+
+import gzip
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StandInServer:
+    """One stand-in platform ("frost", "influxdb" or "thingsboard") on a free port"""
+
+    def __init__(self, kind: str, latency: float = 0.0):
+        if kind not in ("frost", "influxdb", "thingsboard"):
+            raise ValueError(f"unknown stand-in kind: {kind}")
+        self.kind = kind
+        self.latency = latency
+        self._lock = threading.Lock()
+        self._next_id = 0
+        self.stats = {"requests": 0, "bytes": 0, "points": 0}
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def url(self) -> str:
+        """URL in the form the loaders expect for this platform"""
+        if self.kind == "frost":
+            return f"{self.base_url}/FROST-Server/v1.1"
+        return self.base_url
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self.stats)
+
+    def _count(self, nbytes: int, points: int):
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats["bytes"] += nbytes
+            self.stats["points"] += points
+
+    def _new_id(self) -> int:
+        with self._lock:
+            self._next_id += 1
+            return self._next_id
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Keep-alive clients otherwise wait for delayed ACKs between header and body writes
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def _reply(self, status: int, body: bytes = b"", content_type: str = "application/json",
+                       headers: dict = None):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                if body:
+                    self.wfile.write(body)
+
+            def _body(self) -> bytes:
+                length = int(self.headers.get("Content-Length") or 0)
+                self.wire_bytes = length
+                body = self.rfile.read(length) if length else b""
+                if self.headers.get("Content-Encoding") == "gzip":
+                    body = gzip.decompress(body)
+                return body
+
+            def do_GET(self):
+                if server.latency:
+                    time.sleep(server.latency)
+                server._count(0, 0)
+                self._reply(200, b'{"value": []}')
+
+            def do_POST(self):
+                body = self._body()
+                if server.latency:
+                    time.sleep(server.latency)
+                handler = getattr(self, f"_post_{server.kind}")
+                handler(body)
+
+            def _post_frost(self, body: bytes):
+                path = self.path.split("?")[0]
+                if path.endswith("/CreateObservations"):
+                    groups = json.loads(body)
+                    rows = sum(len(group.get("dataArray", [])) for group in groups)
+                    server._count(self.wire_bytes, rows)
+                    created = [f"{server.url}/Observations({server._new_id()})" for _ in range(rows)]
+                    self._reply(201, json.dumps(created).encode())
+                    return
+                entity = path.rstrip("/").split("/")[-1]
+                entity_id = server._new_id()
+                server._count(self.wire_bytes, 1 if entity == "Observations" else 0)
+                self._reply(201, json.dumps({"@iot.id": entity_id}).encode(),
+                            headers={"Location": f"{server.url}/{entity}({entity_id})"})
+
+            def _post_influxdb(self, body: bytes):
+                points = body.count(b"\n") + (1 if body and not body.endswith(b"\n") else 0)
+                server._count(self.wire_bytes, points)
+                self._reply(204)
+
+            def _post_thingsboard(self, body: bytes):
+                data = json.loads(body) if body else {}
+                if isinstance(data, list):
+                    points = sum(len(entry.get("values", {})) for entry in data)
+                elif "values" in data:
+                    points = len(data["values"])
+                else:
+                    points = len(data)
+                server._count(self.wire_bytes, points)
+                self._reply(200)
+
+        return Handler
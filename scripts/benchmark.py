@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Benchmark Harness for the Ingest and Analysis Hot Paths
+Runs the real loader functions against local stand-ins for FROST, InfluxDB
+and ThingsBoard (scripts/bench_servers.py) with synthetic data
+(scripts/synthetic_data.py) and reports per benchmark and size:
+
+- throughput (observations/s)
+- p50 / p99 latency of one call of the hot path
+- peak RSS (each run in its own process)
+- requests / bytes / points seen by the stand-in
+
+Usage (from the project root):
+    python scripts/benchmark.py --sizes 1000,10000,100000 --latency-ms 2
+    python scripts/benchmark.py --only resample_hourly,resample_stream --sizes 1000000,10000000
+    python scripts/benchmark.py --baseline results/benchmark_old.json
+
+Results are written as JSON (default results/benchmark.json) so runs of
+different versions can be diffed.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(SCRIPTS_DIR)
+sys.path.insert(0, SCRIPTS_DIR)
+sys.path.insert(0, ROOT_DIR)
+
+from bench_servers import StandInServer
+import synthetic_data
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+DEFAULT_OUTPUT = "results/benchmark.json"
+
+CYCLE_BATCH = 100          # measurements per push_to_influxdb call (one fetch cycle)
+POOL_SIZE = 10_000         # distinct synthetic measurements, replayed for large n
+STREAM_CHUNK = 100_000     # rows per add_batch call of the streaming resampler
+RESAMPLE_REPEATS = 3
+
+
+# =============================================================================
+# BENCHMARKS
+# Each setup returns run(), which returns (per-call latencies in seconds,
+# observations processed). Setup (data generation, imports) is not timed.
+# =============================================================================
+
+def _timed_calls(calls) -> list:
+    latencies = []
+    for fn, args in calls:
+        t0 = time.perf_counter()
+        fn(*args)
+        latencies.append(time.perf_counter() - t0)
+    return latencies
+
+
+def _measurement_batches(n: int, batch: int):
+    pool = synthetic_data.measurement_batch(min(n, POOL_SIZE))
+    for start in range(0, n, batch):
+        size = min(batch, n - start)
+        yield pool.take((start + i) % len(pool) for i in range(size))
+
+
+def bench_influx_push(n: int, urls: dict):
+    """complete_data_loader.push_to_influxdb, one call per fetch cycle, plus final flush"""
+    import complete_data_loader as loader
+    loader.INFLUXDB_URL = urls["influxdb"]
+    writer = loader.get_influx_writer()
+
+    batches = list(_measurement_batches(n, CYCLE_BATCH))
+    def run():
+        latencies = _timed_calls((loader.push_to_influxdb, (batch,)) for batch in batches)
+        latencies += _timed_calls([(writer.flush, ())])
+        return latencies, n
+    return run
+
+
+def bench_frost_single(n: int, urls: dict):
+    """frost_data_loader.create_observation, one POST per observation"""
+    import frost_data_loader as loader
+    loader.FROST_URL = urls["frost"]
+    values = synthetic_data.citizen_science_frame(n)
+    times = values['timestamp_utc'].dt.strftime('%Y-%m-%dT%H:%M:%SZ').tolist()
+    results = values['value'].fillna(0.0).round(2).tolist()
+
+    def run():
+        return _timed_calls((loader.create_observation, (1, result, ts)) for ts, result in zip(times, results)), n
+    return run
+
+
+def bench_frost_bulk(n: int, urls: dict):
+    """frost_bulk.post_observations, one call per CreateObservations chunk"""
+    import frost_bulk
+    values = synthetic_data.citizen_science_frame(n)
+    rows = list(zip(values['timestamp_utc'].dt.strftime('%Y-%m-%dT%H:%M:%SZ').tolist(),
+                    values['value'].fillna(0.0).round(2).tolist()))
+    chunk = frost_bulk.DEFAULT_CHUNK_SIZE
+
+    def run():
+        return _timed_calls(
+            (frost_bulk.post_observations, ({1: rows[start:start + chunk]}, chunk, urls["frost"]))
+            for start in range(0, len(rows), chunk)
+        ), n
+    return run
+
+
+def bench_thingsboard_single(n: int, urls: dict):
+    """activate_all_devices.send_to_thingsboard, one telemetry POST per measurement"""
+    import activate_all_devices as devices
+    devices.TB_URL = urls["thingsboard"]
+    devices.TB_DEVICE_TOKENS = {"bench": "bench-token"}
+    telemetry = [{m.sensor_type.lower().replace(' ', '_'): m.value}
+                 for batch in _measurement_batches(n, POOL_SIZE) for m in batch]
+
+    def run():
+        return _timed_calls((devices.send_to_thingsboard, ("bench", t)) for t in telemetry), n
+    return run
+
+
+def bench_resample_hourly(n: int, urls: dict):
+    """temperature_comparison.resample_to_hourly on n raw 5-minute readings"""
+    import temperature_comparison
+    df = synthetic_data.citizen_science_frame(n)
+
+    def run():
+        return _timed_calls((temperature_comparison.resample_to_hourly, (df.copy(), "Benchmark"))
+                            for _ in range(RESAMPLE_REPEATS)), n * RESAMPLE_REPEATS
+    return run
+
+
+def bench_resample_stream(n: int, urls: dict):
+    """stream_resampler.HourlyResampler.add_batch over chunks of the same data"""
+    from stream_resampler import HourlyResampler
+    df = synthetic_data.citizen_science_frame(n)
+
+    def run():
+        resampler = HourlyResampler()
+        calls = [(resampler.add_batch, (chunk['station_id'], chunk['timestamp_utc'], chunk['value']))
+                 for chunk in (df.iloc[start:start + STREAM_CHUNK] for start in range(0, len(df), STREAM_CHUNK))]
+        return _timed_calls(calls + [(resampler.flush, ())]), n
+    return run
+
+
+# name -> (setup function, stand-in it talks to, max n; larger sizes are skipped)
+BENCHMARKS = {
+    "influx_push": (bench_influx_push, "influxdb", 10_000_000),
+    "frost_single": (bench_frost_single, "frost", 20_000),
+    "frost_bulk": (bench_frost_bulk, "frost", 10_000_000),
+    "thingsboard_single": (bench_thingsboard_single, "thingsboard", 20_000),
+    "resample_hourly": (bench_resample_hourly, None, 10_000_000),
+    "resample_stream": (bench_resample_stream, None, 10_000_000),
+}
+
+
+# =============================================================================
+# HARNESS
+# =============================================================================
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _child(name: str, n: int, urls: dict, conn):
+    """Runs in a fresh process so peak RSS belongs to this benchmark alone"""
+    try:
+        os.chdir(ROOT_DIR)
+        setup, _, _ = BENCHMARKS[name]
+        run = setup(n, urls)
+        t0 = time.perf_counter()
+        latencies, observations = run()
+        wall = time.perf_counter() - t0
+        conn.send({"wall": wall, "latencies": latencies, "observations": observations,
+                   "peak_rss_mb": _peak_rss_mb()})
+    except Exception as e:
+        conn.send({"error": f"{type(e).__name__}: {e}"})
+    finally:
+        conn.close()
+
+
+def run_benchmark(name: str, n: int, servers: dict) -> dict:
+    _, kind, max_n = BENCHMARKS[name]
+    result = {"benchmark": name, "n": n}
+    if n > max_n:
+        result["skipped"] = f"n > {max_n}"
+        return result
+
+    server = servers.get(kind)
+    before = server.snapshot() if server else None
+    urls = {k: s.url for k, s in servers.items()}
+
+    ctx = multiprocessing.get_context("fork")
+    parent_conn, child_conn = ctx.Pipe(duplex=False)
+    process = ctx.Process(target=_child, args=(name, n, urls, child_conn))
+    process.start()
+    child_conn.close()
+    data = parent_conn.recv()
+    process.join()
+
+    if "error" in data:
+        result["error"] = data["error"]
+        return result
+
+    latencies = np.array(data["latencies"]) * 1000
+    result.update({
+        "wall_s": round(data["wall"], 4),
+        "throughput_obs_s": round(data["observations"] / data["wall"], 1) if data["wall"] > 0 else None,
+        "calls": len(latencies),
+        "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+        "p99_ms": round(float(np.percentile(latencies, 99)), 3),
+        "peak_rss_mb": round(data["peak_rss_mb"], 1),
+    })
+    if server:
+        after = server.snapshot()
+        result["server"] = {key: after[key] - before[key] for key in after}
+    return result
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR,
+                              capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def print_result(r: dict):
+    label = f"{r['benchmark']:<20} n={r['n']:<10}"
+    if "skipped" in r:
+        print(f"  {label} skipped ({r['skipped']})")
+    elif "error" in r:
+        print(f"  {label} ✗ {r['error']}")
+    else:
+        requests_info = f", {r['server']['requests']} requests" if "server" in r else ""
+        print(f"  {label} {r['throughput_obs_s']:>12,.0f} obs/s  p50 {r['p50_ms']:.3f} ms  "
+              f"p99 {r['p99_ms']:.3f} ms  RSS {r['peak_rss_mb']:.0f} MB{requests_info}")
+
+
+def compare_baseline(results: list, baseline_file: str):
+    with open(baseline_file, 'r') as f:
+        baseline = {(r["benchmark"], r["n"]): r for r in json.load(f).get("results", [])}
+    print(f"\n  Compared with {baseline_file}:")
+    for r in results:
+        old = baseline.get((r["benchmark"], r["n"]))
+        if not old or not old.get("throughput_obs_s") or not r.get("throughput_obs_s"):
+            continue
+        ratio = r["throughput_obs_s"] / old["throughput_obs_s"]
+        print(f"  {r['benchmark']:<20} n={r['n']:<10} throughput x{ratio:.2f}  "
+              f"RSS {old['peak_rss_mb']:.0f} -> {r['peak_rss_mb']:.0f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ingest and analysis hot paths")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES),
+                        help="comma-separated measurement counts (1000 to 10000000)")
+    parser.add_argument("--only", default="", help="comma-separated benchmark names")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="latency added by the stand-ins per request")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--baseline", help="earlier JSON output to compare against")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    names = [n for n in args.only.split(",") if n] or list(BENCHMARKS)
+    unknown = set(names) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))} (available: {', '.join(BENCHMARKS)})")
+
+    print("=" * 70)
+    print("BENCHMARK")
+    print("=" * 70)
+    print(f"  Sizes: {sizes}, stand-in latency: {args.latency_ms} ms\n")
+
+    servers = {kind: StandInServer(kind, args.latency_ms / 1000).start()
+               for kind in ("frost", "influxdb", "thingsboard")}
+    results = []
+    try:
+        for name in names:
+            for n in sizes:
+                result = run_benchmark(name, n, servers)
+                print_result(result)
+                results.append(result)
+    finally:
+        for server in servers.values():
+            server.stop()
+
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "created": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "stand_in_latency_ms": args.latency_ms,
+        },
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✓ Results saved: {args.output}")
+
+    if args.baseline:
+        compare_baseline(results, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Columnar Storage for Historical Data
+Parquet dataset under data/store/<source>/sensor_id=<id>/date=<YYYY-MM-DD>/
+with typed columns. Readers use column projection and predicate pushdown,
+so e.g. the temperature analysis only reads timestamp/temperature of the
+bme280 files instead of parsing every PM column of the CSV export.
+
+Requires pyarrow (pip install pyarrow). Without it, readers fall back to
+the CSV files in data/historical/.
+
+Import the existing CSV files once:
+    python scripts/columnar_store.py import
+"""
+
+import os
+import shutil
+import sys
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+STORE_ROOT = "data/store"
+
+# Column types per source; partition columns (sensor_id, date) are strings
+SCHEMAS = {
+    "sensor_community": {
+        "timestamp": "timestamp[ns]",
+        "sensor_type": "string",
+        "location": "string",
+        "lat": "float64",
+        "lon": "float64",
+        "P1": "float64",
+        "durP1": "float64",
+        "ratioP1": "float64",
+        "P2": "float64",
+        "durP2": "float64",
+        "ratioP2": "float64",
+        "pressure": "float64",
+        "altitude": "float64",
+        "pressure_sealevel": "float64",
+        "temperature": "float64",
+        "humidity": "float64",
+    },
+    "openmeteo": {
+        "timestamp": "timestamp[ns]",
+        "temperature_2m": "float64",
+        "relative_humidity_2m": "float64",
+        "pressure_msl": "float64",
+        "wind_speed_10m": "float64",
+        "wind_direction_10m": "float64",
+        "location": "string",
+        "source": "string",
+    },
+}
+
+PARTITION_COLUMNS = ["sensor_id", "date"]
+
+# CSV exports the store replaces (used as fallback and for the initial import)
+CSV_FILES = {
+    "sensor_community": "data/historical/mobilithek_dormagen_7days.csv",
+    "openmeteo": "data/historical/openmeteo_egypt_7days.csv",
+}
+
+# Fixed sensor_id for sources without one
+DEFAULT_SENSOR_IDS = {
+    "openmeteo": "cairo",
+}
+
+
+def source_path(source: str) -> str:
+    return os.path.join(STORE_ROOT, source)
+
+
+def has_data(source: str) -> bool:
+    path = source_path(source)
+    return HAS_PYARROW and os.path.isdir(path) and any(os.scandir(path))
+
+
+def _arrow_schema(source: str):
+    fields = [pa.field(name, pa.type_for_alias(type_name)) for name, type_name in SCHEMAS[source].items()]
+    fields += [pa.field(col, pa.string()) for col in PARTITION_COLUMNS]
+    return pa.schema(fields)
+
+
+def _partitioning():
+    return ds.partitioning(pa.schema([(col, pa.string()) for col in PARTITION_COLUMNS]), flavor="hive")
+
+
+def normalize(df: pd.DataFrame, source: str) -> pd.DataFrame:
+    """Bring a raw DataFrame into the typed store layout (missing columns become null)"""
+    df = df.copy()
+    if "sensor_id" not in df.columns:
+        df["sensor_id"] = DEFAULT_SENSOR_IDS.get(source, "unknown")
+    df["sensor_id"] = df["sensor_id"].astype(str)
+    df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce")
+    df = df[df["timestamp"].notna()]
+    df["date"] = df["timestamp"].dt.strftime("%Y-%m-%d")
+
+    for name, type_name in SCHEMAS[source].items():
+        if name not in df.columns:
+            df[name] = None
+        if type_name == "float64":
+            df[name] = pd.to_numeric(df[name], errors="coerce")
+        elif type_name == "string":
+            df[name] = df[name].astype("string")
+    return df[list(SCHEMAS[source]) + PARTITION_COLUMNS]
+
+
+def write_measurements(df: pd.DataFrame, source: str) -> int:
+    """
+    Write rows into the store. Partitions (sensor_id/date) contained in df
+    are replaced as a whole, so re-writing a day is idempotent.
+    Returns the number of rows written.
+    """
+    if not HAS_PYARROW:
+        raise RuntimeError("pyarrow is required for the columnar store (pip install pyarrow)")
+    if df.empty:
+        return 0
+
+    df = normalize(df, source)
+    table = pa.Table.from_pandas(df, schema=_arrow_schema(source), preserve_index=False)
+    ds.write_dataset(
+        table,
+        source_path(source),
+        format="parquet",
+        partitioning=_partitioning(),
+        existing_data_behavior="delete_matching",
+        basename_template="part-{i}.parquet",
+    )
+    return len(df)
+
+
+def _apply_filters_pandas(df: pd.DataFrame, filters: list) -> pd.DataFrame:
+    ops = {
+        "==": lambda s, v: s == v,
+        "!=": lambda s, v: s != v,
+        ">": lambda s, v: s > v,
+        ">=": lambda s, v: s >= v,
+        "<": lambda s, v: s < v,
+        "<=": lambda s, v: s <= v,
+        "in": lambda s, v: s.isin(v),
+    }
+    for column, op, value in filters or []:
+        df = df[ops[op](df[column], value)]
+    return df
+
+
+def read_measurements(source: str, columns: list = None, filters: list = None) -> pd.DataFrame:
+    """
+    Read from the store with column projection and predicate pushdown.
+
+    filters: list of (column, op, value) tuples combined with AND,
+             e.g. [("sensor_type", "==", "bme280"), ("date", ">=", "2026-01-10")]
+             Filters on sensor_id/date prune whole partitions.
+
+    Falls back to the CSV export if the store is empty or pyarrow is missing.
+    """
+    if has_data(source):
+        table = pq.read_table(
+            source_path(source),
+            columns=columns,
+            filters=filters or None,
+            partitioning=_partitioning(),
+            schema=_arrow_schema(source),
+        )
+        return table.to_pandas()
+
+    csv_file = CSV_FILES[source]
+    if columns:
+        # Filter columns must be read as well, even if not requested
+        needed = set(columns) | {col for col, _, _ in filters or []}
+        if "date" in needed:
+            needed.add("timestamp")
+        df = pd.read_csv(csv_file, usecols=lambda c: c in needed)
+    else:
+        df = pd.read_csv(csv_file)
+    if "timestamp" in df.columns:
+        df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce")
+    if "date" in df.columns:
+        df["date"] = df["date"].astype(str)
+    elif "timestamp" in df.columns:
+        # Partition column of the store, derived for CSV exports without it
+        df["date"] = df["timestamp"].dt.strftime("%Y-%m-%d")
+    if "sensor_id" in df.columns:
+        df["sensor_id"] = df["sensor_id"].astype(str)
+    else:
+        df["sensor_id"] = DEFAULT_SENSOR_IDS.get(source, "unknown")
+    df = _apply_filters_pandas(df, filters)
+    return df[columns] if columns else df
+
+
+def stored_dates(source: str) -> dict:
+    """sensor_id -> sorted list of stored dates, from the partition directories"""
+    result = {}
+    root = source_path(source)
+    if not os.path.isdir(root):
+        return result
+    for sensor_dir in os.scandir(root):
+        if not sensor_dir.is_dir() or not sensor_dir.name.startswith("sensor_id="):
+            continue
+        dates = sorted(d.name[len("date="):] for d in os.scandir(sensor_dir.path)
+                       if d.is_dir() and d.name.startswith("date="))
+        result[sensor_dir.name[len("sensor_id="):]] = dates
+    return result
+
+
+def prune(source: str, before_date: str) -> int:
+    """Delete all partitions older than before_date (YYYY-MM-DD); returns partitions removed"""
+    removed = 0
+    for sensor_id, dates in stored_dates(source).items():
+        for date in dates:
+            if date < before_date:
+                shutil.rmtree(os.path.join(source_path(source), f"sensor_id={sensor_id}", f"date={date}"))
+                removed += 1
+    return removed
+
+
+def import_csv(source: str, csv_file: str = None) -> int:
+    """Load an existing CSV export into the store"""
+    csv_file = csv_file or CSV_FILES[source]
+    df = pd.read_csv(csv_file)
+    return write_measurements(df, source)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "import":
+        for source, csv_file in CSV_FILES.items():
+            if os.path.exists(csv_file):
+                rows = import_csv(source, csv_file)
+                print(f"✓ {csv_file} -> {source_path(source)} ({rows} rows)")
+    else:
+        print(__doc__)
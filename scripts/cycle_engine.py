@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Concurrent Cycle Engine
+Runs source fetches and platform pushes on a bounded thread pool.
+Each source is pushed as soon as its own fetch finishes, so a slow or
+hanging source only costs its own timeout. An optional filter stage
+(e.g. plausibility.PlausibilityFilter) runs between fetch and push.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from instrumentation import count, record_stage
+
+DEFAULT_MAX_WORKERS = 6
+DEFAULT_FETCH_TIMEOUT = 30.0   # seconds per source
+DEFAULT_PUSH_TIMEOUT = 30.0    # seconds per platform push
+DEFAULT_QUEUE_TIMEOUT = 120.0  # seconds a call may wait for a free worker before it starts
+QUEUE_POLL_INTERVAL = 0.5      # seconds; re-check deadlines while calls are still queued
+
+
+def _timed(fn, *args, started: list = None):
+    if started is not None:
+        # Deadlines count from here, not from submission: queued time is not the call's fault
+        started.append(time.monotonic())
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def run_cycle(sources: dict, pushers: dict, max_workers: int = DEFAULT_MAX_WORKERS,
+              push_timeout: float = DEFAULT_PUSH_TIMEOUT, filter_fn=None,
+              queue_timeout: float = DEFAULT_QUEUE_TIMEOUT) -> dict:
+    """
+    Fetch all sources and push their data to all platforms concurrently.
+
+    sources:   {name: (fetch_fn, timeout_seconds)}  fetch_fn() -> list of measurements
+    pushers:   {platform: push_fn}                  push_fn(source_name, measurements) -> bool
+    filter_fn: optional filter_fn(source_name, measurements) -> measurements,
+               applied to each fetch result before it is pushed
+    queue_timeout: a fetch or push that has not started after this long is
+               cancelled ("queue_timeout"); its own timeout counts from its start
+
+    Returns {"wall_time": float, "sources": {name: report}} where a report holds
+    status ("ok", "empty", "timeout", "queue_timeout", "error"), measurements (after the filter),
+    fetched and filtered counts, fetch_time and pushes {platform: {"status", "time"}}.
+    """
+    cycle_start = time.perf_counter()
+    reports = {name: {"status": "pending", "measurements": [], "fetched": 0, "filtered": 0,
+                      "fetch_time": None, "pushes": {}}
+               for name in sources}
+
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="cycle")
+    pending = {}  # future -> (kind, source, platform, timeout, queued_until, started)
+
+    def submit(kind, name, platform, timeout, fn, *args):
+        started = []
+        future = executor.submit(_timed, fn, *args, started=started)
+        pending[future] = (kind, name, platform, timeout, time.monotonic() + queue_timeout, started)
+
+    def deadline(entry):
+        _, _, _, timeout, queued_until, started = entry
+        return started[0] + timeout if started else queued_until
+
+    for name, (fetch_fn, timeout) in sources.items():
+        submit("fetch", name, None, timeout or DEFAULT_FETCH_TIMEOUT, fetch_fn)
+
+    try:
+        while pending:
+            wait_time = min(deadline(entry) for entry in pending.values()) - time.monotonic()
+            if not all(entry[5] for entry in pending.values()):
+                # A queued call may start any moment and get an earlier deadline
+                wait_time = min(wait_time, QUEUE_POLL_INTERVAL)
+            done, _ = wait(list(pending), timeout=max(0.0, wait_time), return_when=FIRST_COMPLETED)
+
+            for future in done:
+                kind, name, platform = pending.pop(future)[:3]
+                report = reports[name]
+                try:
+                    result, elapsed = future.result()
+                except Exception as e:
+                    status, result, elapsed = f"error: {e}", None, None
+                else:
+                    status = "ok" if result else ("empty" if kind == "fetch" else "failed")
+
+                labels = {"source": name} if kind == "fetch" else {"source": name, "platform": platform}
+                if elapsed is not None:
+                    record_stage(kind, elapsed, **labels)
+                if status != "ok":
+                    count("stage_failures_total", stage=kind, status=status.split(":")[0], **labels)
+
+                if kind == "fetch":
+                    report["status"] = status
+                    report["fetch_time"] = elapsed
+                    report["fetched"] = len(result) if result else 0
+                    if result and filter_fn is not None:
+                        filter_start = time.perf_counter()
+                        try:
+                            result = filter_fn(name, result)
+                        except Exception as e:
+                            # A broken filter must not stop ingest; push unfiltered
+                            print(f"   Filter error ({name}): {e}")
+                            count("stage_failures_total", stage="filter", status="error", source=name)
+                        record_stage("filter", time.perf_counter() - filter_start, source=name)
+                        report["filtered"] = report["fetched"] - len(result)
+                    if result:
+                        report["measurements"] = result
+                        for platform_name, push_fn in pushers.items():
+                            submit("push", name, platform_name, push_timeout, push_fn, name, result)
+                else:
+                    report["pushes"][platform] = {"status": status, "time": elapsed}
+
+            # Give up on everything past its deadline; the thread finishes in the background
+            now = time.monotonic()
+            for future, entry in list(pending.items()):
+                if deadline(entry) <= now:
+                    kind, name, platform = pending.pop(future)[:3]
+                    status = "timeout" if entry[5] or not future.cancel() else "queue_timeout"
+                    count("stage_failures_total", stage=kind, status=status, source=name,
+                          **({"platform": platform} if platform else {}))
+                    if kind == "fetch":
+                        reports[name]["status"] = status
+                    else:
+                        reports[name]["pushes"][platform] = {"status": status, "time": None}
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return {"wall_time": time.perf_counter() - cycle_start, "sources": reports}
+
+
+def print_timings(cycle: dict):
+    """Print per-stage wall times and the sequential time they add up to"""
+    print("\n  Stage timings:")
+    sequential = 0.0
+    for name, report in cycle["sources"].items():
+        fetch_time = report["fetch_time"]
+        sequential += fetch_time or 0.0
+        fetch_str = f"{fetch_time:.2f}s" if fetch_time is not None else "-"
+        filtered = f"  ({report['filtered']} filtered)" if report.get("filtered") else ""
+        print(f"    {name:<22} fetch {fetch_str:>7}  [{report['status']}]{filtered}")
+        for platform, push in report["pushes"].items():
+            sequential += push["time"] or 0.0
+            push_str = f"{push['time']:.2f}s" if push["time"] is not None else "-"
+            print(f"    {'':<22} {platform:<11} {push_str:>7}  [{push['status']}]")
+    print(f"    Sum of calls: {sequential:.2f}s | Cycle wall time: {cycle['wall_time']:.2f}s")
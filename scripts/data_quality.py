@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Per-Sensor Data Quality
+Vectorized quality metrics over the columnar store: one sort by
+(sensor, timestamp), then grouped NumPy operations on the diff vector give
+for every sensor
+
+- records, first / last timestamp,
+- gaps longer than a threshold (list) and the longest gap,
+- hourly completeness: hours with at least one reading / hours in the
+  report window (derived from the data or passed in, not hard-coded),
+- duplicate timestamps,
+- missing and out-of-range values per value column.
+
+Results are DataFrames (one row per sensor, one row per gap), so reports,
+dashboards and tests can use them directly.
+
+    python scripts/data_quality.py sensor_community [--gap 10min] [--since 2026-01-10 --until 2026-01-12]
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from columnar_store import SCHEMAS, read_measurements
+
+HOUR_NS = 3600 * 1_000_000_000
+DEFAULT_GAP = "10min"
+
+# Sources with a coarser native interval (hourly model data)
+SOURCE_GAPS = {
+    "openmeteo": "90min",
+}
+
+# Plausible physical ranges (inclusive); values outside count as out of range
+VALID_RANGES = {
+    "P1": (0.0, 1000.0),
+    "P2": (0.0, 1000.0),
+    "temperature": (-40.0, 60.0),
+    "humidity": (0.0, 100.0),
+    "pressure": (87_000.0, 108_500.0),     # Pa (BME280 raw)
+    "temperature_2m": (-40.0, 60.0),
+    "relative_humidity_2m": (0.0, 100.0),
+    "pressure_msl": (870.0, 1085.0),
+    "wind_speed_10m": (0.0, 250.0),
+    "wind_direction_10m": (0.0, 360.0),
+}
+
+# Value columns analysed per store source by default
+VALUE_COLUMNS = {
+    "sensor_community": ["P1", "P2", "temperature", "humidity"],
+    "openmeteo": ["temperature_2m", "relative_humidity_2m", "pressure_msl", "wind_speed_10m"],
+}
+
+
+def _to_ns(timestamps) -> np.ndarray:
+    ts = pd.to_datetime(pd.Series(timestamps).reset_index(drop=True), errors="coerce")
+    if ts.dt.tz is not None:
+        ts = ts.dt.tz_convert("UTC").dt.tz_localize(None)
+    return ts.to_numpy(dtype="datetime64[ns]").astype(np.int64)
+
+
+def quality_arrays(sensor_ids, timestamps_ns: np.ndarray, values: dict = None, gap="10min",
+                   ranges: dict = None, start=None, end=None) -> dict:
+    """
+    Core computation on plain arrays.
+
+    sensor_ids:    array-like of sensor labels, one per row
+    timestamps_ns: int64 epoch ns per row (NaT rows must be removed beforehand)
+    values:        {column: float array} checked for missing / out-of-range values
+    start, end:    report window [start, end) for completeness; default = the hours
+                   between the first and last reading
+
+    Returns {"summary": DataFrame (index sensor_id), "gaps": DataFrame,
+             "window": (start, end), "expected_hours": int}.
+    """
+    values = values or {}
+    ranges = VALID_RANGES if ranges is None else ranges
+    gap_ns = int(pd.Timedelta(gap).value)
+
+    codes, sensors = pd.factorize(pd.Series(sensor_ids).astype(str).reset_index(drop=True), sort=True)
+    ts = np.asarray(timestamps_ns, dtype=np.int64)
+    k = len(sensors)
+    if len(ts) == 0:
+        empty = pd.DataFrame(columns=["records"]).rename_axis("sensor_id")
+        return {"summary": empty, "gaps": pd.DataFrame(columns=["sensor_id", "start", "end", "duration"]),
+                "window": (None, None), "expected_hours": 0}
+
+    # One sort by (sensor, time); everything below is a grouped reduction over it
+    order = np.lexsort((ts, codes))
+    codes, ts = codes[order], ts[order]
+
+    records = np.bincount(codes, minlength=k)
+    boundaries = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    first_ts = ts[boundaries]
+    last_ts = ts[np.r_[boundaries[1:] - 1, len(ts) - 1]]
+
+    same_sensor = codes[1:] == codes[:-1]
+    diffs = np.diff(ts)
+
+    duplicates = np.bincount(codes[1:][same_sensor & (diffs == 0)], minlength=k)
+
+    is_gap = same_sensor & (diffs > gap_ns)
+    gap_idx = np.flatnonzero(is_gap)
+    gap_codes = codes[gap_idx]
+    gap_counts = np.bincount(gap_codes, minlength=k)
+    longest = np.zeros(k, dtype=np.int64)
+    np.maximum.at(longest, gap_codes, diffs[gap_idx])
+
+    # Hourly completeness over the report window
+    hours = ts // HOUR_NS
+    start_hour = (_to_ns([start])[0] // HOUR_NS) if start is not None else int(hours.min())
+    end_hour = (-(-_to_ns([end])[0] // HOUR_NS) - 1) if end is not None else int(hours.max())
+    expected_hours = max(int(end_hour - start_hour + 1), 0)
+    in_window = (hours >= start_hour) & (hours <= end_hour)
+    new_hour = np.r_[True, (codes[1:] != codes[:-1]) | (hours[1:] != hours[:-1])]
+    hours_with_data = np.bincount(codes[new_hour & in_window], minlength=k)
+
+    summary = pd.DataFrame({
+        "records": records,
+        "first": pd.to_datetime(first_ts),
+        "last": pd.to_datetime(last_ts),
+        "duplicates": duplicates,
+        "gaps": gap_counts,
+        "longest_gap": pd.to_timedelta(longest),
+        "hours_with_data": hours_with_data,
+        "completeness": hours_with_data / expected_hours * 100 if expected_hours else np.nan,
+    }, index=pd.Index(sensors, name="sensor_id"))
+
+    for column, column_values in values.items():
+        v = np.asarray(column_values, dtype=np.float64)[order]
+        missing = np.isnan(v)
+        summary[f"{column}_missing"] = np.bincount(codes[missing], minlength=k)
+        if column in ranges:
+            lo, hi = ranges[column]
+            bad = ~missing & ((v < lo) | (v > hi))
+            summary[f"{column}_out_of_range"] = np.bincount(codes[bad], minlength=k)
+
+    gaps = pd.DataFrame({
+        "sensor_id": np.asarray(sensors)[gap_codes],
+        "start": pd.to_datetime(ts[gap_idx]),
+        "end": pd.to_datetime(ts[gap_idx + 1]),
+        "duration": pd.to_timedelta(diffs[gap_idx]),
+    })
+
+    window = (pd.Timestamp(start_hour * HOUR_NS), pd.Timestamp((end_hour + 1) * HOUR_NS))
+    return {"summary": summary, "gaps": gaps, "window": window, "expected_hours": expected_hours}
+
+
+def quality_frame(df: pd.DataFrame, value_columns: list = None, gap=DEFAULT_GAP, ranges: dict = None,
+                  start=None, end=None, sensor_col: str = "sensor_id", time_col: str = "timestamp") -> dict:
+    """quality_arrays() for a DataFrame in the store layout"""
+    ts = _to_ns(df[time_col])
+    valid = ts != np.iinfo(np.int64).min  # NaT
+    sensor_ids = df[sensor_col].to_numpy() if sensor_col in df.columns else np.full(len(df), "unknown")
+    value_columns = [c for c in (value_columns or []) if c in df.columns]
+    values = {c: pd.to_numeric(df[c], errors="coerce").to_numpy(dtype=np.float64)[valid] for c in value_columns}
+    return quality_arrays(sensor_ids[valid], ts[valid], values, gap=gap, ranges=ranges, start=start, end=end)
+
+
+def store_quality(source: str, value_columns: list = None, gap=None, ranges: dict = None,
+                  start: str = None, end: str = None, filters: list = None) -> dict:
+    """
+    Quality report for one store source. Only sensor_id, timestamp and the
+    value columns are read; start/end (YYYY-MM-DD, both inclusive) also
+    prune date partitions.
+    """
+    value_columns = value_columns or VALUE_COLUMNS.get(source, [])
+    value_columns = [c for c in value_columns if c in SCHEMAS[source]]
+    gap = gap or SOURCE_GAPS.get(source, DEFAULT_GAP)
+    filters = list(filters or [])
+    window_end = None
+    if start is not None:
+        filters.append(("date", ">=", pd.Timestamp(start).strftime("%Y-%m-%d")))
+    if end is not None:
+        filters.append(("date", "<=", pd.Timestamp(end).strftime("%Y-%m-%d")))
+        window_end = pd.Timestamp(end).normalize() + pd.Timedelta(days=1)
+    df = read_measurements(source, columns=["sensor_id", "timestamp"] + value_columns, filters=filters or None)
+    return quality_frame(df, value_columns, gap=gap, ranges=ranges, start=start, end=window_end)
+
+
+def overall(report: dict) -> dict:
+    """Source-level totals of a report (for summaries)"""
+    summary = report["summary"]
+    if summary.empty:
+        return {"sensors": 0, "records": 0}
+    return {
+        "sensors": len(summary),
+        "records": int(summary["records"].sum()),
+        "expected_hours": report["expected_hours"],
+        "completeness_mean": float(summary["completeness"].mean()),
+        "completeness_min": float(summary["completeness"].min()),
+        "duplicates": int(summary["duplicates"].sum()),
+        "gaps": int(summary["gaps"].sum()),
+        "longest_gap": summary["longest_gap"].max(),
+        "out_of_range": int(summary.filter(like="_out_of_range").to_numpy().sum()),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-sensor data quality from the columnar store")
+    parser.add_argument("source", choices=sorted(SCHEMAS))
+    parser.add_argument("--gap", help=f"minimum gap length, pandas Timedelta (default {DEFAULT_GAP}, "
+                                      f"openmeteo {SOURCE_GAPS['openmeteo']})")
+    parser.add_argument("--since", help="window start YYYY-MM-DD")
+    parser.add_argument("--until", help="window end YYYY-MM-DD")
+    args = parser.parse_args()
+
+    report = store_quality(args.source, gap=args.gap, start=args.since, end=args.until)
+    with pd.option_context("display.width", 160, "display.max_columns", 30):
+        print(report["summary"].sort_values("completeness"))
+    totals = overall(report)
+    print(f"\n{totals['sensors']} sensors, {totals['records']:,} records, "
+          f"window {report['window'][0]} - {report['window'][1]} ({report['expected_hours']} h)")
+    if totals["sensors"]:
+        print(f"Completeness mean {totals['completeness_mean']:.1f}% (min {totals['completeness_min']:.1f}%), "
+              f"{totals['gaps']} gaps (longest {totals['longest_gap']}), "
+              f"{totals['duplicates']} duplicates, {totals['out_of_range']} out of range")
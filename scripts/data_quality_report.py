@@ -6,6 +6,9 @@ Data Quality Report - Final Working Version
 import pandas as pd
 from datetime import datetime
 
+from columnar_store import read_measurements
+from data_quality import DEFAULT_GAP, SOURCE_GAPS, VALUE_COLUMNS, overall, quality_frame
+
 print("\n" + "="*80)
 print("DATA QUALITY REPORT - MIKROKLIMA HAMBURG")
 print("="*80 + "\n")
@@ -16,9 +19,12 @@ print("="*80 + "\n")
 
 print("📊 Loading historical data...\n")
 
-# Dormagen - columns are comma-separated, not semicolon
+# Dormagen - only the columns analysed below are read from the store
 try:
-    dormagen_df = pd.read_csv('data/historical/mobilithek_dormagen_7days.csv', sep=',')
+    dormagen_df = read_measurements(
+        'sensor_community',
+        columns=['timestamp', 'sensor_id', 'sensor_type', 'P1', 'P2', 'temperature', 'humidity']
+    )
     print(f"✓ Mobilithek Dormagen: {len(dormagen_df)} records")
     print(f"  Columns: {list(dormagen_df.columns[:10])}")
 except Exception as e:
@@ -27,7 +33,10 @@ except Exception as e:
 
 # Egypt
 try:
-    egypt_df = pd.read_csv('data/historical/openmeteo_egypt_7days.csv')
+    egypt_df = read_measurements(
+        'openmeteo',
+        columns=['timestamp', 'temperature_2m', 'relative_humidity_2m', 'pressure_msl', 'wind_speed_10m']
+    )
     print(f"✓ Open-Meteo Egypt: {len(egypt_df)} records")
 except Exception as e:
     print(f"✗ Open-Meteo Egypt error: {e}")
@@ -101,35 +110,38 @@ if dormagen_df is not None and 'timestamp' in dormagen_df.columns:
             print(f"  Min: {humid_data.min():.2f} %")
             print(f"  Max: {humid_data.max():.2f} %")
     
-    # Data gaps
+    # Gaps, duplicates and completeness per sensor (one vectorized pass)
+    dormagen_quality = quality_frame(dormagen_df, VALUE_COLUMNS['sensor_community'], gap=DEFAULT_GAP)
+    per_sensor = dormagen_quality['summary']
+    gaps = dormagen_quality['gaps']
+
     print(f"\n3. DATA GAPS (Datenlücken)")
     print("-" * 80)
     
-    dormagen_sorted = dormagen_df.sort_values('timestamp')
-    time_diffs = dormagen_sorted['timestamp'].diff()
-    gaps = time_diffs[time_diffs > pd.Timedelta(minutes=10)]
-    
     if len(gaps) > 0:
-        print(f"Found {len(gaps)} gaps > 10 minutes")
-        if len(gaps) <= 10:
-            for idx, gap in gaps.items():
-                print(f"  - {gap} gap at {dormagen_sorted.loc[idx, 'timestamp']}")
-        else:
-            print(f"  (Showing first 5)")
-            for idx, gap in gaps.head(5).items():
-                print(f"  - {gap} gap at {dormagen_sorted.loc[idx, 'timestamp']}")
+        print(f"Found {len(gaps)} gaps > {DEFAULT_GAP} in {(per_sensor['gaps'] > 0).sum()} of {len(per_sensor)} sensors")
+        for sensor_id, row in per_sensor[per_sensor['gaps'] > 0].iterrows():
+            print(f"  - Sensor {sensor_id}: {row['gaps']} gaps, longest {row['longest_gap']}")
+        print(f"  (Longest 5)")
+        for _, gap in gaps.nlargest(5, 'duration').iterrows():
+            print(f"  - {gap['duration']} gap at {gap['start']} (sensor {gap['sensor_id']})")
     else:
         print("✓ No significant gaps!")
+    if per_sensor['duplicates'].sum():
+        print(f"⚠ {per_sensor['duplicates'].sum()} duplicate timestamps")
+    out_of_range = per_sensor.filter(like='_out_of_range').sum()
+    for column, count in out_of_range[out_of_range > 0].items():
+        print(f"⚠ {column.replace('_out_of_range', '')}: {count} values out of range")
     
-    # Completeness
-    expected_hours = 7 * 24
-    actual_hours = len(dormagen_sorted['timestamp'].dt.floor('H').unique())
-    dormagen_completeness = (actual_hours / expected_hours) * 100
+    # Completeness: hours with data / hours in the observed window, per sensor
+    dormagen_completeness = overall(dormagen_quality)['completeness_mean']
+    window_start, window_end = dormagen_quality['window']
     
     print(f"\n4. COMPLETENESS")
     print("-" * 80)
-    print(f"Expected: {expected_hours} hours (7 days)")
-    print(f"Actual: {actual_hours} hours with data")
+    print(f"Expected: {dormagen_quality['expected_hours']} hours ({window_start} to {window_end})")
+    for sensor_id, row in per_sensor.iterrows():
+        print(f"  Sensor {sensor_id}: {row['hours_with_data']} hours with data ({row['completeness']:.1f}%)")
     print(f"Score: {dormagen_completeness:.1f}%")
     
     if dormagen_completeness >= 90:
@@ -177,16 +189,18 @@ if egypt_df is not None:
             print(f"  Missing: {missing} ({missing/len(egypt_df)*100:.1f}%)")
     
     # Completeness
-    expected_hours = 7 * 24
-    actual_hours = len(egypt_df)
-    egypt_completeness = (actual_hours / expected_hours) * 100
+    egypt_quality = quality_frame(egypt_df, VALUE_COLUMNS['openmeteo'], gap=SOURCE_GAPS['openmeteo'])
+    egypt_totals = overall(egypt_quality)
+    egypt_completeness = egypt_totals['completeness_mean']
     
     print(f"\n3. COMPLETENESS")
     print("-" * 80)
-    print(f"Expected: {expected_hours} hours")
-    print(f"Actual: {actual_hours} records")
+    print(f"Expected: {egypt_quality['expected_hours']} hours")
+    print(f"Actual: {egypt_quality['summary']['hours_with_data'].sum()} hours with data "
+          f"({egypt_totals['duplicates']} duplicates, {egypt_totals['gaps']} gaps)")
     print(f"Score: {egypt_completeness:.1f}%")
-    print("✓ EXCELLENT - Perfect hourly data from API")
+    if egypt_completeness >= 99:
+        print("✓ EXCELLENT - Complete hourly data from API")
 
 # =============================================================================
 # SUMMARY
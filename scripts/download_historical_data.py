@@ -1,16 +1,21 @@
 #!/usr/bin/env python3
 """
 Download Historical Data
-- Mobilithek Dormagen (sensor.community) - Last 7 days
+- Mobilithek Dormagen (sensor.community) - all sensors in the area, last 7 days
 - Open-Meteo Egypt (Cairo) - Last 7 days
 Saves to data/historical/ folder
 """
 
-import requests
 import pandas as pd
 import os
 from datetime import datetime, timedelta
-import time
+
+from http_cache import cached_get_json
+from columnar_store import HAS_PYARROW, write_measurements, read_measurements, source_path
+from archive_downloader import ArchiveDownloader, find_area_sensors
+
+HISTORY_DAYS = 7
+DOWNLOAD_WORKERS = 8
 
 # Create data directory
 os.makedirs('data/historical', exist_ok=True)
@@ -30,17 +35,7 @@ print("-" * 80)
 print("Step 1: Finding active sensors in Dormagen...")
 
 try:
-    url = "https://data.sensor.community/airrohr/v1/filter/area=51.0946,6.8407,5"
-    response = requests.get(url, timeout=10)
-    response.raise_for_status()
-    current_data = response.json()
-    
-    # Extract unique sensor IDs
-    sensor_ids = set()
-    for sensor_data in current_data:
-        sensor_id = sensor_data.get('sensor', {}).get('id')
-        if sensor_id:
-            sensor_ids.add(sensor_id)
+    sensor_ids = find_area_sensors(51.0946, 6.8407, 5)
     
     print(f"✓ Found {len(sensor_ids)} active sensors")
     print(f"  Sensor IDs: {list(sensor_ids)[:5]}..." if len(sensor_ids) > 5 else f"  Sensor IDs: {list(sensor_ids)}")
@@ -50,36 +45,27 @@ except Exception as e:
     sensor_ids = []
 
 # Download historical data from sensor.community archive
-print("\nStep 2: Downloading historical data (last 7 days)...")
+print(f"\nStep 2: Downloading historical data (last {HISTORY_DAYS} days)...")
 
-all_dormagen_data = []
 end_date = datetime.now()
-start_date = end_date - timedelta(days=7)
-
-for sensor_id in list(sensor_ids)[:3]:  # Limit to first 3 sensors for speed
-    print(f"\n  Downloading sensor {sensor_id}...")
-    
-    for day_offset in range(7):
-        date = end_date - timedelta(days=day_offset)
-        date_str = date.strftime('%Y-%m-%d')
-        
-        # Try different sensor types (SDS011 for PM, BME280 for temp/humidity)
-        for sensor_type in ['sds011', 'bme280', 'dht22']:
-            try:
-                archive_url = f"https://archive.sensor.community/{date_str}/{date_str}_{sensor_type}_sensor_{sensor_id}.csv"
-                
-                df = pd.read_csv(archive_url, sep=';', on_bad_lines='skip')
-                df['sensor_id'] = sensor_id
-                df['sensor_type'] = sensor_type
-                df['date'] = date_str
-                all_dormagen_data.append(df)
-                
-                print(f"    ✓ {date_str} ({sensor_type}): {len(df)} records")
-                time.sleep(0.5)  # Be nice to the server
-                break  # Found data for this day
-                
-            except Exception:
-                continue  # Try next sensor type
+start_date = end_date - timedelta(days=HISTORY_DAYS)
+dates = [(end_date - timedelta(days=day_offset)).strftime('%Y-%m-%d') for day_offset in range(HISTORY_DAYS)]
+
+# All sensors, all days in parallel; each file goes straight into the store,
+# days already stored are skipped. Without pyarrow the frames are kept in memory.
+downloader = ArchiveDownloader(max_workers=DOWNLOAD_WORKERS)
+all_dormagen_data = downloader.download(sensor_ids, dates, keep_frames=not HAS_PYARROW)
+print(f"\n  Files: {downloader.stats['files']}, skipped (stored): {downloader.stats['skipped']}, "
+      f"missing: {downloader.stats['missing']}, errors: {downloader.stats['errors']}")
+
+if HAS_PYARROW and sensor_ids:
+    # CSV export for tools that still read it, assembled from the store
+    stored = read_measurements('sensor_community', filters=[
+        ('sensor_id', 'in', [str(s) for s in sensor_ids]),
+        ('date', 'in', dates),
+    ])
+    if not stored.empty:
+        all_dormagen_data = [stored]
 
 if all_dormagen_data:
     dormagen_df = pd.concat(all_dormagen_data, ignore_index=True)
@@ -88,6 +74,8 @@ if all_dormagen_data:
     
     print(f"\n✓ Mobilithek Dormagen data saved!")
     print(f"  File: {output_file}")
+    if HAS_PYARROW:
+        print(f"  Store: {source_path('sensor_community')}")
     print(f"  Records: {len(dormagen_df)}")
     print(f"  Columns: {list(dormagen_df.columns)[:8]}...")
 else:
@@ -136,10 +124,8 @@ try:
     
     print(f"Downloading Cairo weather data ({start_date_str} to {end_date_str})...")
     
-    response = requests.get(archive_url, params=params, timeout=30)
-    response.raise_for_status()
-    
-    data = response.json()
+    # Identical date ranges are served from the local cache
+    data = cached_get_json(archive_url, params=params, timeout=30, max_age=3600)
     hourly = data.get('hourly', {})
     
     # Create DataFrame
@@ -159,6 +145,9 @@ try:
     
     print(f"\n✓ Open-Meteo Egypt data saved!")
     print(f"  File: {output_file}")
+    if HAS_PYARROW:
+        write_measurements(egypt_df, 'openmeteo')
+        print(f"  Store: {source_path('openmeteo')}")
     print(f"  Records: {len(egypt_df)}")
     print(f"  Date range: {egypt_df['timestamp'].min()} to {egypt_df['timestamp'].max()}")
     
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+FROST Bulk Observation Writer
+Packs many Observations per Datastream into SensorThings dataArray
+requests (POST /CreateObservations) instead of one request per value
+"""
+
+import http_client
+from instrumentation import record_points
+
+FROST_URL = "http://localhost:8091/FROST-Server/v1.1"
+
+# Observations per CreateObservations request
+DEFAULT_CHUNK_SIZE = 5000
+
+DATA_ARRAY_COMPONENTS = ["phenomenonTime", "result"]
+
+
+def format_phenomenon_time(timestamp) -> str:
+    """Bring a timestamp (str, datetime or pandas Timestamp) into ISO 8601 UTC"""
+    if isinstance(timestamp, str):
+        # Ensure proper ISO format with time
+        if 'T' not in timestamp:
+            return f"{timestamp}T00:00:00Z"
+        return timestamp
+
+    if timestamp.tzinfo is None:
+        return timestamp.isoformat() + "Z"
+    return timestamp.isoformat()
+
+
+def build_data_array(datastream_id: int, rows: list) -> dict:
+    """Build one dataArray entry for a Datastream from (phenomenonTime, result) rows"""
+    return {
+        "Datastream": {"@iot.id": datastream_id},
+        "components": DATA_ARRAY_COMPONENTS,
+        "dataArray@iot.count": len(rows),
+        "dataArray": [[format_phenomenon_time(t), v] for t, v in rows]
+    }
+
+
+def iter_chunks(observations: dict, chunk_size: int):
+    """
+    Split {datastream_id: [(time, result), ...]} into request-sized chunks.
+
+    A chunk may hold several Datastreams; each yielded item is a list of
+    (datastream_id, start_index, rows) so failures can be traced back to
+    the original row positions.
+    """
+    if chunk_size < 1:
+        # A zero or negative size would never advance through the rows
+        raise ValueError(f"chunk_size must be at least 1, got {chunk_size}")
+    chunk = []
+    chunk_len = 0
+    for ds_id, rows in observations.items():
+        start = 0
+        while start < len(rows):
+            take = min(chunk_size - chunk_len, len(rows) - start)
+            chunk.append((ds_id, start, rows[start:start + take]))
+            chunk_len += take
+            start += take
+            if chunk_len >= chunk_size:
+                yield chunk
+                chunk = []
+                chunk_len = 0
+    if chunk:
+        yield chunk
+
+
+def post_observations(observations: dict, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                      frost_url: str = FROST_URL, timeout: int = 60) -> dict:
+    """
+    Create Observations in bulk via the SensorThings dataArray extension.
+
+    observations: {datastream_id: [(phenomenon_time, result), ...]}
+
+    Returns a result dict:
+        created: number of Observations created
+        failed:  {datastream_id: [row_index, ...]} rows FROST rejected
+                 (or that were part of a failed request)
+        requests: number of HTTP requests sent
+    """
+    result = {"created": 0, "failed": {}, "requests": 0}
+
+    for chunk in iter_chunks(observations, chunk_size):
+        payload = [build_data_array(ds_id, rows) for ds_id, _, rows in chunk]
+        result["requests"] += 1
+
+        try:
+            resp = http_client.post(f"{frost_url}/CreateObservations", json=payload, timeout=timeout)
+            resp.raise_for_status()
+            # One entry per row, in request order: the new Observation URL or "error"
+            statuses = resp.json()
+        except Exception as e:
+            print(f"❌ CreateObservations request failed: {e}")
+            for ds_id, start, rows in chunk:
+                result["failed"].setdefault(ds_id, []).extend(range(start, start + len(rows)))
+            continue
+
+        pos = 0
+        for ds_id, start, rows in chunk:
+            for offset in range(len(rows)):
+                status = statuses[pos] if pos < len(statuses) else "error"
+                pos += 1
+                if isinstance(status, str) and status.startswith("http"):
+                    result["created"] += 1
+                else:
+                    result["failed"].setdefault(ds_id, []).append(start + offset)
+
+    record_points("FROST", result["created"])
+    return result
+
+
+def post_datastream_observations(datastream_id: int, rows: list,
+                                 chunk_size: int = DEFAULT_CHUNK_SIZE,
+                                 frost_url: str = FROST_URL) -> dict:
+    """Convenience wrapper for a single Datastream"""
+    return post_observations({datastream_id: rows}, chunk_size=chunk_size, frost_url=frost_url)
+
+
+def print_summary(result: dict, indent: str = "   "):
+    """Print created/failed counts of a post_observations() result"""
+    failed = sum(len(rows) for rows in result["failed"].values())
+    print(f"{indent}📊 {result['created']} Observations created in {result['requests']} request(s)")
+    if failed:
+        print(f"{indent}⚠️  {failed} Observations failed:")
+        for ds_id, rows in result["failed"].items():
+            preview = ", ".join(str(r) for r in rows[:10])
+            more = f" ... (+{len(rows) - 10})" if len(rows) > 10 else ""
+            print(f"{indent}   Datastream {ds_id}: rows {preview}{more}")
@@ -4,11 +4,21 @@ FROST SensorThings API Data Loader
 Fetches the same environmental data as TIG project and pushes to FROST Server
 """
 
-import requests
 import json
+
+import requests
 from datetime import datetime, timezone
 
+import http_client
+from frost_bulk import post_observations, print_summary
+from frost_registry import FrostRegistry
+import instrumentation
+
 FROST_URL = "http://localhost:8091/FROST-Server/v1.1"
+FROST_CHUNK_SIZE = 5000  # Observations per CreateObservations request
+
+# name -> @iot.id map, so entities are only created once
+REGISTRY = FrostRegistry(frost_url=FROST_URL)
 
 # === Data Sources (same as TIG project) ===
 OPENSENSEMAP_BOX_ID = "67937b67c326f20007ef99ca"
@@ -18,21 +28,13 @@ HAMBURG_HALM_URL = "https://api.hamburg.de/datasets/v1/luftmessnetz/collections/
 
 
 def create_thing(name: str, description: str, properties: dict = None) -> int:
-    """Create a Thing in FROST and return its ID"""
+    """Create a Thing in FROST (or reuse the registered one) and return its ID"""
     payload = {
         "name": name,
         "description": description,
         "properties": properties or {}
     }
-    resp = requests.post(f"{FROST_URL}/Things", json=payload)
-    if resp.status_code == 201:
-        location = resp.headers.get("Location", "")
-        thing_id = int(location.split("(")[-1].rstrip(")"))
-        print(f"✅ Created Thing: {name} (ID: {thing_id})")
-        return thing_id
-    else:
-        print(f"❌ Failed to create Thing {name}: {resp.status_code} - {resp.text}")
-        return None
+    return REGISTRY.ensure("Things", payload)
 
 
 def create_location(name: str, description: str, lat: float, lon: float, thing_id: int) -> int:
@@ -46,15 +48,7 @@ def create_location(name: str, description: str, lat: float, lon: float, thing_i
             "coordinates": [lon, lat]
         }
     }
-    resp = requests.post(f"{FROST_URL}/Things({thing_id})/Locations", json=payload)
-    if resp.status_code == 201:
-        location = resp.headers.get("Location", "")
-        loc_id = int(location.split("(")[-1].rstrip(")"))
-        print(f"✅ Created Location: {name} (ID: {loc_id})")
-        return loc_id
-    else:
-        print(f"❌ Failed to create Location {name}: {resp.status_code} - {resp.text}")
-        return None
+    return REGISTRY.ensure("Locations", payload, path=f"Things({thing_id})/Locations")
 
 
 def create_observed_property(name: str, definition: str, description: str) -> int:
@@ -64,15 +58,7 @@ def create_observed_property(name: str, definition: str, description: str) -> in
         "definition": definition,
         "description": description
     }
-    resp = requests.post(f"{FROST_URL}/ObservedProperties", json=payload)
-    if resp.status_code == 201:
-        location = resp.headers.get("Location", "")
-        prop_id = int(location.split("(")[-1].rstrip(")"))
-        print(f"✅ Created ObservedProperty: {name} (ID: {prop_id})")
-        return prop_id
-    else:
-        print(f"❌ Failed to create ObservedProperty {name}: {resp.status_code} - {resp.text}")
-        return None
+    return REGISTRY.ensure("ObservedProperties", payload)
 
 
 def create_sensor(name: str, description: str, encoding_type: str = "text/html", metadata: str = "") -> int:
@@ -83,15 +69,7 @@ def create_sensor(name: str, description: str, encoding_type: str = "text/html",
         "encodingType": encoding_type,
         "metadata": metadata or f"https://example.org/sensors/{name.replace(' ', '_')}"
     }
-    resp = requests.post(f"{FROST_URL}/Sensors", json=payload)
-    if resp.status_code == 201:
-        location = resp.headers.get("Location", "")
-        sensor_id = int(location.split("(")[-1].rstrip(")"))
-        print(f"✅ Created Sensor: {name} (ID: {sensor_id})")
-        return sensor_id
-    else:
-        print(f"❌ Failed to create Sensor {name}: {resp.status_code} - {resp.text}")
-        return None
+    return REGISTRY.ensure("Sensors", payload)
 
 
 def create_datastream(name: str, description: str, thing_id: int, sensor_id: int, 
@@ -111,15 +89,7 @@ def create_datastream(name: str, description: str, thing_id: int, sensor_id: int
         "Sensor": {"@iot.id": sensor_id},
         "ObservedProperty": {"@iot.id": observed_property_id}
     }
-    resp = requests.post(f"{FROST_URL}/Datastreams", json=payload)
-    if resp.status_code == 201:
-        location = resp.headers.get("Location", "")
-        ds_id = int(location.split("(")[-1].rstrip(")"))
-        print(f"✅ Created Datastream: {name} (ID: {ds_id})")
-        return ds_id
-    else:
-        print(f"❌ Failed to create Datastream {name}: {resp.status_code} - {resp.text}")
-        return None
+    return REGISTRY.ensure("Datastreams", payload)
 
 
 def create_observation(datastream_id: int, result: float, phenomenon_time: str = None) -> bool:
@@ -136,7 +106,7 @@ def create_observation(datastream_id: int, result: float, phenomenon_time: str =
         "result": result,
         "Datastream": {"@iot.id": datastream_id}
     }
-    resp = requests.post(f"{FROST_URL}/Observations", json=payload)
+    resp = http_client.post(f"{FROST_URL}/Observations", json=payload)
     if resp.status_code == 201:
         return True
     else:
@@ -148,7 +118,7 @@ def fetch_opensensemap_data():
     """Fetch data from OpenSenseMap API"""
     print("\n📡 Fetching data from OpenSenseMap...")
     try:
-        resp = requests.get(OPENSENSEMAP_URL, timeout=30)
+        resp = http_client.get(OPENSENSEMAP_URL, timeout=30)
         resp.raise_for_status()
         data = resp.json()
         
@@ -202,7 +172,7 @@ def fetch_hamburg_halm_data():
     """Fetch data from Hamburg Luftmessnetz API"""
     print("\n📡 Fetching data from Hamburg HaLm...")
     try:
-        resp = requests.get(HAMBURG_HALM_URL, timeout=30)
+        resp = http_client.get(HAMBURG_HALM_URL, timeout=30)
         resp.raise_for_status()
         data = resp.json()
         
@@ -249,6 +219,10 @@ def setup_frost_entities():
     """Set up all FROST entities (Things, Sensors, ObservedProperties, Datastreams)"""
     print("\n🔧 Setting up FROST entities...")
     
+    # One expanded query confirms everything that already exists
+    confirmed = REGISTRY.sync(thing_names=["OpenSenseMap Hamburg", "Hamburg Altona-Elbhang (80KT)"])
+    print(f"   Registry: {confirmed} entities confirmed ({REGISTRY.summary()})")
+    
     entities = {}
     
     # === Create ObservedProperties ===
@@ -370,6 +344,9 @@ def load_observations(entities: dict):
     """Fetch data from APIs and create observations in FROST"""
     print("\n📊 Loading observations...")
     
+    # Collected per Datastream and uploaded in one CreateObservations request
+    observations = {}
+    
     # Fetch OpenSenseMap data
     osm_data = fetch_opensensemap_data()
     if osm_data:
@@ -385,9 +362,9 @@ def load_observations(entities: dict):
             if sensor_key in osm_data["sensors"] and ds_key in entities["datastreams"]:
                 sensor_data = osm_data["sensors"][sensor_key]
                 ds_id = entities["datastreams"][ds_key]
-                success = create_observation(ds_id, sensor_data["value"], sensor_data.get("time"))
-                if success:
-                    print(f"   ✅ {sensor_key}: {sensor_data['value']}")
+                phenomenon_time = sensor_data.get("time") or datetime.now(timezone.utc).isoformat()
+                observations.setdefault(ds_id, []).append((phenomenon_time, sensor_data["value"]))
+                print(f"   ➕ {sensor_key}: {sensor_data['value']}")
     
     # Fetch Hamburg HaLm data
     halm_data = fetch_hamburg_halm_data()
@@ -405,15 +382,19 @@ def load_observations(entities: dict):
             if sensor_key in halm_data["sensors"] and ds_key in entities["datastreams"]:
                 sensor_data = halm_data["sensors"][sensor_key]
                 ds_id = entities["datastreams"][ds_key]
-                success = create_observation(ds_id, sensor_data["value"], timestamp)
-                if success:
-                    print(f"   ✅ {sensor_key}: {sensor_data['value']}")
+                phenomenon_time = timestamp or datetime.now(timezone.utc).isoformat()
+                observations.setdefault(ds_id, []).append((phenomenon_time, sensor_data["value"]))
+                print(f"   ➕ {sensor_key}: {sensor_data['value']}")
+    
+    if observations:
+        result = post_observations(observations, chunk_size=FROST_CHUNK_SIZE, frost_url=FROST_URL)
+        print_summary(result)
 
 
 def check_frost_connection():
     """Check if FROST server is available"""
     try:
-        resp = requests.get(f"{FROST_URL}", timeout=5)
+        resp = http_client.get(f"{FROST_URL}", timeout=5)
         if resp.status_code == 200:
             print(f"✅ FROST Server is running at {FROST_URL}")
             return True
@@ -432,6 +413,8 @@ def main():
     print("    Fetching same data as TIG project")
     print("=" * 60)
     
+    instrumentation.instrument_requests()
+    
     if not check_frost_connection():
         return
     
@@ -440,6 +423,7 @@ def main():
     
     # Load observations
     load_observations(entities)
+    instrumentation.print_summary()
     
     print("\n" + "=" * 60)
     print("✅ Data loading complete!")
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+FROST Entity Registry
+Local JSON map of entity names to @iot.id, checked against FROST with a
+single $filter/$expand query on startup. Only entities that are missing
+are created, so re-running the loaders does not pile up duplicates.
+"""
+
+import json
+import os
+
+import http_client
+
+FROST_URL = "http://localhost:8091/FROST-Server/v1.1"
+REGISTRY_FILE = "config/frost_registry.json"
+
+ENTITY_KINDS = ["ObservedProperties", "Sensors", "Things", "Locations", "Datastreams"]
+
+SINGULAR = {
+    "ObservedProperties": "ObservedProperty",
+    "Sensors": "Sensor",
+    "Things": "Thing",
+    "Locations": "Location",
+    "Datastreams": "Datastream",
+}
+
+SYNC_EXPAND = (
+    "Locations($select=id,name),"
+    "Datastreams($select=id,name;$expand=Sensor($select=id,name),ObservedProperty($select=id,name))"
+)
+
+
+def odata_quote(value: str) -> str:
+    """Quote a string literal for use in a $filter expression"""
+    return "'" + value.replace("'", "''") + "'"
+
+
+def id_from_location(resp) -> int:
+    """Extract the new entity ID from a 201 response Location header"""
+    location = resp.headers.get("Location", "")
+    return int(location.split("(")[-1].rstrip(")"))
+
+
+class FrostRegistry:
+    """Name -> @iot.id registry per entity kind, persisted as JSON"""
+
+    def __init__(self, path: str = REGISTRY_FILE, frost_url: str = FROST_URL, timeout: int = 30):
+        self.path = path
+        self.frost_url = frost_url
+        self.timeout = timeout
+        self.ids = {kind: {} for kind in ENTITY_KINDS}
+        self.confirmed = {kind: set() for kind in ENTITY_KINDS}
+        self.missing_things = set()  # queried by sync() and not found
+        self.load()
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def load(self):
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        # A registry written against another server is meaningless here
+        if data.get("frost_url") != self.frost_url:
+            return
+        for kind in ENTITY_KINDS:
+            self.ids[kind].update(data.get("entities", {}).get(kind, {}))
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with open(self.path, 'w') as f:
+            json.dump({"frost_url": self.frost_url, "entities": self.ids}, f, indent=2, ensure_ascii=False)
+
+    # ------------------------------------------------------------------
+    # Sync
+    # ------------------------------------------------------------------
+
+    def sync(self, thing_names: list = None) -> int:
+        """
+        Verify the registry against FROST with one expanded Things query.
+
+        Things (registered plus thing_names) are fetched together with their
+        Locations, Datastreams and the Sensors/ObservedProperties those
+        Datastreams use. Registry entries that FROST no longer knows are
+        dropped. Returns the number of confirmed entities.
+        """
+        names = sorted(set(self.ids["Things"]) | set(thing_names or []))
+        if not names:
+            return 0
+
+        # name -> set of IDs (several if duplicates were created in the past)
+        found = {kind: {} for kind in ENTITY_KINDS}
+        url = f"{self.frost_url}/Things"
+        params = {
+            "$select": "id,name",
+            "$filter": " or ".join(f"name eq {odata_quote(n)}" for n in names),
+            "$expand": SYNC_EXPAND,
+            "$top": 1000,
+        }
+
+        try:
+            while url:
+                resp = http_client.get(url, params=params, timeout=self.timeout)
+                resp.raise_for_status()
+                data = resp.json()
+                for thing in data.get("value", []):
+                    self._found(found, "Things", thing)
+                    for loc in thing.get("Locations", []):
+                        self._found(found, "Locations", loc)
+                    for ds in thing.get("Datastreams", []):
+                        self._found(found, "Datastreams", ds)
+                        if ds.get("Sensor"):
+                            self._found(found, "Sensors", ds["Sensor"])
+                        if ds.get("ObservedProperty"):
+                            self._found(found, "ObservedProperties", ds["ObservedProperty"])
+                # nextLink already carries the query options
+                url, params = data.get("@iot.nextLink"), None
+        except Exception as e:
+            print(f"⚠️  FROST registry sync failed, falling back to per-entity lookups: {e}")
+            return 0
+
+        for kind in ENTITY_KINDS:
+            # Keep the registered ID if FROST still has it, else take the oldest match
+            for name, entity_ids in found[kind].items():
+                if self.ids[kind].get(name) not in entity_ids:
+                    self.ids[kind][name] = min(entity_ids)
+            for name in list(self.ids[kind]):
+                if name in found[kind]:
+                    self.confirmed[kind].add(name)
+                elif kind in ("Things", "Locations", "Datastreams"):
+                    # Fully covered by the query: not found means gone
+                    del self.ids[kind][name]
+
+        self.missing_things = set(names) - set(found["Things"])
+        self.save()
+        return sum(len(c) for c in self.confirmed.values())
+
+    @staticmethod
+    def _found(found: dict, kind: str, entity: dict):
+        found[kind].setdefault(entity["name"], set()).add(entity["@iot.id"])
+
+    # ------------------------------------------------------------------
+    # Lookup / create
+    # ------------------------------------------------------------------
+
+    def lookup(self, kind: str, name: str):
+        """Find an existing entity by name on the server (oldest first)"""
+        try:
+            resp = http_client.get(
+                f"{self.frost_url}/{kind}",
+                params={"$select": "id", "$filter": f"name eq {odata_quote(name)}",
+                        "$orderby": "id asc", "$top": 1},
+                timeout=self.timeout
+            )
+            resp.raise_for_status()
+            values = resp.json().get("value", [])
+            return values[0]["@iot.id"] if values else None
+        except Exception as e:
+            print(f"⚠️  Lookup of {SINGULAR[kind]} {name} failed: {e}")
+            return None
+
+    def ensure(self, kind: str, payload: dict, path: str = None):
+        """
+        Return the ID of the entity named payload['name'], creating it only if
+        neither the registry nor FROST knows it. path overrides the POST target
+        (e.g. "Things(1)/Locations").
+        """
+        name = payload["name"]
+
+        if name in self.confirmed[kind]:
+            return self.ids[kind][name]
+
+        # Registered but not covered by sync (Sensors/ObservedProperties), or unknown
+        entity_id = None
+        if not (kind == "Things" and name in self.missing_things):
+            entity_id = self.lookup(kind, name)
+        if entity_id is None:
+            resp = http_client.post(f"{self.frost_url}/{path or kind}", json=payload, timeout=self.timeout)
+            if resp.status_code != 201:
+                print(f"❌ Failed to create {SINGULAR[kind]} {name}: {resp.status_code} - {resp.text}")
+                return None
+            entity_id = id_from_location(resp)
+            print(f"✅ Created {SINGULAR[kind]}: {name} (ID: {entity_id})")
+
+        self.ids[kind][name] = entity_id
+        self.confirmed[kind].add(name)
+        self.save()
+        return entity_id
+
+    def summary(self) -> str:
+        return ", ".join(f"{len(self.ids[kind])} {kind}" for kind in ENTITY_KINDS)
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Incremental Historical Sync
+Keeps a rolling history (default 90 days) in the columnar store. A
+high-water mark per source and sensor (data/store/sync_state.json) records
+how far data has been stored; each run fetches only the days / hours after
+it and prunes partitions that fell out of the retention window. In steady
+state a run downloads one day per sensor.
+
+    python scripts/historical_sync.py [--days 90]
+
+The 7-day CSV exports in data/historical/ are refreshed from the store.
+"""
+
+import argparse
+import os
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from http_cache import cached_get_json
+from columnar_store import (HAS_PYARROW, CSV_FILES, STORE_ROOT, write_measurements,
+                            read_measurements, stored_dates, prune)
+from archive_downloader import ArchiveDownloader, find_area_sensors
+from json_state import load_state, save_state
+
+# {source: {sensor_id: high-water mark}}; dates for daily, ISO hours for hourly sources
+STATE_FILE = os.path.join(STORE_ROOT, "sync_state.json")
+RETENTION_DAYS = 90
+EXPORT_DAYS = 7
+DOWNLOAD_WORKERS = 8
+
+DORMAGEN_AREA = (51.0946, 6.8407, 5)
+
+CAIRO = {
+    "latitude": 30.0444,
+    "longitude": 31.2357,
+    "timezone": "Africa/Cairo",
+}
+OPENMETEO_ARCHIVE_URL = "https://archive-api.open-meteo.com/v1/archive"
+OPENMETEO_VARIABLES = ["temperature_2m", "relative_humidity_2m", "pressure_msl",
+                       "wind_speed_10m", "wind_direction_10m"]
+
+
+# =============================================================================
+# HIGH-WATER MARKS
+# =============================================================================
+
+def day_range(first: str, last: str) -> list:
+    """All YYYY-MM-DD dates from first to last (inclusive)"""
+    if first > last:
+        return []
+    return [d.strftime('%Y-%m-%d') for d in pd.date_range(first, last, freq='D')]
+
+
+def next_day(date_str: str) -> str:
+    return (datetime.strptime(date_str, '%Y-%m-%d') + timedelta(days=1)).strftime('%Y-%m-%d')
+
+
+# =============================================================================
+# SENSOR.COMMUNITY (daily archive files)
+# =============================================================================
+
+def sync_sensor_community(state: dict, retention_start: str, today: str) -> int:
+    """Fetch archive days after each sensor's high-water mark; returns files downloaded"""
+    marks = state.setdefault("sensor_community", {})
+
+    # Sensors: known ones plus those currently reporting in the area
+    sensor_ids = set(marks) | set(stored_dates("sensor_community"))
+    try:
+        sensor_ids |= {str(s) for s in find_area_sensors(*DORMAGEN_AREA)}
+    except Exception as e:
+        print(f"  ⚠ Sensor discovery failed, syncing known sensors only: {e}")
+
+    # Archive files only exist for completed days
+    last_day = (datetime.strptime(today, '%Y-%m-%d') - timedelta(days=1)).strftime('%Y-%m-%d')
+    stored = stored_dates("sensor_community")
+
+    tasks = []
+    for sensor_id in sorted(sensor_ids):
+        mark = marks.get(sensor_id)
+        if mark is None and stored.get(sensor_id):
+            # No state yet (e.g. imported CSV): continue after the newest stored day
+            mark = stored[sensor_id][-1]
+        first = max(next_day(mark), retention_start) if mark else retention_start
+        tasks += [(sensor_id, day) for day in day_range(first, last_day)]
+
+    print(f"  {len(sensor_ids)} sensors, {len(tasks)} sensor-days to fetch")
+    downloader = ArchiveDownloader(max_workers=DOWNLOAD_WORKERS)
+    downloader.download_tasks(tasks)
+
+    # Advance each mark over consecutive days that are done; a failed day
+    # stops it so the day is retried next run. Days without a file count as
+    # done, the archive does not fill them in later.
+    for sensor_id in sorted(sensor_ids):
+        for day in sorted(d for s, d in tasks if s == sensor_id):
+            if downloader.outcomes.get((sensor_id, day)) == "error":
+                break
+            marks[sensor_id] = day
+
+    print(f"  ✓ {downloader.stats['files']} files, {downloader.stats['records']} records "
+          f"({downloader.stats['missing']} missing, {downloader.stats['errors']} errors)")
+    return downloader.stats['files']
+
+
+# =============================================================================
+# OPEN-METEO (hourly archive)
+# =============================================================================
+
+def sync_openmeteo(state: dict, retention_start: str, today: str) -> int:
+    """Fetch hours after the high-water mark; returns new hourly rows"""
+    marks = state.setdefault("openmeteo", {})
+    mark = marks.get("cairo")
+
+    # Re-request the mark's day: its partition is rewritten as a whole, so the
+    # stored hours of that day must be part of the write
+    start = max(mark[:10], retention_start) if mark else retention_start
+    params = dict(CAIRO, start_date=start, end_date=today, hourly=",".join(OPENMETEO_VARIABLES))
+    data = cached_get_json(OPENMETEO_ARCHIVE_URL, params=params, timeout=30, max_age=3600)
+    hourly = data.get('hourly', {})
+
+    df = pd.DataFrame({'timestamp': hourly.get('time', [])})
+    for variable in OPENMETEO_VARIABLES:
+        df[variable] = hourly.get(variable)
+    df['location'] = 'Cairo, Egypt'
+    df['source'] = 'Open-Meteo Archive'
+
+    # The archive lags a few days behind; hours not yet published come back empty
+    df = df[df['temperature_2m'].notna()]
+    if df.empty:
+        print("  ✓ Open-Meteo: nothing new")
+        return 0
+
+    new_rows = int((df['timestamp'] > mark).sum()) if mark else len(df)
+    write_measurements(df, 'openmeteo')
+    marks["cairo"] = df['timestamp'].max()
+    print(f"  ✓ Open-Meteo: {new_rows} new hours (up to {marks['cairo']})")
+    return new_rows
+
+
+# =============================================================================
+# EXPORT / MAIN
+# =============================================================================
+
+def export_csv(source: str, days: int = EXPORT_DAYS):
+    """Refresh the CSV export with the last days from the store"""
+    since = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
+    df = read_measurements(source, filters=[('date', '>=', since)])
+    if not df.empty:
+        df.to_csv(CSV_FILES[source], index=False)
+        print(f"  ✓ {CSV_FILES[source]} ({len(df)} rows)")
+
+
+def sync(retention_days: int = RETENTION_DAYS):
+    if not HAS_PYARROW:
+        raise RuntimeError("pyarrow is required for the incremental sync (pip install pyarrow)")
+
+    today = datetime.now().strftime('%Y-%m-%d')
+    retention_start = (datetime.now() - timedelta(days=retention_days)).strftime('%Y-%m-%d')
+    state = load_state(STATE_FILE)
+
+    print(f"\n📡 Sensor.community (Dormagen), retention from {retention_start}")
+    try:
+        sync_sensor_community(state, retention_start, today)
+    finally:
+        save_state(state, STATE_FILE)
+
+    print("\n🌍 Open-Meteo (Cairo)")
+    try:
+        sync_openmeteo(state, retention_start, today)
+    except Exception as e:
+        print(f"  ✗ Open-Meteo sync failed: {e}")
+    save_state(state, STATE_FILE)
+
+    print("\n🧹 Retention")
+    for source in ("sensor_community", "openmeteo"):
+        removed = prune(source, retention_start)
+        print(f"  {source}: {removed} partitions removed")
+
+    print("\n📄 CSV exports")
+    os.makedirs('data/historical', exist_ok=True)
+    for source in ("sensor_community", "openmeteo"):
+        export_csv(source)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incremental historical data sync")
+    parser.add_argument('--days', type=int, default=RETENTION_DAYS, help="rolling history length in days")
+    args = parser.parse_args()
+
+    print("\n" + "="*80)
+    print("INCREMENTAL HISTORICAL SYNC")
+    print("="*80)
+    sync(args.days)
+    print("\n" + "="*80 + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+On-disk HTTP Response Cache
+Caches GET responses keyed by URL + query parameters under data/cache/http.
+Entries are revalidated with ETag / Last-Modified, the cache is trimmed to
+a size limit (least recently used first), and offline mode serves from
+the cache only.
+
+Offline mode: set MIKROKLIMA_OFFLINE=1 or call set_offline(True).
+"""
+
+import hashlib
+import json
+import os
+import time
+
+import requests
+
+import http_client
+
+CACHE_DIR = "data/cache/http"
+MAX_CACHE_BYTES = 512 * 1024 * 1024
+
+_offline = os.environ.get("MIKROKLIMA_OFFLINE", "") not in ("", "0")
+
+
+class CacheMiss(Exception):
+    """Raised in offline mode when a response is not cached"""
+
+
+def set_offline(offline: bool = True):
+    global _offline
+    _offline = offline
+
+
+def is_offline() -> bool:
+    return _offline
+
+
+def cache_key(url: str, params: dict = None) -> str:
+    """Stable key for URL + parameters (parameter order does not matter)"""
+    normalized = json.dumps([url, sorted((params or {}).items())], default=str)
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+def _paths(key: str):
+    return os.path.join(CACHE_DIR, f"{key}.bin"), os.path.join(CACHE_DIR, f"{key}.json")
+
+
+def _read_entry(key: str):
+    body_path, meta_path = _paths(key)
+    try:
+        with open(meta_path, 'r') as f:
+            meta = json.load(f)
+        with open(body_path, 'rb') as f:
+            body = f.read()
+        return meta, body
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None, None
+
+
+def _touch(key: str):
+    """Mark an entry as recently used (eviction is LRU by mtime)"""
+    for path in _paths(key):
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+
+
+def _write_entry(key: str, url: str, params: dict, resp):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    body_path, meta_path = _paths(key)
+    meta = {
+        "url": url,
+        "params": params or {},
+        "etag": resp.headers.get("ETag"),
+        "last_modified": resp.headers.get("Last-Modified"),
+        "fetched_at": time.time(),
+        "size": len(resp.content),
+    }
+    # Write body first, so a meta file always points to a complete body
+    tmp_path = body_path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(resp.content)
+    os.replace(tmp_path, body_path)
+    with open(meta_path, 'w') as f:
+        json.dump(meta, f)
+
+
+def evict(max_bytes: int = MAX_CACHE_BYTES) -> int:
+    """Delete least recently used entries until the cache fits max_bytes; returns bytes freed"""
+    if not os.path.isdir(CACHE_DIR):
+        return 0
+
+    entries = []
+    total = 0
+    for name in os.listdir(CACHE_DIR):
+        if not name.endswith(".bin"):
+            continue
+        path = os.path.join(CACHE_DIR, name)
+        stat = os.stat(path)
+        entries.append((stat.st_mtime, stat.st_size, name[:-4]))
+        total += stat.st_size
+
+    freed = 0
+    for _, size, key in sorted(entries):
+        if total - freed <= max_bytes:
+            break
+        for path in _paths(key):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        freed += size
+    return freed
+
+
+def cached_get(url: str, params: dict = None, timeout: int = 60,
+               max_age: float = None, immutable: bool = False) -> bytes:
+    """
+    GET url and return the response body, using the on-disk cache.
+
+    max_age:   serve a cached entry younger than this many seconds without
+               contacting the server
+    immutable: serve any cached entry without revalidation (e.g. archive
+               queries for a closed date range)
+
+    Otherwise the cached entry is revalidated with If-None-Match /
+    If-Modified-Since; a 304 serves it from disk. If the server cannot be
+    reached, a stale entry is returned instead of failing.
+    """
+    key = cache_key(url, params)
+    meta, body = _read_entry(key)
+
+    if meta is not None:
+        age = time.time() - meta.get("fetched_at", 0)
+        if _offline or immutable or (max_age is not None and age < max_age):
+            _touch(key)
+            return body
+    elif _offline:
+        raise CacheMiss(f"Offline and not cached: {url}")
+
+    headers = {}
+    if meta is not None:
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    try:
+        resp = http_client.get(url, params=params, headers=headers, timeout=timeout)
+        if resp.status_code == 304 and meta is not None:
+            meta["fetched_at"] = time.time()
+            with open(_paths(key)[1], 'w') as f:
+                json.dump(meta, f)
+            return body
+        resp.raise_for_status()
+    except requests.exceptions.RequestException as e:
+        if meta is not None:
+            print(f"⚠️  {e} - using cached copy of {url}")
+            _touch(key)
+            return body
+        raise
+
+    _write_entry(key, url, params, resp)
+    evict()
+    return resp.content
+
+
+def cached_get_json(url: str, params: dict = None, **kwargs):
+    """cached_get() for JSON APIs"""
+    return json.loads(cached_get(url, params=params, **kwargs))
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP Client
+One pooled requests session per process instead of a new TCP (and TLS)
+connection per call:
+
+- keep-alive connection pools per host (urllib3 PoolManager),
+- a default timeout on every request (connect, read),
+- retries with exponential backoff on connection errors and 429/5xx,
+  honouring Retry-After,
+- gzip: compressed responses are requested and decoded, gzip_body()
+  compresses request bodies for servers that accept it (InfluxDB writes).
+
+Only idempotent methods are retried here. POSTs that are safe to repeat
+(InfluxDB line protocol, ThingsBoard ts/values) keep their own retry
+loops; entity-creating POSTs (FROST) are never retried blindly.
+
+    import http_client
+    resp = http_client.get(url, params=params)          # shared session
+    session = http_client.create_session(headers=auth)  # own headers, same defaults
+"""
+
+import gzip
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import instrumentation
+
+DEFAULT_TIMEOUT = (5, 30)     # seconds: connect, read
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5         # seconds, doubled per retry (0.5, 1, 2, ...)
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+POOL_HOSTS = 16               # host pools kept per session
+POOL_SIZE = 16                # keep-alive connections per host
+
+GZIP_LEVEL = 1                # fast; line protocol still shrinks ~5-10x
+USER_AGENT = "mikroklima-hamburg/1.0"
+
+
+class _CountingRetry(Retry):
+    """urllib3 Retry that reports each retry to the instrumentation layer"""
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        host = f"{_pool.host}:{_pool.port}" if _pool is not None else "unknown"
+        reason = f"HTTP {response.status}" if response is not None else type(error).__name__
+        instrumentation.count("http_retries_total", host=host, reason=reason)
+        return super().increment(method, url, response, error, _pool, _stacktrace)
+
+
+class HttpSession(requests.Session):
+    """requests.Session with pooled adapters, retries and a default timeout"""
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, retries: int = DEFAULT_RETRIES,
+                 backoff: float = DEFAULT_BACKOFF, pool_size: int = POOL_SIZE,
+                 headers: dict = None):
+        super().__init__()
+        self.timeout = timeout
+        retry = _CountingRetry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=backoff,
+            status_forcelist=RETRY_STATUS_CODES,
+            respect_retry_after_header=True,
+            # Return the last response instead of raising, callers check status codes
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=POOL_HOSTS, pool_maxsize=pool_size, max_retries=retry)
+        self.mount("http://", adapter)
+        self.mount("https://", adapter)
+        self.headers.update({"Accept-Encoding": "gzip, deflate", "User-Agent": USER_AGENT})
+        if headers:
+            self.headers.update(headers)
+
+    def request(self, method, url, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        return super().request(method, url, **kwargs)
+
+
+def create_session(**kwargs) -> HttpSession:
+    """New session (e.g. with auth headers) using the shared defaults"""
+    return HttpSession(**kwargs)
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> HttpSession:
+    """Process-wide session without per-service headers"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = HttpSession()
+        return _session
+
+
+def get(url, **kwargs) -> requests.Response:
+    return get_session().get(url, **kwargs)
+
+
+def post(url, **kwargs) -> requests.Response:
+    return get_session().post(url, **kwargs)
+
+
+def gzip_body(data: bytes) -> bytes:
+    """Compress a request body (send with Content-Encoding: gzip)"""
+    return gzip.compress(data, compresslevel=GZIP_LEVEL)
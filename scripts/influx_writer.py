@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Shared InfluxDB Write Pipeline
+One long-lived writer per process: buffers points as line protocol,
+flushes by size or time and retries failed batches with backoff
+"""
+
+import atexit
+import threading
+import time
+from datetime import datetime, timezone
+
+import requests
+
+import http_client
+from instrumentation import record_points, record_retry
+
+INFLUXDB_URL = "http://localhost:8086"
+INFLUXDB_TOKEN = "mikroklima-super-secret-token"
+INFLUXDB_ORG = "mikroklima"
+INFLUXDB_BUCKET = "mikroklima_data"
+
+DEFAULT_BATCH_SIZE = 5000       # points per write request
+DEFAULT_FLUSH_INTERVAL = 10.0   # seconds
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_RETRY_BACKOFF = 1.0     # seconds, doubled per attempt
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+# ============================================================================
+# LINE PROTOCOL
+# ============================================================================
+
+def _escape_key(value) -> str:
+    """Escape measurement names, tag keys/values and field keys"""
+    return str(value).replace('\\', '\\\\').replace(',', '\\,').replace('=', '\\=').replace(' ', '\\ ')
+
+
+def _escape_measurement(value) -> str:
+    return str(value).replace('\\', '\\\\').replace(',', '\\,').replace(' ', '\\ ')
+
+
+def _format_field(value) -> str:
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, int):
+        return f"{value}i"
+    if isinstance(value, float):
+        return repr(value)
+    escaped = str(value).replace('\\', '\\\\').replace('"', '\\"')
+    return f'"{escaped}"'
+
+
+def to_epoch_ns(timestamp) -> int:
+    """Convert ISO string, datetime or epoch ns to epoch nanoseconds (naive = UTC)"""
+    if timestamp is None:
+        return time.time_ns()
+    if isinstance(timestamp, int):
+        return timestamp
+    if isinstance(timestamp, str):
+        timestamp = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return int(timestamp.timestamp()) * 1_000_000_000 + timestamp.microsecond * 1000
+
+
+def series_key(measurement: str, tags: dict) -> str:
+    """Measurement name and tag set of a line; reusable for all points of one series"""
+    tag_str = ''.join(
+        f",{_escape_key(k)}={_escape_key(v)}"
+        for k, v in sorted(tags.items()) if v is not None and v != ''
+    )
+    return f"{_escape_measurement(measurement)}{tag_str}"
+
+
+def format_fields(fields: dict) -> str:
+    return ','.join(
+        f"{_escape_key(k)}={_format_field(v)}"
+        for k, v in fields.items() if v is not None
+    )
+
+
+def to_line(measurement: str, tags: dict, fields: dict, timestamp=None) -> str:
+    """Serialize one point to InfluxDB line protocol"""
+    return f"{series_key(measurement, tags)} {format_fields(fields)} {to_epoch_ns(timestamp)}"
+
+
+# ============================================================================
+# WRITER
+# ============================================================================
+
+class InfluxWriter:
+    """Buffered line-protocol writer with size/time based flushing"""
+
+    def __init__(self, url: str = INFLUXDB_URL, token: str = INFLUXDB_TOKEN,
+                 org: str = INFLUXDB_ORG, bucket: str = INFLUXDB_BUCKET,
+                 batch_size: int = DEFAULT_BATCH_SIZE,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+                 max_retries: int = DEFAULT_MAX_RETRIES,
+                 retry_backoff: float = DEFAULT_RETRY_BACKOFF,
+                 timeout: int = 30, gzip: bool = True):
+        self.write_url = f"{url}/api/v2/write"
+        self.params = {"org": org, "bucket": bucket, "precision": "ns"}
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.timeout = timeout
+        self.gzip = gzip
+
+        # Retries are handled in _send() (writes are idempotent, urllib3 only retries GETs)
+        headers = {
+            "Authorization": f"Token {token}",
+            "Content-Type": "text/plain; charset=utf-8",
+        }
+        if gzip:
+            headers["Content-Encoding"] = "gzip"
+        self.session = http_client.create_session(retries=0, timeout=timeout, headers=headers)
+
+        self.stats = {
+            "points_written": 0,
+            "points_flushed": 0,
+            "points_failed": 0,
+            "batches_flushed": 0,
+            "batches_failed": 0,
+            "retries": 0,
+        }
+
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._closed = threading.Event()
+        self._flusher = None
+        if flush_interval:
+            self._flusher = threading.Thread(target=self._flush_loop, name="influx-flusher", daemon=True)
+            self._flusher.start()
+
+    def write(self, measurement: str, tags: dict, fields: dict, timestamp=None):
+        """Queue one point; flushes when the buffer reaches batch_size"""
+        self.write_line(to_line(measurement, tags, fields, timestamp))
+
+    def write_line(self, line: str):
+        """Queue one pre-serialized line protocol record"""
+        with self._lock:
+            self._buffer.append(line)
+            self.stats["points_written"] += 1
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            self.flush()
+
+    def write_lines(self, lines: list):
+        """Queue many pre-serialized records under one lock acquisition"""
+        with self._lock:
+            self._buffer.extend(lines)
+            self.stats["points_written"] += len(lines)
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            self.flush()
+
+    def flush(self) -> bool:
+        """Write all buffered points; returns False if any batch failed"""
+        with self._flush_lock:
+            with self._lock:
+                lines, self._buffer = self._buffer, []
+
+            ok = True
+            for start in range(0, len(lines), self.batch_size):
+                batch = lines[start:start + self.batch_size]
+                if self._send(batch):
+                    self.stats["points_flushed"] += len(batch)
+                    self.stats["batches_flushed"] += 1
+                else:
+                    self.stats["points_failed"] += len(batch)
+                    self.stats["batches_failed"] += 1
+                    ok = False
+            return ok
+
+    def _send(self, batch: list) -> bool:
+        body = '\n'.join(batch).encode('utf-8')
+        if self.gzip:
+            body = http_client.gzip_body(body)
+        for attempt in range(self.max_retries + 1):
+            try:
+                resp = self.session.post(self.write_url, params=self.params, data=body, timeout=self.timeout)
+                if resp.status_code == 204:
+                    record_points("InfluxDB", len(batch))
+                    return True
+                if resp.status_code not in RETRY_STATUS_CODES:
+                    # Rejected data (e.g. 400 partial write) will not succeed on retry
+                    print(f"   InfluxDB write rejected ({resp.status_code}): {resp.text[:200]}")
+                    return False
+                error = f"HTTP {resp.status_code}"
+            except requests.exceptions.RequestException as e:
+                error = str(e)
+
+            if attempt < self.max_retries:
+                self.stats["retries"] += 1
+                record_retry("InfluxDB")
+                time.sleep(self.retry_backoff * (2 ** attempt))
+
+        print(f"   InfluxDB write failed after {self.max_retries + 1} attempts: {error}")
+        return False
+
+    def _flush_loop(self):
+        while not self._closed.wait(self.flush_interval):
+            if self._buffer:
+                self.flush()
+
+    def close(self):
+        """Flush pending points and release the connection"""
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        if self._flusher:
+            self._flusher.join(timeout=self.timeout)
+        self.flush()
+        self.session.close()
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_writer(**kwargs) -> InfluxWriter:
+    """Return the process-wide writer (created on first use, closed at exit)"""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = InfluxWriter(**kwargs)
+            atexit.register(_writer.close)
+        return _writer
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Instrumentation
+Process-wide timers and counters for the loaders: HTTP latency, bytes and
+errors per host, points written per platform, write retries and stage
+timings. Exposed in two ways:
+
+- Prometheus text format on http://<host>:<port>/metrics
+  (start_metrics_server), and
+- InfluxDB self-metrics in a dedicated measurement (write_self_metrics).
+
+HTTP traffic is measured by wrapping requests.Session.send once
+(instrument_requests), which also covers module-level requests.get/post.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+import requests
+
+SELF_METRICS_MEASUREMENT = "mikroklima_self"
+METRIC_PREFIX = "mikroklima_"
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+HELP = {
+    "http_requests_total": "HTTP requests by host, method and status",
+    "http_errors_total": "HTTP requests that raised (timeout, connection error)",
+    "http_retries_total": "Requests retried by the shared HTTP client (host, reason)",
+    "http_request_seconds": "HTTP request latency by host",
+    "http_sent_bytes_total": "Request body bytes by host",
+    "http_received_bytes_total": "Response body bytes by host",
+    "mqtt_messages_total": "MQTT messages published by host, topic and status",
+    "mqtt_sent_bytes_total": "MQTT payload bytes by host",
+    "points_written_total": "Data points handed to a platform",
+    "write_retries_total": "Retried write requests by platform",
+    "stage_seconds": "Wall time of loader stages (fetch, push, flush)",
+    "stage_failures_total": "Fetches/pushes that failed, were empty or timed out",
+}
+
+
+def _label_key(labels: dict) -> tuple:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class Histogram:
+    """Latency histogram over LATENCY_BUCKETS with sum and count"""
+
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * len(LATENCY_BUCKETS)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+
+class Registry:
+    """Thread-safe counters and histograms keyed by (name, labels)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}    # name -> {label key: value}
+        self.histograms = {}  # name -> {label key: Histogram}
+        self.started = time.time()
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self.histograms.setdefault(name, {})
+            hist = series.get(key)
+            if hist is None:
+                hist = series[key] = Histogram()
+            hist.observe(value)
+
+    def snapshot(self) -> dict:
+        """Copy of all series: {"counters": {...}, "histograms": {name: {key: (counts, sum, count)}}}"""
+        with self._lock:
+            return {
+                "counters": {name: dict(series) for name, series in self.counters.items()},
+                "histograms": {name: {key: (list(h.counts), h.sum, h.count) for key, h in series.items()}
+                               for name, series in self.histograms.items()},
+            }
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+            self.started = time.time()
+
+
+REGISTRY = Registry()
+
+
+# ============================================================================
+# RECORDING
+# ============================================================================
+
+def count(name: str, value: float = 1, **labels):
+    REGISTRY.inc(name, value, **labels)
+
+
+def record_points(platform: str, n: int):
+    """Points accepted for a platform (InfluxDB lines, FROST Observations, TB values)"""
+    if n:
+        REGISTRY.inc("points_written_total", n, platform=platform)
+
+
+def record_retry(platform: str):
+    REGISTRY.inc("write_retries_total", platform=platform)
+
+
+def record_stage(stage: str, seconds: float, **labels):
+    REGISTRY.observe("stage_seconds", seconds, stage=stage, **labels)
+
+
+@contextmanager
+def timer(stage: str, **labels):
+    """with timer("flush", platform="InfluxDB"): ..."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - start, **labels)
+
+
+def _body_size(body) -> int:
+    if body is None:
+        return 0
+    if isinstance(body, (bytes, bytearray, str)):
+        return len(body)
+    return 0  # streamed/generator bodies are not measured
+
+
+_original_send = None
+
+
+def _instrumented_send(self, request, **kwargs):
+    host = urlsplit(request.url).netloc
+    sent = _body_size(request.body)
+    start = time.perf_counter()
+    try:
+        response = _original_send(self, request, **kwargs)
+    except requests.exceptions.RequestException as e:
+        REGISTRY.observe("http_request_seconds", time.perf_counter() - start, host=host)
+        REGISTRY.inc("http_errors_total", host=host, method=request.method, error=type(e).__name__)
+        REGISTRY.inc("http_sent_bytes_total", sent, host=host)
+        raise
+    REGISTRY.observe("http_request_seconds", time.perf_counter() - start, host=host)
+    REGISTRY.inc("http_requests_total", host=host, method=request.method, status=response.status_code)
+    REGISTRY.inc("http_sent_bytes_total", sent, host=host)
+    if not kwargs.get("stream"):
+        REGISTRY.inc("http_received_bytes_total", len(response.content or b""), host=host)
+    elif response.headers.get("Content-Length", "").isdigit():
+        REGISTRY.inc("http_received_bytes_total", int(response.headers["Content-Length"]), host=host)
+    return response
+
+
+def instrument_requests():
+    """Measure every request made through the requests library (idempotent)"""
+    global _original_send
+    if _original_send is None:
+        _original_send = requests.Session.send
+        requests.Session.send = _instrumented_send
+
+
+# ============================================================================
+# EXPORT
+# ============================================================================
+
+def _escape_label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(key: tuple, extra: tuple = ()) -> str:
+    pairs = key + extra
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape_label(v)}"' for k, v in pairs) + "}"
+
+
+def prometheus_text() -> str:
+    """All metrics in the Prometheus text exposition format (version 0.0.4)"""
+    snap = REGISTRY.snapshot()
+    lines = []
+    for name, series in sorted(snap["counters"].items()):
+        full = METRIC_PREFIX + name
+        lines.append(f"# HELP {full} {HELP.get(name, name)}")
+        lines.append(f"# TYPE {full} counter")
+        for key, value in sorted(series.items()):
+            lines.append(f"{full}{_format_labels(key)} {value}")
+    for name, series in sorted(snap["histograms"].items()):
+        full = METRIC_PREFIX + name
+        lines.append(f"# HELP {full} {HELP.get(name, name)}")
+        lines.append(f"# TYPE {full} histogram")
+        for key, (counts, total, n) in sorted(series.items()):
+            cumulative = 0
+            for bound, c in zip(LATENCY_BUCKETS, counts):
+                cumulative += c
+                lines.append(f"{full}_bucket{_format_labels(key, (('le', str(bound)),))} {cumulative}")
+            lines.append(f"{full}_bucket{_format_labels(key, (('le', '+Inf'),))} {n}")
+            lines.append(f"{full}_sum{_format_labels(key)} {total}")
+            lines.append(f"{full}_count{_format_labels(key)} {n}")
+    lines.append(f"# TYPE {METRIC_PREFIX}process_start_time_seconds gauge")
+    lines.append(f"{METRIC_PREFIX}process_start_time_seconds {REGISTRY.started}")
+    return "\n".join(lines) + "\n"
+
+
+def start_metrics_server(port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """Serve /metrics in a background thread; returns the server (call shutdown() to stop)"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = prometheus_text().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
+
+
+def write_self_metrics(writer, measurement: str = SELF_METRICS_MEASUREMENT, job: str = None):
+    """
+    Queue the current totals as points in their own measurement
+    (one point per series; tags = labels + metric name). The values are
+    cumulative since process start, like Prometheus counters.
+    """
+    snap = REGISTRY.snapshot()
+    base_tags = {"job": job} if job else {}
+    n = 0
+    for name, series in snap["counters"].items():
+        for key, value in series.items():
+            writer.write(measurement, tags={**base_tags, **dict(key), "metric": name},
+                         fields={"value": float(value)})
+            n += 1
+    for name, series in snap["histograms"].items():
+        for key, (_, total, hist_count) in series.items():
+            writer.write(measurement, tags={**base_tags, **dict(key), "metric": name},
+                         fields={"sum": float(total), "count": hist_count,
+                                 "mean": total / hist_count if hist_count else 0.0})
+            n += 1
+    return n
+
+
+def summary() -> dict:
+    """Per-host HTTP totals: {host: {requests, errors, sent, received, latency_sum, latency_count}}"""
+    snap = REGISTRY.snapshot()
+    hosts = {}
+
+    def host_entry(key):
+        host = dict(key).get("host", "?")
+        return hosts.setdefault(host, {"requests": 0, "errors": 0, "sent": 0, "received": 0,
+                                       "latency_sum": 0.0, "latency_count": 0})
+
+    for key, value in snap["counters"].get("http_requests_total", {}).items():
+        host_entry(key)["requests"] += value
+    for key, value in snap["counters"].get("http_errors_total", {}).items():
+        host_entry(key)["errors"] += value
+    for key, value in snap["counters"].get("http_sent_bytes_total", {}).items():
+        host_entry(key)["sent"] += value
+    for key, value in snap["counters"].get("http_received_bytes_total", {}).items():
+        host_entry(key)["received"] += value
+    for key, (_, total, n) in snap["histograms"].get("http_request_seconds", {}).items():
+        entry = host_entry(key)
+        entry["latency_sum"] += total
+        entry["latency_count"] += n
+    return hosts
+
+
+def print_summary():
+    """Human-readable per-host and per-platform totals"""
+    snap = REGISTRY.snapshot()
+    hosts = summary()
+    if hosts:
+        print("\n  HTTP per host:")
+        for host, h in sorted(hosts.items()):
+            mean_ms = h["latency_sum"] / h["latency_count"] * 1000 if h["latency_count"] else 0.0
+            print(f"    {host:<32} {h['requests']:>5} req  {h['errors']:>3} err  "
+                  f"{mean_ms:7.1f} ms avg  {h['sent'] / 1024:8.1f} KiB out  {h['received'] / 1024:8.1f} KiB in")
+    points = snap["counters"].get("points_written_total", {})
+    retries = snap["counters"].get("write_retries_total", {})
+    if points or retries:
+        print("\n  Points written:")
+        platforms = {dict(k)["platform"] for k in list(points) + list(retries)}
+        for platform in sorted(platforms):
+            key = (("platform", platform),)
+            print(f"    {platform:<32} {int(points.get(key, 0)):>7} points  {int(retries.get(key, 0))} retries")
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+JSON State Files
+Small state files (high-water marks, checkpoints) shared by the sync and
+backfill scripts. Writes go to a temporary file that is moved into place
+with os.replace, so an interrupted run leaves either the old or the new
+state, never a truncated file.
+
+    state = load_state("data/store/sync_state.json")
+    save_state(state, "data/store/sync_state.json")
+"""
+
+import json
+import os
+
+
+def load_state(path: str) -> dict:
+    """Contents of the state file; {} if it does not exist or is not valid JSON"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_state(state: dict, path: str):
+    """Atomically replace the state file"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
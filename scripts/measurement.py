@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Canonical Measurement Model
+Shared by all fetchers, the filter stage and all pushers.
+
+- Station:          interned, immutable metadata (source, location, lat, lon,
+                    data_type) shared by every reading of that station
+- Measurement:      one reading as a __slots__ record (station reference,
+                    sensor type, unit, float value, epoch ns)
+- MeasurementBatch: columnar batch: interned station and sensor tables plus
+                    parallel arrays (uint32 ids, float64 values, int64 epoch ns)
+
+A batch row costs 24 bytes plus the shared tables, instead of a nine-key
+dict per value that repeats source, location and coordinates.
+
+    batch = MeasurementBatch()
+    st = station('OpenSenseMap', 'Hamburg Box', 53.55, 9.99)
+    batch.append(st, 'Temperature', '°C', 4.2, '2026-01-10T12:00:00Z')
+    for m in batch:
+        print(m.source, m.sensor_type, m.value, m.ts)
+"""
+
+import math
+import threading
+from array import array
+
+from influx_writer import to_epoch_ns
+
+QUALITY_OK = "ok"
+QUALITY_SUSPECT = "suspect"
+
+
+class Station:
+    """Metadata of one measuring station; create through station() to share instances"""
+
+    __slots__ = ("source", "location", "lat", "lon", "data_type")
+
+    def __init__(self, source: str, location: str, lat: float = None, lon: float = None,
+                 data_type: str = "REAL"):
+        self.source = source
+        self.location = location
+        self.lat = lat
+        self.lon = lon
+        self.data_type = data_type
+
+    @property
+    def key(self) -> tuple:
+        return (self.source, self.location, self.lat, self.lon, self.data_type)
+
+    def __repr__(self):
+        return f"Station({self.source!r}, {self.location!r}, {self.lat}, {self.lon}, {self.data_type!r})"
+
+
+_stations = {}
+_stations_lock = threading.Lock()
+
+
+def station(source: str, location: str, lat: float = None, lon: float = None,
+            data_type: str = "REAL") -> Station:
+    """Interned Station: the same metadata always returns the same object"""
+    key = (source, location, lat, lon, data_type)
+    found = _stations.get(key)
+    if found is None:
+        with _stations_lock:
+            found = _stations.setdefault(key, Station(*key))
+    return found
+
+
+class Measurement:
+    """One reading; timestamps are epoch nanoseconds (UTC)"""
+
+    __slots__ = ("station", "sensor_type", "unit", "value", "ts", "flags")
+
+    def __init__(self, station: Station, sensor_type: str, unit: str, value: float, ts: int,
+                 flags: str = None):
+        self.station = station
+        self.sensor_type = sensor_type
+        self.unit = unit
+        self.value = value
+        self.ts = ts
+        self.flags = flags        # failed plausibility checks, e.g. "rate,mad"
+
+    @property
+    def source(self):
+        return self.station.source
+
+    @property
+    def location(self):
+        return self.station.location
+
+    @property
+    def lat(self):
+        return self.station.lat
+
+    @property
+    def lon(self):
+        return self.station.lon
+
+    @property
+    def data_type(self):
+        return self.station.data_type
+
+    @property
+    def ts_ms(self) -> int:
+        return self.ts // 1_000_000
+
+    @property
+    def is_valid(self) -> bool:
+        return math.isfinite(self.value)
+
+    def as_dict(self) -> dict:
+        return {
+            'source': self.source,
+            'location': self.location,
+            'lat': self.lat,
+            'lon': self.lon,
+            'sensor_type': self.sensor_type,
+            'value': self.value,
+            'unit': self.unit,
+            'timestamp': self.ts,
+            'data_type': self.data_type,
+        }
+
+    def __repr__(self):
+        return (f"Measurement({self.source!r}, {self.location!r}, {self.sensor_type!r}, "
+                f"{self.value} {self.unit}, ts={self.ts})")
+
+
+class MeasurementBatch:
+    """Columnar batch of readings; iterating yields Measurement records"""
+
+    __slots__ = ("stations", "sensors", "station_ids", "sensor_ids", "values", "ts", "flags",
+                 "_station_index", "_sensor_index")
+
+    def __init__(self):
+        self.stations = []            # id -> Station
+        self.sensors = []             # id -> (sensor_type, unit)
+        self.station_ids = array('I')
+        self.sensor_ids = array('I')
+        self.values = array('d')
+        self.ts = array('q')
+        # None: not checked; dict {row: "check,..."}: checked by the plausibility filter (tag mode)
+        self.flags = None
+        self._station_index = {}
+        self._sensor_index = {}
+
+    # -- building -------------------------------------------------------------
+
+    def _station_id(self, st: Station) -> int:
+        sid = self._station_index.get(st)
+        if sid is None:
+            sid = self._station_index[st] = len(self.stations)
+            self.stations.append(st)
+        return sid
+
+    def _sensor_id(self, sensor_type: str, unit: str) -> int:
+        key = (sensor_type, unit)
+        sid = self._sensor_index.get(key)
+        if sid is None:
+            sid = self._sensor_index[key] = len(self.sensors)
+            self.sensors.append(key)
+        return sid
+
+    def append(self, st: Station, sensor_type: str, unit: str, value, timestamp):
+        """Add one reading; timestamp as ISO string, datetime or epoch ns"""
+        self.station_ids.append(self._station_id(st))
+        self.sensor_ids.append(self._sensor_id(sensor_type, unit))
+        self.values.append(float(value))
+        self.ts.append(to_epoch_ns(timestamp))
+
+    def add(self, m: Measurement):
+        self.append(m.station, m.sensor_type, m.unit, m.value, m.ts)
+        if m.flags is not None:
+            if self.flags is None:
+                self.flags = {}
+            self.flags[len(self) - 1] = m.flags
+
+    def extend(self, other: "MeasurementBatch"):
+        station_map = [self._station_id(st) for st in other.stations]
+        sensor_map = [self._sensor_id(*sensor) for sensor in other.sensors]
+        offset = len(self)
+        self.station_ids.extend(station_map[i] for i in other.station_ids)
+        self.sensor_ids.extend(sensor_map[i] for i in other.sensor_ids)
+        self.values.extend(other.values)
+        self.ts.extend(other.ts)
+        if other.flags is not None:
+            if self.flags is None:
+                self.flags = {}
+            self.flags.update({offset + row: flags for row, flags in other.flags.items()})
+
+    @classmethod
+    def from_records(cls, records) -> "MeasurementBatch":
+        batch = cls()
+        for m in records:
+            batch.add(m)
+        return batch
+
+    @classmethod
+    def from_dicts(cls, dicts) -> "MeasurementBatch":
+        """Legacy measurement dicts (source, location, lat, lon, sensor_type, value, unit, timestamp)"""
+        batch = cls()
+        for d in dicts:
+            st = station(d['source'], d['location'], d.get('lat'), d.get('lon'), d.get('data_type', 'REAL'))
+            batch.append(st, d['sensor_type'], d.get('unit', ''), d['value'], d.get('timestamp'))
+        return batch
+
+    # -- access ---------------------------------------------------------------
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, row: int) -> Measurement:
+        sensor_type, unit = self.sensors[self.sensor_ids[row]]
+        flags = self.flags.get(row) if self.flags is not None else None
+        return Measurement(self.stations[self.station_ids[row]], sensor_type, unit,
+                           self.values[row], self.ts[row], flags)
+
+    def __iter__(self):
+        for row in range(len(self.values)):
+            yield self[row]
+
+    def quality(self, row: int):
+        """None if the batch was not checked, else "ok" / "suspect" """
+        if self.flags is None:
+            return None
+        return QUALITY_SUSPECT if row in self.flags else QUALITY_OK
+
+    def take(self, rows) -> "MeasurementBatch":
+        """New batch with the given rows (shares the station/sensor tables)"""
+        rows = list(rows)
+        batch = MeasurementBatch()
+        batch.stations = list(self.stations)
+        batch.sensors = list(self.sensors)
+        batch._station_index = dict(self._station_index)
+        batch._sensor_index = dict(self._sensor_index)
+        batch.station_ids = array('I', (self.station_ids[r] for r in rows))
+        batch.sensor_ids = array('I', (self.sensor_ids[r] for r in rows))
+        batch.values = array('d', (self.values[r] for r in rows))
+        batch.ts = array('q', (self.ts[r] for r in rows))
+        if self.flags is not None:
+            batch.flags = {i: self.flags[r] for i, r in enumerate(rows) if r in self.flags}
+        return batch
+
+    def to_dicts(self) -> list:
+        return [m.as_dict() for m in self]
+
+    def to_numpy(self) -> dict:
+        """Zero-copy NumPy views of the columns (station/sensor ids index the tables)"""
+        import numpy as np
+        return {
+            "station_id": np.frombuffer(self.station_ids, dtype=np.uint32),
+            "sensor_id": np.frombuffer(self.sensor_ids, dtype=np.uint32),
+            "value": np.frombuffer(self.values, dtype=np.float64),
+            "ts": np.frombuffer(self.ts, dtype=np.int64),
+        }
+
+    def __repr__(self):
+        return f"MeasurementBatch({len(self)} readings, {len(self.stations)} stations, {len(self.sensors)} sensors)"
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Online Comparison Metrics
+Mergeable running accumulators for a station pair (Welford / Chan et al.):
+count, means, co-moment, mean and M2 of the difference, sum of absolute
+differences and max abs diff. An update is O(1) per hourly pair, and
+partials from different time partitions merge exactly, so
+
+- the daemon keeps live MAE / bias / RMSE / r current without rescanning
+  history (LiveComparison), and
+- monthly reports combine the stored daily partials.
+
+Monthly report from the stored partials:
+    python scripts/online_metrics.py report 2026-10
+"""
+
+import json
+import math
+import os
+import sys
+import threading
+
+from stream_resampler import HourlyResampler
+
+PARTIALS_FILE = "data/metrics/pair_partials.json"
+
+# Hours an unmatched hourly value waits for the other station
+PENDING_HOURS = 48
+
+
+def _bound(fn, x, y):
+    """min/max of two optional timestamps"""
+    if x is None or y is None:
+        return y if x is None else x
+    return fn(x, y)
+
+
+class PairAccumulator:
+    """Running comparison of series a and b (differences are a - b)"""
+
+    __slots__ = ("n", "mean_a", "mean_b", "m2_a", "m2_b", "c_ab",
+                 "mean_d", "m2_d", "sum_abs_d", "max_abs_d", "first_ts", "last_ts")
+
+    def __init__(self):
+        self.n = 0
+        self.mean_a = 0.0
+        self.mean_b = 0.0
+        self.m2_a = 0.0       # sum of squared deviations of a
+        self.m2_b = 0.0
+        self.c_ab = 0.0       # co-moment sum (a - mean_a)(b - mean_b)
+        self.mean_d = 0.0     # mean difference (bias)
+        self.m2_d = 0.0       # sum of squared deviations of the difference
+        self.sum_abs_d = 0.0
+        self.max_abs_d = 0.0
+        self.first_ts = None  # ISO strings, compare lexicographically
+        self.last_ts = None
+
+    def update(self, a: float, b: float, timestamp: str = None):
+        """Add one pair in O(1)"""
+        self.n += 1
+        n = self.n
+        da = a - self.mean_a
+        db = b - self.mean_b
+        self.mean_a += da / n
+        self.mean_b += db / n
+        self.m2_a += da * (a - self.mean_a)
+        self.m2_b += db * (b - self.mean_b)
+        self.c_ab += da * (b - self.mean_b)
+
+        d = a - b
+        dd = d - self.mean_d
+        self.mean_d += dd / n
+        self.m2_d += dd * (d - self.mean_d)
+        self.sum_abs_d += abs(d)
+        self.max_abs_d = max(self.max_abs_d, abs(d))
+
+        if timestamp is not None:
+            if self.first_ts is None or timestamp < self.first_ts:
+                self.first_ts = timestamp
+            if self.last_ts is None or timestamp > self.last_ts:
+                self.last_ts = timestamp
+        return self
+
+    def merge(self, other: "PairAccumulator"):
+        """Combine with a partial from another time partition (in place)"""
+        if other.n == 0:
+            return self
+        if self.n == 0:
+            for name in self.__slots__:
+                setattr(self, name, getattr(other, name))
+            return self
+
+        n1, n2 = self.n, other.n
+        n = n1 + n2
+        da = other.mean_a - self.mean_a
+        db = other.mean_b - self.mean_b
+        dd = other.mean_d - self.mean_d
+        f = n1 * n2 / n
+
+        self.m2_a += other.m2_a + da * da * f
+        self.m2_b += other.m2_b + db * db * f
+        self.c_ab += other.c_ab + da * db * f
+        self.m2_d += other.m2_d + dd * dd * f
+        self.mean_a += da * n2 / n
+        self.mean_b += db * n2 / n
+        self.mean_d += dd * n2 / n
+        self.n = n
+        self.sum_abs_d += other.sum_abs_d
+        self.max_abs_d = max(self.max_abs_d, other.max_abs_d)
+        self.first_ts = _bound(min, self.first_ts, other.first_ts)
+        self.last_ts = _bound(max, self.last_ts, other.last_ts)
+        return self
+
+    def metrics(self) -> dict:
+        """Same keys as calculate_metrics() / station_comparison"""
+        n = self.n
+        nan = float('nan')
+        if n == 0:
+            return {"n_observations": 0}
+        denom = math.sqrt(self.m2_a * self.m2_b)
+        return {
+            "n_observations": n,
+            "period_start": self.first_ts,
+            "period_end": self.last_ts,
+            "mean_a": self.mean_a,
+            "mean_b": self.mean_b,
+            "mae": self.sum_abs_d / n,
+            "bias": self.mean_d,
+            "rmse": math.sqrt(self.mean_d ** 2 + self.m2_d / n),
+            "correlation": self.c_ab / denom if denom > 0 else nan,
+            "max_diff": self.max_abs_d,
+            "std_diff": math.sqrt(self.m2_d / (n - 1)) if n > 1 else nan,
+        }
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "PairAccumulator":
+        acc = cls()
+        for name in cls.__slots__:
+            if name in data:
+                setattr(acc, name, data[name])
+        return acc
+
+
+def pair_key(station_a: str, station_b: str) -> str:
+    return f"{station_a} vs {station_b}"
+
+
+class PartialStore:
+    """Daily partial accumulators per pair, persisted as JSON"""
+
+    def __init__(self, path: str = PARTIALS_FILE):
+        self.path = path
+        self.partials = {}  # pair key -> {YYYY-MM-DD: PairAccumulator}
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        self.partials = {
+            key: {day: PairAccumulator.from_dict(acc) for day, acc in days.items()}
+            for key, days in data.items()
+        }
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({key: {day: acc.to_dict() for day, acc in sorted(days.items())}
+                       for key, days in self.partials.items()}, f, indent=1)
+        os.replace(tmp_path, self.path)
+
+    def update(self, key: str, timestamp: str, a: float, b: float):
+        day = timestamp[:10]
+        self.partials.setdefault(key, {}).setdefault(day, PairAccumulator()).update(a, b, timestamp)
+
+    def combine(self, key: str, start: str = None, end: str = None) -> PairAccumulator:
+        """Merge the daily partials from start to end (YYYY-MM-DD, inclusive, open if None)"""
+        total = PairAccumulator()
+        for day, acc in sorted(self.partials.get(key, {}).items()):
+            if (start is None or day >= start) and (end is None or day <= end):
+                total.merge(acc)
+        return total
+
+    def monthly(self, key: str, month: str) -> PairAccumulator:
+        """Partial for one month 'YYYY-MM'"""
+        total = PairAccumulator()
+        for day, acc in sorted(self.partials.get(key, {}).items()):
+            if day.startswith(month):
+                total.merge(acc)
+        return total
+
+
+class LiveComparison:
+    """
+    Daemon-side live comparison. Raw readings are resampled per station to
+    hourly means (streaming); when both stations of a pair have closed the
+    same hour, the pair's running total and daily partial are updated.
+    """
+
+    def __init__(self, pairs: list, store: PartialStore = None):
+        self.pairs = [tuple(p) for p in pairs]
+        self.store = store or PartialStore()
+        self.resampler = HourlyResampler()
+        self.totals = {pair_key(a, b): self.store.combine(pair_key(a, b)) for a, b in self.pairs}
+        self._pending = {}    # station -> {hour ISO: mean}
+        self._last_seen = {}  # (station, reading id) -> timestamp, drops re-polled readings
+        self._lock = threading.Lock()
+
+    @property
+    def stations(self) -> set:
+        return {s for pair in self.pairs for s in pair}
+
+    def add(self, station: str, timestamp, value: float, reading_id: str = None):
+        """Feed one raw reading (e.g. the latest value of a poll)"""
+        if station not in self.stations:
+            return
+        with self._lock:
+            if reading_id is not None:
+                if self._last_seen.get((station, reading_id)) == timestamp:
+                    return
+                self._last_seen[(station, reading_id)] = timestamp
+            for bucket in self.resampler.add(station, timestamp, value):
+                self._hour_closed(bucket["station_id"], bucket["timestamp_utc"].isoformat(), bucket["value"])
+
+    def _hour_closed(self, station: str, hour: str, value: float):
+        pending = self._pending.setdefault(station, {})
+        pending[hour] = value
+        for a, b in self.pairs:
+            if station not in (a, b):
+                continue
+            va = self._pending.get(a, {}).get(hour)
+            vb = self._pending.get(b, {}).get(hour)
+            if va is None or vb is None:
+                continue
+            key = pair_key(a, b)
+            self.totals[key].update(va, vb, hour)
+            self.store.update(key, hour, va, vb)
+        # Bounded memory: forget unmatched hours after PENDING_HOURS
+        if len(pending) > PENDING_HOURS:
+            for old in sorted(pending)[:-PENDING_HOURS]:
+                del pending[old]
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {key: acc.metrics() for key, acc in self.totals.items()}
+
+    def save(self):
+        with self._lock:
+            self.store.save()
+
+    def print_summary(self):
+        for key, m in self.metrics().items():
+            if m["n_observations"]:
+                print(f"  {key}: n={m['n_observations']} MAE={m['mae']:.2f} "
+                      f"bias={m['bias']:+.2f} RMSE={m['rmse']:.2f} r={m['correlation']:.3f}")
+            else:
+                print(f"  {key}: no common hours yet")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2 and sys.argv[1] == "report":
+        month = sys.argv[2]
+        store = PartialStore()
+        for key in sorted(store.partials):
+            m = store.monthly(key, month).metrics()
+            if not m["n_observations"]:
+                continue
+            print(f"{key} ({month}): {m['n_observations']} hours")
+            print(f"  MAE:         {m['mae']:.2f}")
+            print(f"  Bias:        {m['bias']:+.2f}")
+            print(f"  RMSE:        {m['rmse']:.2f}")
+            print(f"  Korrelation: {m['correlation']:.3f}")
+            print(f"  Max. Diff:   {m['max_diff']:.2f}")
+    else:
+        print(__doc__)
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Plausibility Filter
+Streaming outlier filter between fetch and push. Every measurement is
+checked against the rules of its sensor type:
+
+- RangeCheck:   physical / sensor limits (also catches -999 style sentinels)
+- RateCheck:    maximum change per minute against the last accepted value
+- MadCheck:     rolling median / MAD test over the last N accepted values
+
+State is kept per stream (source, location, sensor type) in fixed-size
+ring buffers, so memory stays constant however long the daemon runs.
+Suspect values are either dropped before they are written anywhere
+(mode "drop") or kept with their failed checks in batch.flags (mode
+"tag", written as quality="suspect"). Rules are a plain dict
+{sensor_type: [check, ...]}; any callable check(value, stream, ts) ->
+reason or None can be plugged in.
+
+    pf = PlausibilityFilter()                 # FILTER_RULES, mode "drop"
+    clean = pf.filter(batch)                  # measurement.MeasurementBatch
+"""
+
+import math
+import threading
+
+import instrumentation
+from measurement import MeasurementBatch
+
+DEFAULT_WINDOW = 15           # accepted values kept per stream
+DEFAULT_MIN_SAMPLES = 5       # MadCheck is inactive until the window holds this many
+RATE_MAX_GAP = 3 * 3600       # seconds; no rate check against older values
+MAD_SCALE = 1.4826            # MAD -> standard deviation for normal data
+MAX_CONSECUTIVE_REJECTS = 5   # then the history is reset (level shift, relocated sensor)
+
+MODES = ("drop", "tag")
+
+
+class RingBuffer:
+    """Fixed-capacity buffer of the most recent floats"""
+
+    __slots__ = ("capacity", "_values", "_next", "_full")
+
+    def __init__(self, capacity: int = DEFAULT_WINDOW):
+        self.capacity = capacity
+        self._values = [0.0] * capacity
+        self._next = 0
+        self._full = False
+
+    def append(self, value: float):
+        self._values[self._next] = value
+        self._next = (self._next + 1) % self.capacity
+        if self._next == 0:
+            self._full = True
+
+    def __len__(self):
+        return self.capacity if self._full else self._next
+
+    def values(self) -> list:
+        return list(self._values) if self._full else self._values[:self._next]
+
+
+def _median(values: list) -> float:
+    ordered = sorted(values)
+    mid = len(ordered) // 2
+    return ordered[mid] if len(ordered) % 2 else (ordered[mid - 1] + ordered[mid]) / 2
+
+
+class StreamState:
+    """Last accepted value and recent history of one stream"""
+
+    __slots__ = ("last_ts", "last_value", "last_failed", "window", "seen", "rejected", "consecutive_rejects")
+
+    def __init__(self, window: int = DEFAULT_WINDOW):
+        self.last_ts = None       # epoch ns of the newest processed value
+        self.last_value = None    # newest accepted value
+        self.last_failed = []     # verdict for last_ts
+        self.window = RingBuffer(window)
+        self.seen = 0
+        self.rejected = 0
+        self.consecutive_rejects = 0
+
+    def reset_history(self):
+        self.last_value = None
+        self.window = RingBuffer(self.window.capacity)
+        self.consecutive_rejects = 0
+
+
+# =============================================================================
+# CHECKS
+# =============================================================================
+
+class RangeCheck:
+    def __init__(self, low: float, high: float):
+        self.low = low
+        self.high = high
+
+    def __call__(self, value, stream, ts):
+        if value < self.low or value > self.high:
+            return "range"
+        return None
+
+
+class RateCheck:
+    """|Δvalue| per minute against the last accepted value"""
+
+    def __init__(self, max_per_minute: float, max_gap: float = RATE_MAX_GAP):
+        self.max_per_minute = max_per_minute
+        self.max_gap = max_gap
+
+    def __call__(self, value, stream, ts):
+        if stream.last_value is None or stream.last_ts is None:
+            return None
+        dt = (ts - stream.last_ts) / 1e9
+        if dt <= 0 or dt > self.max_gap:
+            return None
+        # At least one minute, so values a few seconds apart are not over-penalized
+        if abs(value - stream.last_value) / max(dt / 60, 1.0) > self.max_per_minute:
+            return "rate"
+        return None
+
+
+class MadCheck:
+    """Robust z-score: |value - median| / (1.4826 * MAD) over the ring buffer"""
+
+    def __init__(self, threshold: float = 6.0, min_samples: int = DEFAULT_MIN_SAMPLES,
+                 min_deviation: float = 0.0):
+        self.threshold = threshold
+        self.min_samples = min_samples
+        # Absolute floor for the spread, so a flat history does not reject every change
+        self.min_deviation = min_deviation
+
+    def __call__(self, value, stream, ts):
+        if len(stream.window) < self.min_samples:
+            return None
+        history = stream.window.values()
+        median = _median(history)
+        mad = _median([abs(v - median) for v in history])
+        spread = max(MAD_SCALE * mad, self.min_deviation)
+        if spread > 0 and abs(value - median) / spread > self.threshold:
+            return "mad"
+        return None
+
+
+# Per sensor type as produced by the fetchers; (sensor_type, unit) entries
+# take precedence for types reported in different units
+FILTER_RULES = {
+    'Temperature': [RangeCheck(-40, 60), RateCheck(2.0), MadCheck(6.0, min_deviation=1.0)],
+    'Humidity': [RangeCheck(0, 100), RateCheck(10.0), MadCheck(6.0, min_deviation=5.0)],
+    'Pressure': [RangeCheck(870, 1085), RateCheck(1.0), MadCheck(6.0, min_deviation=2.0)],
+    ('Pressure', 'Pa'): [RangeCheck(87_000, 108_500), RateCheck(100.0), MadCheck(6.0, min_deviation=200.0)],
+    # SDS011 reports 999.9 when saturated (e.g. fog); real spikes are short, so only a wide MAD test
+    'PM10': [RangeCheck(0, 999), RateCheck(200.0), MadCheck(8.0, min_deviation=10.0)],
+    'PM2.5': [RangeCheck(0, 999), RateCheck(200.0), MadCheck(8.0, min_deviation=10.0)],
+    'Wind Speed': [RangeCheck(0, 250)],
+    'Wind Direction': [RangeCheck(0, 360)],
+}
+
+
+# =============================================================================
+# FILTER STAGE
+# =============================================================================
+
+class PlausibilityFilter:
+    """Stateful filter stage; safe to share between the cycle threads"""
+
+    def __init__(self, rules: dict = None, mode: str = "drop", window: int = DEFAULT_WINDOW):
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {MODES}")
+        self.rules = FILTER_RULES if rules is None else rules
+        self.mode = mode
+        self.window = window
+        self.streams = {}    # (source, location, sensor_type) -> StreamState
+        self.stats = {"checked": 0, "rejected": 0, "by_check": {}}
+        self._lock = threading.RLock()
+
+    def _checks(self, sensor_type: str, unit: str) -> list:
+        return self.rules.get((sensor_type, unit), self.rules.get(sensor_type, []))
+
+    def check(self, st, sensor_type: str, unit: str, value: float, ts: int) -> list:
+        """
+        Run the checks for one reading (station, sensor, value, epoch ns) and
+        update its stream; returns the failed check names.
+        """
+        if not math.isfinite(value):
+            return ["invalid"]
+        checks = self._checks(sensor_type, unit)
+        key = (st.source, st.location, sensor_type)
+        with self._lock:
+            stream = self.streams.get(key)
+            if stream is None:
+                stream = self.streams[key] = StreamState(self.window)
+
+            if stream.last_ts is not None and ts <= stream.last_ts:
+                # Polled "latest" endpoints repeat the same reading: keep the first verdict.
+                # Late (older) values only get the stateless checks and do not touch the history.
+                if ts == stream.last_ts:
+                    return list(stream.last_failed)
+                return [reason for check in checks
+                        if (reason := check(value, StreamState(1), ts)) is not None]
+
+            failed = [reason for check in checks if (reason := check(value, stream, ts)) is not None]
+            stream.seen += 1
+            stream.last_ts = ts
+            stream.last_failed = failed
+            if failed:
+                stream.rejected += 1
+                stream.consecutive_rejects += 1
+                if stream.consecutive_rejects >= MAX_CONSECUTIVE_REJECTS:
+                    # A persistent new level is real, not a spike: relearn from here
+                    stream.reset_history()
+            else:
+                stream.last_value = value
+                stream.consecutive_rejects = 0
+                stream.window.append(value)
+            return failed
+
+    def filter(self, batch: MeasurementBatch) -> MeasurementBatch:
+        """Batch with suspect values dropped (mode "drop") or flagged (mode "tag", batch.flags)"""
+        keep, flags = [], {}
+        with self._lock:
+            for row, value in enumerate(batch.values):
+                st = batch.stations[batch.station_ids[row]]
+                sensor_type, unit = batch.sensors[batch.sensor_ids[row]]
+                failed = self.check(st, sensor_type, unit, value, batch.ts[row])
+                self.stats["checked"] += 1
+                if not failed:
+                    keep.append(row)
+                    continue
+                self.stats["rejected"] += 1
+                for reason in failed:
+                    self.stats["by_check"][reason] = self.stats["by_check"].get(reason, 0) + 1
+                    instrumentation.count("filtered_values_total", source=st.source,
+                                          sensor_type=sensor_type, check=reason, action=self.mode)
+                flags[row] = ",".join(failed)
+        if self.mode == "drop":
+            return batch if len(keep) == len(batch) else batch.take(keep)
+        batch.flags = {**(batch.flags or {}), **flags}
+        return batch
+
+    def __call__(self, source: str, batch: MeasurementBatch) -> MeasurementBatch:
+        """Stage signature used by cycle_engine.run_cycle(filter_fn=...)"""
+        return self.filter(batch)
@@ -35,21 +35,31 @@ except Exception as e:
 # =============================================================================
 
 print("\n" + "="*80)
-print("STEP 2: HISTORICAL DATA DOWNLOAD")
+print("STEP 2: HISTORICAL DATA SYNC")
 print("-" * 80)
 
-if os.path.exists('data/historical/mobilithek_dormagen_7days.csv'):
-    print("✓ Historical data already downloaded")
-    print("  - Mobilithek Dormagen: data/historical/mobilithek_dormagen_7days.csv")
-    print("  - Open-Meteo Egypt: data/historical/openmeteo_egypt_7days.csv")
+# The incremental sync needs the Parquet store (pyarrow); without it, download the CSV exports
+try:
+    from columnar_store import HAS_PYARROW
+except ImportError:
+    HAS_PYARROW = False
+
+if HAS_PYARROW:
+    print("Syncing historical data (only days not yet stored)...")
+    step = ['python', 'historical_sync.py']
 else:
-    print("Downloading historical data...")
-    try:
-        subprocess.run(['python', 'download_historical_data.py'], 
-                      capture_output=False, timeout=120)
-        print("✓ Historical data download complete")
-    except Exception as e:
-        print(f"⚠ Historical download had issues: {e}")
+    print("pyarrow not installed - downloading the 7-day CSV exports instead...")
+    step = ['python', 'download_historical_data.py']
+try:
+    result = subprocess.run(step, capture_output=False, timeout=600)
+    if result.returncode == 0:
+        print("✓ Historical data sync complete")
+        print("  - Mobilithek Dormagen: data/historical/mobilithek_dormagen_7days.csv")
+        print("  - Open-Meteo Egypt: data/historical/openmeteo_egypt_7days.csv")
+    else:
+        print(f"⚠ Historical sync had issues: {step[1]} exited with code {result.returncode}")
+except Exception as e:
+    print(f"⚠ Historical sync had issues: {e}")
 
 # =============================================================================
 # STEP 3: DATA QUALITY ANALYSIS
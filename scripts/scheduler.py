@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Polling Scheduler for Daemon Mode
+Runs jobs at fixed intervals on the monotonic clock. Run times are
+derived from the job's anchor (anchor + k * interval), so they do not
+drift with job duration; jitter spreads requests, and missed slots are
+caught up with a single coalesced run.
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Job:
+    """One periodic job"""
+
+    def __init__(self, name: str, fn, interval: float, jitter: float = 0.0):
+        self.name = name
+        self.fn = fn
+        self.interval = interval
+        self.jitter = jitter          # max random delay in seconds per run
+        self.anchor = time.monotonic()
+        self.slot = 0                 # index of the next slot
+        self.next_run = self.anchor
+        self.running = False
+        self.runs = 0
+        self.missed = 0
+        self.errors = 0
+
+    def schedule_next(self, now: float):
+        """Advance to the next slot after now, counting slots that were skipped"""
+        self.slot += 1
+        due_slot = int((now - self.anchor) // self.interval) + 1
+        if due_slot > self.slot:
+            # Catch-up: the late run stood in for every slot we fell behind on
+            self.missed += due_slot - self.slot
+            self.slot = due_slot
+        offset = random.uniform(0, self.jitter) if self.jitter else 0.0
+        self.next_run = self.anchor + self.slot * self.interval + offset
+
+
+class Scheduler:
+    """Runs registered jobs on a worker pool until stop() is called"""
+
+    def __init__(self, max_workers: int = 4):
+        self.jobs = []
+        self.max_workers = max_workers
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def add_job(self, name: str, fn, interval: float, jitter: float = 0.0,
+                run_immediately: bool = True) -> Job:
+        job = Job(name, fn, interval, jitter)
+        if not run_immediately:
+            job.schedule_next(job.anchor)
+        self.jobs.append(job)
+        return job
+
+    def stop(self):
+        self._stop.set()
+
+    @property
+    def stopped(self) -> bool:
+        return self._stop.is_set()
+
+    def _run_job(self, job: Job):
+        try:
+            job.fn()
+        except Exception as e:
+            job.errors += 1
+            print(f"  ✗ Job {job.name} failed: {e}")
+        finally:
+            with self._lock:
+                job.running = False
+                job.runs += 1
+
+    def run(self):
+        """Block until stop(); waits for running jobs before returning"""
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="job")
+        try:
+            while not self._stop.is_set():
+                now = time.monotonic()
+                for job in self.jobs:
+                    if job.next_run > now:
+                        continue
+                    with self._lock:
+                        if job.running:
+                            # Previous run still busy: skip instead of piling up
+                            job.missed += 1
+                            job.schedule_next(now)
+                            continue
+                        job.running = True
+                    job.schedule_next(now)
+                    executor.submit(self._run_job, job)
+
+                next_run = min((job.next_run for job in self.jobs), default=now + 1.0)
+                self._stop.wait(max(0.0, next_run - time.monotonic()))
+        finally:
+            executor.shutdown(wait=True)
+
+    def print_stats(self):
+        for job in self.jobs:
+            print(f"  {job.name:<22} runs={job.runs} missed={job.missed} errors={job.errors}")
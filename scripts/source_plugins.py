@@ -0,0 +1,759 @@
+#!/usr/bin/env python3
+"""
+Source Plugins
+Every data source implements the same small interface and is created from
+config/sources.json, so adding a station or a whole source is a config
+change, not a new fetch function in complete_data_loader.py:
+
+    discover()              -> [Station]          stations the source reports
+    fetch_latest()          -> MeasurementBatch   newest values (polled by the loader)
+    fetch_range(start, end) -> MeasurementBatch   history in [start, end)
+    iter_batches(start, end)                      fetch_range in day windows, one batch each
+
+Built-in types: opensensemap, opensensemap_bulk, sensor_community, open_meteo,
+dwd, hamburg_halm.
+Other plugins are registered with @register("name") or referenced from the
+config as "module:ClassName".
+
+    sources = load_sources()                     # {name: Source}, enabled only
+    batch = sources['Open-Meteo Egypt'].fetch_latest()
+"""
+
+import csv
+import importlib
+import io
+import json
+from datetime import datetime, timedelta, timezone
+from zipfile import ZipFile
+
+import http_client
+from influx_writer import to_epoch_ns
+from measurement import MeasurementBatch, station
+
+SOURCES_CONFIG = "config/sources.json"
+
+DEFAULT_INTERVAL = 300     # seconds between polls in daemon mode
+DEFAULT_TIMEOUT = 15       # seconds per fetch (cycle engine deadline)
+REQUEST_TIMEOUT = 10       # seconds per HTTP request
+RANGE_WINDOW = timedelta(days=1)
+
+NS_PER_SECOND = 1_000_000_000
+
+# Used when config/sources.json does not exist (the loader's previous hard-coded sources)
+DEFAULT_SOURCES = [
+    {
+        "name": "OpenSenseMap",
+        "type": "opensensemap",
+        "box_ids": ["67937b67c326f20007ef99ca", "5eba5fbad46fb8001c799786", "57000b8745fd40c8196ad04c"],
+        "interval": 300,
+        "timeout": 40,
+        "tb_device": "OpenSenseMap_5df93d3b39652b001b8cd9d2",
+    },
+    {
+        "name": "Mobilithek Dormagen",
+        "type": "sensor_community",
+        "latitude": 51.0946,
+        "longitude": 6.8407,
+        "radius": 5,
+        "location_prefix": "Dormagen Sensor",
+        "interval": 150,
+        "timeout": 15,
+        "tb_device": "DWD_01975",
+    },
+    {
+        "name": "Open-Meteo Egypt",
+        "type": "open_meteo",
+        "latitude": 30.0444,
+        "longitude": 31.2357,
+        "location": "Cairo, Egypt",
+        "timezone": "Africa/Cairo",
+        "interval": 3600,
+        "timeout": 15,
+        "tb_device": "Egypt",
+    },
+]
+
+
+def _epoch_ns(value) -> int:
+    if isinstance(value, (int, float)):
+        return int(value)
+    return to_epoch_ns(value)
+
+
+def _utc(ns: int) -> datetime:
+    return datetime.fromtimestamp(ns / NS_PER_SECOND, timezone.utc)
+
+
+# =============================================================================
+# INTERFACE / REGISTRY
+# =============================================================================
+
+SOURCE_TYPES = {}   # type name -> Source subclass
+
+
+def register(type_name: str):
+    """Class decorator: make a Source subclass available as "type" in the config"""
+    def decorator(cls):
+        cls.type_name = type_name
+        SOURCE_TYPES[type_name] = cls
+        return cls
+    return decorator
+
+
+class Source:
+    """
+    Base class of all source plugins. Options from the config entry arrive
+    as keyword arguments; name, interval, timeout and tb_device are common.
+    """
+
+    type_name = None
+    supports_range = False
+
+    def __init__(self, name: str, interval: float = DEFAULT_INTERVAL, timeout: float = DEFAULT_TIMEOUT,
+                 tb_device: str = None, data_type: str = "REAL", **options):
+        self.name = name
+        self.interval = interval
+        self.timeout = timeout
+        self.tb_device = tb_device
+        self.data_type = data_type
+        self.options = options
+
+    def discover(self) -> list:
+        """Stations this source reports (may need a request)"""
+        return []
+
+    def fetch_latest(self) -> MeasurementBatch:
+        raise NotImplementedError
+
+    def fetch_range(self, start, end) -> MeasurementBatch:
+        """Readings in [start, end) (ISO string, datetime or epoch ns)"""
+        raise NotImplementedError(f"{self.type_name} has no history API")
+
+    def iter_batches(self, start, end, window: timedelta = RANGE_WINDOW):
+        """fetch_range in windows, so a long backfill never holds more than one window"""
+        start_ns, end_ns = _epoch_ns(start), _epoch_ns(end)
+        step = int(window.total_seconds()) * NS_PER_SECOND
+        for window_start in range(start_ns, end_ns, step):
+            batch = self.fetch_range(window_start, min(window_start + step, end_ns))
+            if len(batch):
+                yield batch
+
+    def station(self, location: str, lat=None, lon=None):
+        return station(self.name, location, lat, lon, self.data_type)
+
+    def __call__(self) -> MeasurementBatch:
+        """Fetch signature used by cycle_engine.run_cycle"""
+        return self.fetch_latest()
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.name!r})"
+
+
+def source_class(type_name: str):
+    if type_name in SOURCE_TYPES:
+        return SOURCE_TYPES[type_name]
+    if ":" in type_name:
+        # External plugin: "module:ClassName" (module importable from scripts/)
+        module_name, class_name = type_name.split(":", 1)
+        return getattr(importlib.import_module(module_name), class_name)
+    raise ValueError(f"Unknown source type '{type_name}' (known: {', '.join(sorted(SOURCE_TYPES))})")
+
+
+def create_source(config: dict) -> Source:
+    options = {k: v for k, v in config.items() if k not in ("type", "enabled")}
+    return source_class(config["type"])(**options)
+
+
+def load_source_configs(path: str = SOURCES_CONFIG) -> list:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)["sources"]
+    except FileNotFoundError:
+        return DEFAULT_SOURCES
+
+
+def load_sources(path: str = SOURCES_CONFIG, include_disabled: bool = False) -> dict:
+    """{name: Source} for every enabled entry of the config file"""
+    sources = {}
+    for config in load_source_configs(path):
+        if config.get("enabled", True) or include_disabled:
+            source = create_source(config)
+            sources[source.name] = source
+    return sources
+
+
+# =============================================================================
+# OPENSENSEMAP
+# =============================================================================
+
+def opensensemap_sensor_type(title: str) -> str:
+    title_lower = title.lower()
+    if 'temp' in title_lower or 'temperatur' in title_lower:
+        return 'Temperature'
+    if 'feuchte' in title_lower or 'humidity' in title_lower:
+        return 'Humidity'
+    if 'druck' in title_lower or 'pressure' in title_lower:
+        return 'Pressure'
+    if 'pm10' in title_lower:
+        return 'PM10'
+    if 'pm2.5' in title_lower or 'pm25' in title_lower:
+        return 'PM2.5'
+    return title or 'Unknown'
+
+
+@register("opensensemap")
+class OpenSenseMapSource(Source):
+    """senseBoxes by id (/boxes/{id}); the first box with data is reported"""
+
+    supports_range = True
+    API_URL = "https://api.opensensemap.org"
+
+    def __init__(self, name: str, box_ids: list = (), **kwargs):
+        super().__init__(name, **kwargs)
+        self.box_ids = list(box_ids)
+
+    def _box(self, box_id: str) -> dict:
+        response = http_client.get(f"{self.API_URL}/boxes/{box_id}", timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        return response.json()
+
+    def _box_station(self, box: dict):
+        coordinates = (box.get('currentLocation') or {}).get('coordinates', [0, 0])
+        return self.station(box.get('name', 'Unknown'), coordinates[1], coordinates[0])
+
+    def discover(self) -> list:
+        return [self._box_station(self._box(box_id)) for box_id in self.box_ids]
+
+    def fetch_latest(self) -> MeasurementBatch:
+        print("OPENSENSEMAP [REAL DATA]")
+        for box_id in self.box_ids:
+            try:
+                box = self._box(box_id)
+                box_station = self._box_station(box)
+                print(f"  Box: {box_station.location}")
+                print(f"  Location: {box_station.lat:.4f}°N, {box_station.lon:.4f}°E")
+
+                measurements = MeasurementBatch()
+                for sensor in box.get('sensors', []):
+                    last = sensor.get('lastMeasurement')
+                    if not last:
+                        continue
+                    try:
+                        measurements.append(box_station, opensensemap_sensor_type(sensor.get('title', '')),
+                                            sensor.get('unit', ''), float(last['value']), last['createdAt'])
+                    except (ValueError, KeyError):
+                        continue
+
+                if measurements:
+                    print(f"Fetched {len(measurements)} measurements")
+                    for m in measurements:
+                        print(f"    - {m.sensor_type}: {m.value} {m.unit}")
+                    return measurements
+            except Exception as e:
+                print(f"Box {box_id[:8]}... error: {e}")
+
+        print(" All boxes failed")
+        return MeasurementBatch()
+
+    def fetch_range(self, start, end) -> MeasurementBatch:
+        """/boxes/{id}/data/{sensor_id} for every sensor of every box"""
+        start_ns, end_ns = _epoch_ns(start), _epoch_ns(end)
+        params = {
+            "from-date": _utc(start_ns).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            "to-date": _utc(end_ns).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            "format": "json",
+        }
+        batch = MeasurementBatch()
+        for box_id in self.box_ids:
+            box = self._box(box_id)
+            box_station = self._box_station(box)
+            for sensor in box.get('sensors', []):
+                response = http_client.get(f"{self.API_URL}/boxes/{box_id}/data/{sensor['_id']}",
+                                           params=params, timeout=60)
+                response.raise_for_status()
+                sensor_type = opensensemap_sensor_type(sensor.get('title', ''))
+                for row in response.json():
+                    try:
+                        ts = to_epoch_ns(row['createdAt'])
+                        if start_ns <= ts < end_ns:
+                            batch.append(box_station, sensor_type, sensor.get('unit', ''), float(row['value']), ts)
+                    except (ValueError, KeyError, TypeError):
+                        continue
+        return batch
+
+
+@register("opensensemap_bulk")
+class OpenSenseMapBulkSource(Source):
+    """
+    Every senseBox in a bounding box with one /boxes/data request per
+    phenomenon. The CSV response is parsed line by line while it streams
+    in; fetch_latest keeps only the newest value per box and phenomenon.
+    """
+
+    supports_range = True
+    API_URL = "https://api.opensensemap.org"
+    CSV_COLUMNS = "boxId,boxName,lat,lon,createdAt,value,unit,phenomenon"
+
+    def __init__(self, name: str, bbox: list, phenomena: list = ("Temperatur",),
+                 lookback_minutes: int = 30, **kwargs):
+        super().__init__(name, **kwargs)
+        self.bbox = ",".join(str(v) for v in bbox)   # lon_sw,lat_sw,lon_ne,lat_ne
+        self.phenomena = list(phenomena)
+        self.lookback = timedelta(minutes=lookback_minutes)
+
+    def discover(self) -> list:
+        response = http_client.get(f"{self.API_URL}/boxes", params={"bbox": self.bbox, "minimal": "true"},
+                                   timeout=60)
+        response.raise_for_status()
+        stations = []
+        for box in response.json():
+            coordinates = (box.get('currentLocation') or {}).get('coordinates', [None, None])
+            stations.append(self.station(box.get('name', box.get('_id')), coordinates[1], coordinates[0]))
+        return stations
+
+    def _rows(self, phenomenon: str, start: datetime, end: datetime):
+        """CSV rows as dicts, parsed while the response streams in"""
+        params = {
+            "bbox": self.bbox,
+            "phenomenon": phenomenon,
+            "from-date": start.strftime('%Y-%m-%dT%H:%M:%SZ'),
+            "to-date": end.strftime('%Y-%m-%dT%H:%M:%SZ'),
+            "format": "csv",
+            "columns": self.CSV_COLUMNS,
+            "delimiter": "comma",
+            "download": "false",
+        }
+        response = http_client.get(f"{self.API_URL}/boxes/data", params=params, stream=True, timeout=(5, 120))
+        try:
+            response.raise_for_status()
+            if 'charset' not in response.headers.get('Content-Type', '').lower():
+                # requests assumes ISO-8859-1 for text/* without a charset; the API sends UTF-8
+                response.encoding = 'utf-8'
+            yield from csv.DictReader(response.iter_lines(decode_unicode=True))
+        finally:
+            response.close()
+
+    @staticmethod
+    def _row_ts(row: dict) -> int:
+        """createdAt as epoch ns; a truncated row raises instead of getting "now" """
+        stamp = row['createdAt']
+        if not stamp:
+            raise ValueError("row without createdAt")
+        return to_epoch_ns(stamp)
+
+    def _append(self, batch: MeasurementBatch, row: dict, ts: int):
+        box_station = self.station(row['boxName'], float(row['lat']), float(row['lon']))
+        sensor_type = opensensemap_sensor_type(row.get('phenomenon') or '')
+        batch.append(box_station, sensor_type, row.get('unit', ''), float(row['value']), ts)
+
+    def fetch_latest(self) -> MeasurementBatch:
+        print(f"\n {self.name.upper()} [REAL DATA]")
+        end = datetime.now(timezone.utc)
+        batch = MeasurementBatch()
+        for phenomenon in self.phenomena:
+            try:
+                latest = {}   # boxId -> (ts, row); one entry per box, not per reading
+                rows = 0
+                for row in self._rows(phenomenon, end - self.lookback, end):
+                    rows += 1
+                    try:
+                        ts = self._row_ts(row)
+                        box_id = row['boxId']
+                    except (KeyError, TypeError, ValueError):
+                        continue
+                    if ts > latest.get(box_id, (0, None))[0]:
+                        latest[box_id] = (ts, row)
+                for ts, row in latest.values():
+                    try:
+                        self._append(batch, row, ts)
+                    except (KeyError, TypeError, ValueError):
+                        continue
+                print(f"   {phenomenon}: {len(latest)} boxes ({rows} rows in the last "
+                      f"{int(self.lookback.total_seconds() // 60)} min)")
+            except Exception as e:
+                print(f"   {phenomenon} error: {e}")
+        print(f"   Fetched {len(batch)} measurements")
+        return batch
+
+    def fetch_range(self, start, end) -> MeasurementBatch:
+        start_ns, end_ns = _epoch_ns(start), _epoch_ns(end)
+        batch = MeasurementBatch()
+        for phenomenon in self.phenomena:
+            for row in self._rows(phenomenon, _utc(start_ns), _utc(end_ns)):
+                try:
+                    ts = self._row_ts(row)
+                    if start_ns <= ts < end_ns:
+                        self._append(batch, row, ts)
+                except (KeyError, TypeError, ValueError):
+                    continue
+        return batch
+
+
+# =============================================================================
+# SENSOR.COMMUNITY
+# =============================================================================
+
+# sensor.community value_type -> (sensor_type, unit)
+SENSOR_COMMUNITY_TYPES = {
+    'P1': ('PM10', 'µg/m³'),
+    'P2': ('PM2.5', 'µg/m³'),
+    'temperature': ('Temperature', '°C'),
+    'humidity': ('Humidity', '%'),
+    'pressure': ('Pressure', 'Pa'),
+}
+
+
+@register("sensor_community")
+class SensorCommunitySource(Source):
+    """All sensors in a radius (data.sensor.community area filter, archive for history)"""
+
+    supports_range = True
+    API_URL = "https://data.sensor.community/airrohr/v1/filter"
+
+    def __init__(self, name: str, latitude: float, longitude: float, radius: float = 5,
+                 max_sensors: int = 10, location_prefix: str = "Sensor", **kwargs):
+        super().__init__(name, **kwargs)
+        self.latitude = latitude
+        self.longitude = longitude
+        self.radius = radius
+        self.max_sensors = max_sensors
+        self.location_prefix = location_prefix
+
+    def _area(self) -> list:
+        url = f"{self.API_URL}/area={self.latitude},{self.longitude},{self.radius}"
+        response = http_client.get(url, timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        return response.json()
+
+    def _sensor_station(self, sensor_id, location: dict = None):
+        location = location or {}
+        try:
+            lat = float(location.get('latitude', self.latitude))
+            lon = float(location.get('longitude', self.longitude))
+        except (TypeError, ValueError):
+            lat, lon = self.latitude, self.longitude
+        return self.station(f"{self.location_prefix} {sensor_id}", lat, lon)
+
+    def discover(self) -> list:
+        stations = {}
+        for entry in self._area():
+            sensor_id = entry.get('sensor', {}).get('id')
+            if sensor_id is not None and sensor_id not in stations:
+                stations[sensor_id] = self._sensor_station(sensor_id, entry.get('location'))
+        return list(stations.values())
+
+    def fetch_latest(self) -> MeasurementBatch:
+        print(f"\n {self.name.upper()} [REAL DATA]")
+        try:
+            print(f"  Searching area: {self.latitude}°N, {self.longitude}°E (radius {self.radius}km)")
+            measurements = MeasurementBatch()
+            sensors_found = set()
+
+            # Process the first max_sensors entries (to avoid overwhelming)
+            for entry in self._area()[:self.max_sensors]:
+                if 'sensordatavalues' not in entry:
+                    continue
+                sensor_id = entry.get('sensor', {}).get('id', 'unknown')
+                sensor_station = self._sensor_station(sensor_id, entry.get('location'))
+                # sensor.community timestamps are UTC without offset
+                timestamp = entry.get('timestamp') or datetime.now(timezone.utc)
+                sensors_found.add(sensor_id)
+                for value_data in entry['sensordatavalues']:
+                    try:
+                        value_type = value_data['value_type']
+                        sensor_type, unit = SENSOR_COMMUNITY_TYPES.get(value_type, (value_type, ''))
+                        measurements.append(sensor_station, sensor_type, unit, float(value_data['value']), timestamp)
+                    except (ValueError, KeyError):
+                        continue
+
+            if not measurements:
+                print("  ⚠ No data found")
+                return measurements
+            print(f"   Found {len(sensors_found)} sensors")
+            print(f"   Fetched {len(measurements)} measurements")
+            for m in measurements.take(range(min(5, len(measurements)))):
+                print(f"    - {m.sensor_type}: {m.value} {m.unit}")
+            if len(measurements) > 5:
+                print(f"    ... and {len(measurements) - 5} more")
+            return measurements
+        except Exception as e:
+            print(f"  ✗ Error: {e}")
+            return MeasurementBatch()
+
+    def fetch_range(self, start, end) -> MeasurementBatch:
+        """Daily archive CSVs of the sensors currently in the area"""
+        from archive_downloader import ArchiveDownloader
+        start_ns, end_ns = _epoch_ns(start), _epoch_ns(end)
+        sensors = {s.location.rsplit(' ', 1)[-1]: s for s in self.discover()[:self.max_sensors]}
+        days = []
+        day = _utc(start_ns).date()
+        while day <= _utc(end_ns - 1).date():
+            days.append(day.isoformat())
+            day += timedelta(days=1)
+
+        downloader = ArchiveDownloader(write_store=False)
+        batch = MeasurementBatch()
+        for sensor_id, sensor_station in sensors.items():
+            for date_str in days:
+                df = downloader.fetch_day(sensor_id, date_str)
+                if df is None:
+                    continue
+                timestamps = [to_epoch_ns(t) for t in df['timestamp'].astype(str)]
+                for column, (sensor_type, unit) in SENSOR_COMMUNITY_TYPES.items():
+                    if column not in df.columns:
+                        continue
+                    for ts, value in zip(timestamps, df[column].tolist()):
+                        if start_ns <= ts < end_ns and value == value:
+                            batch.append(sensor_station, sensor_type, unit, float(value), ts)
+        return batch
+
+
+# =============================================================================
+# OPEN-METEO
+# =============================================================================
+
+# Open-Meteo variable -> (sensor_type, unit)
+OPEN_METEO_VARIABLES = {
+    'temperature_2m': ('Temperature', '°C'),
+    'relative_humidity_2m': ('Humidity', '%'),
+    'pressure_msl': ('Pressure', 'hPa'),
+    'wind_speed_10m': ('Wind Speed', 'km/h'),
+    'wind_direction_10m': ('Wind Direction', '°'),
+}
+
+
+@register("open_meteo")
+class OpenMeteoSource(Source):
+    """Model data for one coordinate (forecast API current values, archive API history)"""
+
+    supports_range = True
+    FORECAST_URL = "https://api.open-meteo.com/v1/forecast"
+    ARCHIVE_URL = "https://archive-api.open-meteo.com/v1/archive"
+
+    def __init__(self, name: str, latitude: float, longitude: float, location: str = None,
+                 timezone: str = "UTC", variables: list = None, **kwargs):
+        super().__init__(name, **kwargs)
+        self.latitude = latitude
+        self.longitude = longitude
+        self.location = location or f"{latitude},{longitude}"
+        self.timezone = timezone
+        self.variables = {v: OPEN_METEO_VARIABLES[v] for v in (variables or OPEN_METEO_VARIABLES)}
+
+    def discover(self) -> list:
+        return [self.station(self.location, self.latitude, self.longitude)]
+
+    def fetch_latest(self) -> MeasurementBatch:
+        print(f"\n {self.name.upper()} [REAL DATA]")
+        try:
+            params = {
+                'latitude': self.latitude,
+                'longitude': self.longitude,
+                'current': ','.join(self.variables),
+                'timezone': self.timezone,
+            }
+            print(f"  Location: {self.location}")
+            response = http_client.get(self.FORECAST_URL, params=params, timeout=REQUEST_TIMEOUT)
+            response.raise_for_status()
+            data = response.json()
+
+            current = data.get('current', {})
+            if current.get('time'):
+                # Local time of the requested timezone -> UTC epoch ns
+                timestamp = to_epoch_ns(current['time']) - int(data.get('utc_offset_seconds', 0)) * NS_PER_SECOND
+            else:
+                timestamp = datetime.now(timezone.utc)
+
+            location_station = self.discover()[0]
+            measurements = MeasurementBatch()
+            for variable, (sensor_type, unit) in self.variables.items():
+                if current.get(variable) is not None:
+                    measurements.append(location_station, sensor_type, unit, float(current[variable]), timestamp)
+
+            print(f"   Fetched {len(measurements)} measurements")
+            for m in measurements:
+                print(f"    - {m.sensor_type}: {m.value} {m.unit}")
+            return measurements
+        except Exception as e:
+            print(f"   Error: {e}")
+            return MeasurementBatch()
+
+    def fetch_range(self, start, end) -> MeasurementBatch:
+        """Hourly archive values in [start, end) (UTC)"""
+        start_ns, end_ns = _epoch_ns(start), _epoch_ns(end)
+        params = {
+            'latitude': self.latitude,
+            'longitude': self.longitude,
+            'start_date': _utc(start_ns).date().isoformat(),
+            'end_date': _utc(end_ns - 1).date().isoformat(),
+            'hourly': ','.join(self.variables),
+            'timezone': 'UTC',
+        }
+        response = http_client.get(self.ARCHIVE_URL, params=params, timeout=60)
+        response.raise_for_status()
+        hourly = response.json().get('hourly', {})
+
+        location_station = self.discover()[0]
+        timestamps = [to_epoch_ns(t) for t in hourly.get('time', [])]
+        batch = MeasurementBatch()
+        for variable, (sensor_type, unit) in self.variables.items():
+            for ts, value in zip(timestamps, hourly.get(variable, [])):
+                if value is not None and start_ns <= ts < end_ns:
+                    batch.append(location_station, sensor_type, unit, float(value), ts)
+        return batch
+
+
+# =============================================================================
+# DWD
+# =============================================================================
+
+# Hourly "recent" product: columns of produkt_tu_stunde_*.txt
+DWD_COLUMNS = {
+    'TT_TU': ('Temperature', '°C'),
+    'RF_TU': ('Humidity', '%'),
+}
+DWD_MISSING = -999
+
+
+@register("dwd")
+class DwdSource(Source):
+    """DWD climate station, hourly air temperature/humidity (recent archive, cached)"""
+
+    supports_range = True
+    URL = ("https://opendata.dwd.de/climate_environment/CDC/observations_germany/climate/hourly/"
+           "air_temperature/recent/stundenwerte_TU_{station_id}_akt.zip")
+    CACHE_MAX_AGE = 6 * 3600   # seconds; the archive is updated daily
+
+    def __init__(self, name: str, station_id: str, latitude: float = None, longitude: float = None,
+                 location: str = None, **kwargs):
+        super().__init__(name, **kwargs)
+        self.station_id = station_id
+        self.latitude = latitude
+        self.longitude = longitude
+        self.location = location or f"DWD {station_id}"
+
+    def discover(self) -> list:
+        return [self.station(self.location, self.latitude, self.longitude)]
+
+    def _rows(self):
+        """(epoch ns, {column: value}) from the cached station archive, oldest first"""
+        from http_cache import cached_get
+        content = cached_get(self.URL.format(station_id=self.station_id), timeout=60,
+                             max_age=self.CACHE_MAX_AGE)
+        with ZipFile(io.BytesIO(content)) as archive:
+            data_file = next(f for f in archive.namelist() if f.startswith('produkt_tu_stunde'))
+            with archive.open(data_file) as f:
+                reader = csv.reader(io.TextIOWrapper(f, encoding='latin-1'), delimiter=';')
+                header = [column.strip() for column in next(reader)]
+                index = {column: header.index(column) for column in DWD_COLUMNS if column in header}
+                date_index = header.index('MESS_DATUM')
+                for row in reader:
+                    if len(row) <= date_index:
+                        continue
+                    # MESS_DATUM: YYYYMMDDHH in UTC
+                    stamp = datetime.strptime(row[date_index].strip(), '%Y%m%d%H').replace(tzinfo=timezone.utc)
+                    values = {}
+                    for column, i in index.items():
+                        try:
+                            value = float(row[i])
+                        except (ValueError, IndexError):
+                            continue
+                        if value != DWD_MISSING:
+                            values[column] = value
+                    yield to_epoch_ns(stamp), values
+
+    def _batch(self, rows) -> MeasurementBatch:
+        dwd_station = self.discover()[0]
+        batch = MeasurementBatch()
+        for ts, values in rows:
+            for column, value in values.items():
+                sensor_type, unit = DWD_COLUMNS[column]
+                batch.append(dwd_station, sensor_type, unit, value, ts)
+        return batch
+
+    def fetch_latest(self) -> MeasurementBatch:
+        print(f"\n {self.name.upper()} [REAL DATA]")
+        try:
+            latest = None
+            for ts, values in self._rows():
+                if values:
+                    latest = (ts, values)
+            batch = self._batch([latest] if latest else [])
+            print(f"   Fetched {len(batch)} measurements")
+            return batch
+        except Exception as e:
+            print(f"   Error: {e}")
+            return MeasurementBatch()
+
+    def fetch_range(self, start, end) -> MeasurementBatch:
+        start_ns, end_ns = _epoch_ns(start), _epoch_ns(end)
+        return self._batch((ts, values) for ts, values in self._rows() if start_ns <= ts < end_ns)
+
+
+# =============================================================================
+# HAMBURG LUFTMESSNETZ (HaLm)
+# =============================================================================
+
+# Index values of the Hamburg air quality network
+HALM_INDICES = {
+    'NO2': 'NO2 Index',
+    'SO2': 'SO2 Index',
+    'PM10': 'PM10 Index',
+    'O3': 'O3 Index',
+    'LQI': 'LQI',
+}
+
+
+@register("hamburg_halm")
+class HamburgHalmSource(Source):
+    """One station of the Hamburg air quality network (OGC API Features, latest values only)"""
+
+    URL = "https://api.hamburg.de/datasets/v1/luftmessnetz/collections/luftmessnetz_messwerte/items"
+
+    def __init__(self, name: str, station_code: str = "80KT", location: str = None, **kwargs):
+        super().__init__(name, **kwargs)
+        self.station_code = station_code
+        self.location = location or station_code
+
+    def _feature(self):
+        response = http_client.get(self.URL, params={'f': 'json', 'stationskuerzel': self.station_code},
+                                   timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        features = response.json().get('features', [])
+        return features[0] if features else None
+
+    def _station(self, feature: dict):
+        coordinates = (feature.get('geometry') or {}).get('coordinates', [None, None])
+        return self.station(self.location, coordinates[1], coordinates[0])
+
+    def discover(self) -> list:
+        feature = self._feature()
+        return [self._station(feature)] if feature else []
+
+    def fetch_latest(self) -> MeasurementBatch:
+        print(f"\n {self.name.upper()} [REAL DATA]")
+        batch = MeasurementBatch()
+        try:
+            feature = self._feature()
+            if not feature:
+                print("   ⚠ No features found")
+                return batch
+            props = feature.get('properties', {})
+            try:
+                timestamp = to_epoch_ns(props.get('datum'))
+            except (TypeError, ValueError):
+                timestamp = None   # unknown format: time of the poll
+            halm_station = self._station(feature)
+            for key, sensor_type in HALM_INDICES.items():
+                if props.get(key) is not None:
+                    batch.append(halm_station, sensor_type, 'index', float(props[key]), timestamp)
+            print(f"   Fetched {len(batch)} measurements")
+            return batch
+        except Exception as e:
+            print(f"   Error: {e}")
+            return batch
+
+
+if __name__ == "__main__":
+    for name, source in load_sources(include_disabled=True).items():
+        print(f"{name:<28} {source.type_name:<18} every {source.interval}s, timeout {source.timeout}s, "
+              f"history: {'yes' if source.supports_range else 'no'}, TB device: {source.tb_device or '-'}")
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Multi-Station Comparison Engine
+Compares N hourly series aligned on a shared time index (a T x N NumPy
+array, NaN = no value) and computes MAE, bias, RMSE, Pearson r, max diff
+and the std of the difference for all N*(N-1)/2 station pairs at once.
+
+Sums, cross-products and overlap counts come from matrix products over the
+validity mask; the difference metrics are reduced over blocks of stations,
+so there is no Python loop per pair. Each pair only uses the hours where
+both stations have a value.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Upper bound for the T x B x N difference block (elements, ~256 MB as float64)
+BLOCK_ELEMENTS = 32_000_000
+
+METRIC_KEYS = ["n_observations", "mean_a", "mean_b", "mae", "bias", "rmse",
+               "correlation", "max_diff", "std_diff"]
+
+
+def align_hourly(series: dict, freq: str = '1h'):
+    """
+    Resample {name: pd.Series indexed by timestamp} to a shared hourly index.
+    Returns (index, names, values) with values as T x N float64 array.
+    """
+    names = list(series)
+    frame = pd.concat(
+        {name: s.resample(freq).mean() for name, s in series.items()},
+        axis=1
+    )
+    return frame.index, names, frame[names].to_numpy(dtype=np.float64)
+
+
+def pairwise_metrics(values: np.ndarray, min_overlap: int = 2,
+                     block_elements: int = BLOCK_ELEMENTS) -> dict:
+    """
+    Metrics for every station pair of a T x N array.
+
+    Returns {metric: N x N array}; entry [i, j] compares station i (a) with
+    station j (b), differences are a - b. Pairs with fewer than min_overlap
+    common hours are NaN. std_diff is the sample standard deviation (ddof=1,
+    like pandas Series.std).
+    """
+    X = np.asarray(values, dtype=np.float64)
+    if X.ndim != 2:
+        raise ValueError(f"expected a T x N array, got shape {X.shape}")
+    T, N = X.shape
+
+    valid = ~np.isnan(X)
+    M = valid.astype(np.float64)
+
+    # Center each station first, so the sums below do not lose precision
+    counts = M.sum(axis=0)
+    center = np.divide(np.where(valid, X, 0.0).sum(axis=0), counts,
+                       out=np.zeros(N), where=counts > 0)
+    Xc = np.where(valid, X - center, 0.0)
+
+    # [i, j] sums over the hours where both i and j are valid
+    n = M.T @ M
+    s_a = Xc.T @ M
+    s_aa = (Xc * Xc).T @ M
+    s_ab = Xc.T @ Xc
+
+    metrics = {}
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_a = s_a / n
+        mean_b = mean_a.T
+        metrics["mean_a"] = mean_a + center[:, None]
+        metrics["mean_b"] = mean_b + center[None, :]
+        metrics["bias"] = metrics["mean_a"] - metrics["mean_b"]
+
+        cov = s_ab - s_a * s_a.T / n
+        var_a = s_aa - s_a * s_a / n
+        metrics["correlation"] = np.clip(cov / np.sqrt(var_a * var_a.T), -1.0, 1.0)
+
+    # Difference metrics over station blocks: T x B x N at a time
+    mae = np.full((N, N), np.nan)
+    sq = np.full((N, N), np.nan)
+    var_d = np.full((N, N), np.nan)
+    max_diff = np.full((N, N), np.nan)
+    block = max(1, block_elements // max(1, T * N))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for start in range(0, N, block):
+            stop = min(N, start + block)
+            D = X[:, start:stop, None] - X[:, None, :]
+            absD = np.abs(D)
+            n_block = n[start:stop]
+            mae[start:stop] = np.nansum(absD, axis=0) / n_block
+            sq[start:stop] = np.nansum(D * D, axis=0) / n_block
+            var_d[start:stop] = np.nansum((D - metrics["bias"][start:stop]) ** 2, axis=0) / (n_block - 1)
+            max_diff[start:stop] = np.fmax.reduce(absD, axis=0)
+
+        metrics["mae"] = mae
+        metrics["rmse"] = np.sqrt(sq)
+        metrics["max_diff"] = max_diff
+        metrics["std_diff"] = np.sqrt(var_d)
+    metrics["n_observations"] = n.astype(np.int64)
+
+    too_few = n < min_overlap
+    for key in METRIC_KEYS[1:]:
+        metrics[key] = np.where(too_few, np.nan, metrics[key])
+    return metrics
+
+
+def correlation_pvalue(r, n):
+    """Two-sided p-value of Pearson r for n pairs (same test as scipy.stats.pearsonr)"""
+    from scipy import special
+
+    r = np.asarray(r, dtype=np.float64)
+    dof = np.asarray(n, dtype=np.float64) - 2
+    with np.errstate(invalid='ignore', divide='ignore'):
+        t_sq = r * r * dof / (1.0 - r * r)
+        return special.betainc(0.5 * dof, 0.5, dof / (dof + t_sq))
+
+
+def pairs_table(metrics: dict, names: list) -> pd.DataFrame:
+    """Flatten the upper triangle of pairwise_metrics() into one row per pair"""
+    i, j = np.triu_indices(len(names), k=1)
+    names = np.asarray(names, dtype=object)
+    table = pd.DataFrame({"station_a": names[i], "station_b": names[j]})
+    for key in METRIC_KEYS:
+        table[key] = metrics[key][i, j]
+    return table
+
+
+def compare_pair(a, b) -> dict:
+    """Metrics for two aligned 1-D series as scalars (a - b)"""
+    values = np.column_stack([np.asarray(a, dtype=np.float64), np.asarray(b, dtype=np.float64)])
+    metrics = pairwise_metrics(values)
+    result = {key: float(metrics[key][0, 1]) for key in METRIC_KEYS}
+    result["n_observations"] = int(metrics["n_observations"][0, 1])
+    return result
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Streaming Hourly Resampler
+Incremental alternative to resample_to_hourly() for unbounded feeds. Raw
+measurements are consumed as they arrive; per station only the open hour
+buckets (sum, count, min, max) are kept. A bucket is emitted as soon as the
+station's data has moved past its window (plus allowed lateness), so memory
+stays constant no matter how long the stream runs.
+
+Resample a large CSV in chunks:
+    python scripts/stream_resampler.py raw.csv hourly.csv [--station-col station_id]
+                                       [--time-col timestamp_utc] [--value-col value]
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+HOUR_NS = 3600 * 10**9
+
+
+def to_epoch_ns(timestamp) -> int:
+    """Epoch nanoseconds; naive timestamps are UTC, numbers are epoch seconds"""
+    if isinstance(timestamp, (int, float, np.integer, np.floating)):
+        return int(timestamp * 10**9)
+    ts = pd.Timestamp(timestamp)
+    if ts.tzinfo is not None:
+        ts = ts.tz_convert('UTC').tz_localize(None)
+    return ts.value
+
+
+class HourlyResampler:
+    """
+    Per-station tumbling windows over a measurement stream.
+
+    add() / add_batch() return the buckets closed by the new data as dicts
+    {station_id, timestamp_utc, value (mean), count, min, max} plus the
+    station's metadata. Values arriving for an already emitted window are
+    counted in stats['late'] and dropped.
+    """
+
+    def __init__(self, window_ns: int = HOUR_NS, allowed_lateness_ns: int = 0):
+        self.window_ns = window_ns
+        self.allowed_lateness_ns = allowed_lateness_ns
+        self._open = {}       # station_id -> {window_start_ns: [sum, count, min, max]}
+        self._watermark = {}  # station_id -> newest timestamp seen (ns)
+        self._closed = {}     # station_id -> end of the last emitted window (ns)
+        self._meta = {}       # station_id -> metadata of the first record
+        self.stats = {"records": 0, "buckets": 0, "late": 0}
+
+    @property
+    def open_buckets(self) -> int:
+        return sum(len(buckets) for buckets in self._open.values())
+
+    def _emit(self, station_id, window_start: int, bucket: list) -> dict:
+        total, count, vmin, vmax = bucket
+        self.stats["buckets"] += 1
+        row = dict(self._meta.get(station_id, {}))
+        row.update({
+            "station_id": station_id,
+            "timestamp_utc": pd.Timestamp(window_start),
+            "value": total / count,
+            "count": count,
+            "min": vmin,
+            "max": vmax,
+        })
+        return row
+
+    def _close(self, station_id) -> list:
+        """Emit every window of the station that ends before its watermark"""
+        buckets = self._open.get(station_id)
+        if not buckets:
+            return []
+        limit = self._watermark[station_id] - self.allowed_lateness_ns
+        ready = sorted(start for start in buckets if start + self.window_ns <= limit)
+        if not ready:
+            return []
+        self._closed[station_id] = ready[-1] + self.window_ns
+        return [self._emit(station_id, start, buckets.pop(start)) for start in ready]
+
+    def _merge(self, station_id, window_start: int, total: float, count: int, vmin: float, vmax: float):
+        buckets = self._open.setdefault(station_id, {})
+        bucket = buckets.get(window_start)
+        if bucket is None:
+            buckets[window_start] = [total, count, vmin, vmax]
+        else:
+            bucket[0] += total
+            bucket[1] += count
+            bucket[2] = min(bucket[2], vmin)
+            bucket[3] = max(bucket[3], vmax)
+
+    def add(self, station_id, timestamp, value, meta: dict = None) -> list:
+        """Consume one measurement; returns the buckets it closed"""
+        if value is None or value != value:  # None / NaN
+            return []
+        ts = to_epoch_ns(timestamp)
+        self.stats["records"] += 1
+        if meta and station_id not in self._meta:
+            self._meta[station_id] = dict(meta)
+
+        window_start = ts - ts % self.window_ns
+        if window_start < self._closed.get(station_id, window_start):
+            self.stats["late"] += 1
+            return []
+        value = float(value)
+        self._merge(station_id, window_start, value, 1, value, value)
+        if ts > self._watermark.get(station_id, ts - 1):
+            self._watermark[station_id] = ts
+        return self._close(station_id)
+
+    def add_batch(self, station_ids, timestamps, values, meta: dict = None) -> list:
+        """
+        Consume a chunk of measurements at once (vectorized per chunk).
+        meta: optional {station_id: {...}} attached to that station's buckets.
+        """
+        chunk = pd.DataFrame({
+            "station_id": np.asarray(station_ids),
+            "ts": pd.to_datetime(pd.Series(timestamps), utc=True).dt.tz_localize(None)
+                    .to_numpy(dtype="datetime64[ns]").astype("int64"),
+            "value": pd.to_numeric(pd.Series(values), errors="coerce").to_numpy(),
+        }).dropna(subset=["value"])
+        if chunk.empty:
+            return []
+        self.stats["records"] += len(chunk)
+        for station_id, station_meta in (meta or {}).items():
+            self._meta.setdefault(station_id, dict(station_meta))
+
+        chunk["window"] = chunk["ts"] - chunk["ts"] % self.window_ns
+        closed = chunk["station_id"].map(self._closed).fillna(np.iinfo(np.int64).min).astype("int64")
+        late = chunk["window"] < closed
+        self.stats["late"] += int(late.sum())
+        chunk = chunk[~late]
+
+        partial = chunk.groupby(["station_id", "window"], sort=False)["value"].agg(["sum", "count", "min", "max"])
+        for (station_id, window_start), row in zip(partial.index, partial.itertuples(index=False)):
+            self._merge(station_id, int(window_start), row.sum, int(row.count), row.min, row.max)
+
+        emitted = []
+        for station_id, newest in chunk.groupby("station_id", sort=False)["ts"].max().items():
+            if newest > self._watermark.get(station_id, newest - 1):
+                self._watermark[station_id] = int(newest)
+            emitted += self._close(station_id)
+        return emitted
+
+    def flush(self) -> list:
+        """Emit all open buckets (end of stream)"""
+        emitted = []
+        for station_id, buckets in self._open.items():
+            for start in sorted(buckets):
+                emitted.append(self._emit(station_id, start, buckets[start]))
+            if buckets:
+                self._closed[station_id] = max(buckets) + self.window_ns
+            buckets.clear()
+        return emitted
+
+
+def resample_stream(records, window_ns: int = HOUR_NS, allowed_lateness_ns: int = 0):
+    """Generator: (station_id, timestamp, value) tuples in, closed hourly buckets out"""
+    resampler = HourlyResampler(window_ns, allowed_lateness_ns)
+    for station_id, timestamp, value in records:
+        yield from resampler.add(station_id, timestamp, value)
+    yield from resampler.flush()
+
+
+def resample_csv(input_file: str, output_file: str, station_col: str = "station_id",
+                 time_col: str = "timestamp_utc", value_col: str = "value",
+                 chunksize: int = 100_000) -> dict:
+    """Resample a CSV of any size; only one chunk and the open buckets are in memory"""
+    resampler = HourlyResampler()
+    header = True
+    if os.path.exists(output_file):
+        os.remove(output_file)
+
+    def write(rows):
+        nonlocal header
+        if rows:
+            pd.DataFrame(rows).to_csv(output_file, mode="a", header=header, index=False)
+            header = False
+
+    for chunk in pd.read_csv(input_file, usecols=[station_col, time_col, value_col], chunksize=chunksize):
+        write(resampler.add_batch(chunk[station_col], chunk[time_col], chunk[value_col]))
+    write(resampler.flush())
+    return resampler.stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Streaming hourly resampling of a CSV file")
+    parser.add_argument("input")
+    parser.add_argument("output")
+    parser.add_argument("--station-col", default="station_id")
+    parser.add_argument("--time-col", default="timestamp_utc")
+    parser.add_argument("--value-col", default="value")
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    args = parser.parse_args()
+
+    stats = resample_csv(args.input, args.output, args.station_col, args.time_col,
+                         args.value_col, args.chunksize)
+    print(f"✓ {stats['records']} records -> {stats['buckets']} hourly values "
+          f"({stats['late']} late values dropped): {args.output}")
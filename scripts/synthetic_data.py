@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Synthetic Sensor Data
+Generators shared by the demo scripts (activate_all_devices.py, the Egypt
+comparison) and the benchmark harness.
+"""
+
+import random
+
+import numpy as np
+import pandas as pd
+
+from measurement import MeasurementBatch, station
+
+
+def generate_sensor_value(sensor_type, location_name):
+    """Generate realistic sensor values based on type and location"""
+
+    # Base temperatures by location
+    temp_base = {
+        'Hamburg': 5,
+        'Osnabrück': 6,
+        'Tunisia': 18,
+        'Alexandria': 20,
+        'Hurghada': 25
+    }
+
+    base_temp = 15  # default
+    for loc in temp_base:
+        if loc.lower() in location_name.lower():
+            base_temp = temp_base[loc]
+            break
+
+    if sensor_type == 'Temperature':
+        return round(base_temp + random.uniform(-3, 3), 2)
+    elif sensor_type == 'Humidity':
+        return round(random.uniform(40, 80), 2)
+    elif sensor_type == 'Pressure':
+        return round(random.uniform(1010, 1025), 2)
+    elif sensor_type == 'Wind Speed':
+        return round(random.uniform(2, 15), 2)
+    elif sensor_type == 'PM10':
+        return round(random.uniform(10, 30), 2)
+    elif sensor_type == 'PM2.5':
+        return round(random.uniform(5, 15), 2)
+    elif sensor_type == 'NO2':
+        return round(random.uniform(15, 45), 2)
+    elif sensor_type == 'O3':
+        return round(random.uniform(30, 70), 2)
+    elif sensor_type == 'Soil Moisture':
+        return round(random.uniform(20, 60), 2)
+    else:
+        return round(random.uniform(10, 30), 2)
+
+
+def simulate_citizen_science_data(reference_df, bias_mean=1.2, bias_std=0.5, noise_std=0.3, verbose=True):
+    """
+    Simuliert Citizen Science Daten basierend auf Referenzdaten.
+
+    Typische Abweichungen von Low-Cost-Sensoren:
+    - Systematischer Bias: +0.5 bis +2.0°C (Urban Heat Island, Sensorplatzierung)
+    - Zufälliges Rauschen: ±0.3°C (Sensorrauschen)
+    - Gelegentliche Ausfälle: ~5% fehlende Werte
+    """
+    df = reference_df.copy()
+
+    # Systematischer Bias (wärmer in städtischer Umgebung)
+    bias = np.random.normal(bias_mean, bias_std)
+
+    # Zufälliges Rauschen
+    noise = np.random.normal(0, noise_std, len(df))
+
+    # Temperaturabhängiger Bias (stärker bei Hitze)
+    temp_factor = (df['temperature'] - df['temperature'].mean()) * 0.05
+
+    df['temperature'] = df['temperature'] + bias + noise + temp_factor
+
+    # Gelegentliche Ausfälle (~5%)
+    missing_idx = np.random.choice(len(df), size=int(len(df) * 0.05), replace=False)
+    df.loc[df.index[missing_idx], 'temperature'] = np.nan
+
+    if verbose:
+        print(f"\n→ Simuliere Citizen Science Daten...")
+        print(f"  Systematischer Bias: {bias:.2f}°C")
+        print(f"  Rauschen (Std): {noise_std}°C")
+        print(f"  Ausfälle: {len(missing_idx)} ({len(missing_idx)/len(df)*100:.1f}%)")
+
+    return df, bias
+
+
+# =============================================================================
+# GENERATORS FOR BENCHMARKS
+# =============================================================================
+
+SENSOR_UNITS = {
+    'Temperature': '°C',
+    'Humidity': '%',
+    'Pressure': 'hPa',
+    'Wind Speed': 'm/s',
+    'PM10': 'µg/m³',
+    'PM2.5': 'µg/m³',
+    'NO2': 'µg/m³',
+    'O3': 'µg/m³',
+    'Soil Moisture': '%',
+}
+
+STATIONS = ['Hamburg', 'Osnabrück', 'Tunisia', 'Alexandria', 'Hurghada']
+
+
+def reference_series(n: int, start: str = "2025-12-01", freq: str = "5min", seed: int = 42) -> pd.DataFrame:
+    """Reference temperature with a daily cycle: columns timestamp_utc, temperature"""
+    rng = np.random.default_rng(seed)
+    timestamps = pd.date_range(start, periods=n, freq=freq)
+    hours = timestamps.hour.to_numpy() + timestamps.minute.to_numpy() / 60
+    temperature = 8 + 4 * np.sin((hours - 9) / 24 * 2 * np.pi) + rng.normal(0, 0.2, n)
+    return pd.DataFrame({'timestamp_utc': timestamps, 'temperature': temperature})
+
+
+def citizen_science_frame(n: int, seed: int = 42) -> pd.DataFrame:
+    """
+    n raw 5-minute citizen-science readings in the layout of the comparison
+    scripts (timestamp_utc, value, source, station_id, lat, lon, unit)
+    """
+    np.random.seed(seed)
+    df, _ = simulate_citizen_science_data(reference_series(n, seed=seed), verbose=False)
+    return pd.DataFrame({
+        'timestamp_utc': df['timestamp_utc'],
+        'value': df['temperature'],
+        'source': 'OpenSenseMap',
+        'station_id': 'synthetic',
+        'lat': 53.58,
+        'lon': 9.83,
+        'unit': '°C',
+    })
+
+
+def measurement_batch(n: int, seed: int = 42, start: str = "2025-12-01T00:00:00Z") -> MeasurementBatch:
+    """n measurements as the MeasurementBatch complete_data_loader's fetchers return"""
+    random.seed(seed)
+    start_ns = int(pd.Timestamp(start).value)
+    sensor_types = list(SENSOR_UNITS)
+    stations = [station('Synthetic', name, 50.0, 10.0, 'SYNTHETIC') for name in STATIONS]
+    batch = MeasurementBatch()
+    for i in range(n):
+        name = STATIONS[i % len(STATIONS)]
+        sensor_type = sensor_types[(i // len(STATIONS)) % len(sensor_types)]
+        batch.append(stations[i % len(STATIONS)], sensor_type, SENSOR_UNITS[sensor_type],
+                     generate_sensor_value(sensor_type, name), start_ns + (i // 45) * 300_000_000_000)
+    return batch
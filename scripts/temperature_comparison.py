@@ -5,7 +5,6 @@ Zeitraum: 01.12.2025 - 14.12.2025 (14 Tage)
 Sampling: 1h Mittelwert
 """
 
-import requests
 import json
 import pandas as pd
 import numpy as np
@@ -15,8 +14,16 @@ from zipfile import ZipFile
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
 
+from frost_bulk import post_observations, print_summary
+from frost_registry import FrostRegistry
+from http_cache import cached_get
+import http_client
+from station_comparison import compare_pair
+from asof_join import asof_join
+
 # === Konfiguration ===
 FROST_URL = "http://localhost:8091/FROST-Server/v1.1"
+FROST_CHUNK_SIZE = 5000  # Observations pro CreateObservations-Request
 
 # Zeitraum (14 Tage)
 START_DATE = "2025-12-01"
@@ -32,6 +39,10 @@ DWD_STATION_ID = "01975"  # Hamburg-Fuhlsbüttel
 DWD_NAME = "Hamburg-Fuhlsbüttel (DWD)"
 DWD_LAT = 53.6332
 DWD_LON = 9.9881
+DWD_CACHE_MAX_AGE = 6 * 3600  # Sekunden; "akt"-Archiv wird täglich aktualisiert
+
+# Rohdaten-Vergleich: jede OSM-Messung mit dem nächsten DWD-Stundenwert paaren
+RAW_PAIR_TOLERANCE = "30min"
 
 
 def fetch_opensensemap_historical(box_id: str, sensor_id: str, from_date: str, to_date: str) -> pd.DataFrame:
@@ -47,7 +58,7 @@ def fetch_opensensemap_historical(box_id: str, sensor_id: str, from_date: str, t
     }
     
     try:
-        resp = requests.get(url, params=params, timeout=60)
+        resp = http_client.get(url, params=params, timeout=60)
         resp.raise_for_status()
         data = resp.json()
         
@@ -75,7 +86,7 @@ def fetch_opensensemap_historical(box_id: str, sensor_id: str, from_date: str, t
 def get_opensensemap_temp_sensor_id(box_id: str) -> str:
     """Temperatur-Sensor-ID von OpenSenseMap Box abrufen"""
     url = f"https://api.opensensemap.org/boxes/{box_id}"
-    resp = requests.get(url, timeout=30)
+    resp = http_client.get(url, timeout=30)
     data = resp.json()
     
     for sensor in data.get('sensors', []):
@@ -92,10 +103,10 @@ def fetch_dwd_historical(station_id: str, from_date: str, to_date: str) -> pd.Da
     url = f"https://opendata.dwd.de/climate_environment/CDC/observations_germany/climate/hourly/air_temperature/recent/stundenwerte_TU_{station_id}_akt.zip"
     
     try:
-        resp = requests.get(url, timeout=60)
-        resp.raise_for_status()
+        # ZIP wird lokal gecacht und per ETag/Last-Modified revalidiert
+        content = cached_get(url, timeout=60, max_age=DWD_CACHE_MAX_AGE)
         
-        with ZipFile(BytesIO(resp.content)) as z:
+        with ZipFile(BytesIO(content)) as z:
             # Finde die Datendatei
             data_file = [f for f in z.namelist() if f.startswith('produkt_tu_stunde')][0]
             
@@ -169,111 +180,112 @@ def calculate_metrics(df_a: pd.DataFrame, df_b: pd.DataFrame) -> dict:
     if merged.empty:
         return None
     
-    diff = merged['value_osm'] - merged['value_dwd']
+    pair = compare_pair(merged['value_osm'], merged['value_dwd'])
     
     metrics = {
-        'n_observations': len(merged),
+        'n_observations': pair['n_observations'],
         'period_start': merged['timestamp_utc'].min(),
         'period_end': merged['timestamp_utc'].max(),
-        'osm_mean': merged['value_osm'].mean(),
-        'dwd_mean': merged['value_dwd'].mean(),
-        'mae': np.abs(diff).mean(),  # Mean Absolute Error
-        'bias': diff.mean(),  # Systematische Abweichung
-        'rmse': np.sqrt((diff ** 2).mean()),  # Root Mean Square Error
-        'correlation': merged['value_osm'].corr(merged['value_dwd']),  # Korrelation
-        'max_diff': diff.abs().max(),
-        'std_diff': diff.std()
+        'osm_mean': pair['mean_a'],
+        'dwd_mean': pair['mean_b'],
+        'mae': pair['mae'],  # Mean Absolute Error
+        'bias': pair['bias'],  # Systematische Abweichung
+        'rmse': pair['rmse'],  # Root Mean Square Error
+        'correlation': pair['correlation'],  # Korrelation
+        'max_diff': pair['max_diff'],
+        'std_diff': pair['std_diff']
     }
     
     return metrics, merged
 
 
+def calculate_raw_metrics(df_osm_raw: pd.DataFrame, df_dwd_raw: pd.DataFrame,
+                          tolerance: str = RAW_PAIR_TOLERANCE) -> dict:
+    """Vergleichsmetriken in nativer Auflösung (As-of-Join statt Resampling)"""
+    paired = asof_join(df_osm_raw, df_dwd_raw, on='timestamp_utc', tolerance=tolerance,
+                       direction='nearest', suffixes=('_osm', '_dwd'))
+    paired = paired.dropna(subset=['value_osm', 'value_dwd'])
+    if paired.empty:
+        return None
+    return compare_pair(paired['value_osm'], paired['value_dwd'])
+
+
 def create_frost_entities(df_osm: pd.DataFrame, df_dwd: pd.DataFrame):
     """Daten in FROST SensorThings API ablegen"""
     print("\n🔧 Erstelle FROST Entitäten...")
     
+    stations = [
+        (OPENSENSEMAP_NAME, df_osm, OPENSENSEMAP_LAT, OPENSENSEMAP_LON, 'opensensemap'),
+        (DWD_NAME, df_dwd, DWD_LAT, DWD_LON, 'dwd')
+    ]
+    
+    # Vorhandene Entitäten mit einer Abfrage prüfen, nur Fehlendes wird angelegt
+    registry = FrostRegistry(frost_url=FROST_URL)
+    confirmed = registry.sync(thing_names=[name for name, *_ in stations])
+    print(f"✅ Registry: {confirmed} Entitäten bereits vorhanden")
+    
     # ObservedProperty: Temperatur
-    prop_resp = requests.post(f"{FROST_URL}/ObservedProperties", json={
+    prop_id = registry.ensure("ObservedProperties", {
         "name": "Air Temperature (Comparison)",
         "definition": "http://vocab.nerc.ac.uk/collection/P01/current/TEMPPR01/",
         "description": "Lufttemperatur für Quellenvergleich"
     })
     
-    if prop_resp.status_code == 201:
-        prop_id = int(prop_resp.headers["Location"].split("(")[-1].rstrip(")"))
-        print(f"✅ ObservedProperty erstellt (ID: {prop_id})")
-    else:
-        print(f"⚠️  ObservedProperty existiert möglicherweise bereits")
-        prop_id = 1  # Fallback
-    
     # Sensor: Generic Temperature Sensor
-    sensor_resp = requests.post(f"{FROST_URL}/Sensors", json={
+    sensor_id = registry.ensure("Sensors", {
         "name": "Temperature Comparison Sensor",
         "description": "Temperaturmessung für Quellenvergleich",
         "encodingType": "text/html",
         "metadata": "https://example.org/sensor/temp-comparison"
     })
     
-    if sensor_resp.status_code == 201:
-        sensor_id = int(sensor_resp.headers["Location"].split("(")[-1].rstrip(")"))
-        print(f"✅ Sensor erstellt (ID: {sensor_id})")
-    else:
-        sensor_id = 1  # Fallback
+    if prop_id is None or sensor_id is None:
+        print("❌ ObservedProperty/Sensor nicht verfügbar - FROST-Upload übersprungen")
+        return {}
     
     datastreams = {}
+    observations = {}
     
-    # OpenSenseMap Station
-    for name, df, lat, lon, source in [
-        (OPENSENSEMAP_NAME, df_osm, OPENSENSEMAP_LAT, OPENSENSEMAP_LON, 'opensensemap'),
-        (DWD_NAME, df_dwd, DWD_LAT, DWD_LON, 'dwd')
-    ]:
-        # Thing erstellen
-        thing_resp = requests.post(f"{FROST_URL}/Things", json={
+    for name, df, lat, lon, source in stations:
+        # Thing
+        thing_id = registry.ensure("Things", {
             "name": name,
             "description": f"Wetterstation für Temperaturvergleich",
             "properties": {"source": source, "comparison_study": True}
         })
+        if thing_id is None:
+            continue
         
-        if thing_resp.status_code == 201:
-            thing_id = int(thing_resp.headers["Location"].split("(")[-1].rstrip(")"))
-            print(f"✅ Thing erstellt: {name} (ID: {thing_id})")
-            
-            # Location
-            requests.post(f"{FROST_URL}/Things({thing_id})/Locations", json={
-                "name": name,
-                "description": f"Standort {name}",
-                "encodingType": "application/geo+json",
-                "location": {"type": "Point", "coordinates": [lon, lat]}
-            })
-            
-            # Datastream
-            ds_resp = requests.post(f"{FROST_URL}/Datastreams", json={
-                "name": f"Temperature - {source}",
-                "description": f"Temperaturmessung von {name}",
-                "observationType": "http://www.opengis.net/def/observationType/OGC-OM/2.0/OM_Measurement",
-                "unitOfMeasurement": {"name": "degree Celsius", "symbol": "°C", "definition": "http://unitsofmeasure.org/ucum.html#para-30"},
-                "Thing": {"@iot.id": thing_id},
-                "Sensor": {"@iot.id": sensor_id},
-                "ObservedProperty": {"@iot.id": prop_id}
-            })
+        # Location
+        registry.ensure("Locations", {
+            "name": name,
+            "description": f"Standort {name}",
+            "encodingType": "application/geo+json",
+            "location": {"type": "Point", "coordinates": [lon, lat]}
+        }, path=f"Things({thing_id})/Locations")
+        
+        # Datastream
+        ds_id = registry.ensure("Datastreams", {
+            "name": f"Temperature - {source}",
+            "description": f"Temperaturmessung von {name}",
+            "observationType": "http://www.opengis.net/def/observationType/OGC-OM/2.0/OM_Measurement",
+            "unitOfMeasurement": {"name": "degree Celsius", "symbol": "°C", "definition": "http://unitsofmeasure.org/ucum.html#para-30"},
+            "Thing": {"@iot.id": thing_id},
+            "Sensor": {"@iot.id": sensor_id},
+            "ObservedProperty": {"@iot.id": prop_id}
+        })
+        
+        if ds_id is not None:
+            datastreams[source] = ds_id
+            print(f"✅ Datastream: {source} (ID: {ds_id})")
             
-            if ds_resp.status_code == 201:
-                ds_id = int(ds_resp.headers["Location"].split("(")[-1].rstrip(")"))
-                datastreams[source] = ds_id
-                print(f"✅ Datastream erstellt: {source} (ID: {ds_id})")
-                
-                # Observations laden
-                obs_count = 0
-                for _, row in df.iterrows():
-                    obs_resp = requests.post(f"{FROST_URL}/Observations", json={
-                        "phenomenonTime": row['timestamp_utc'].isoformat() + "Z",
-                        "result": round(row['value'], 2),
-                        "Datastream": {"@iot.id": ds_id}
-                    })
-                    if obs_resp.status_code == 201:
-                        obs_count += 1
-                
-                print(f"   📊 {obs_count} Observations geladen")
+            # Observations sammeln (Upload gebündelt via dataArray)
+            observations[ds_id] = list(zip(df['timestamp_utc'].tolist(), df['value'].round(2).tolist()))
+    
+    # Observations laden
+    if observations:
+        result = post_observations(observations, chunk_size=FROST_CHUNK_SIZE, frost_url=FROST_URL)
+        print_summary(result)
     
     return datastreams
 
@@ -536,6 +548,14 @@ def main():
     print(f"   Korrelation (r):   {metrics['correlation']:.3f}")
     print("=" * 50)
     
+    # Rohdaten ohne Resampling: OSM-Einzelmessung vs. nächster DWD-Wert
+    raw_metrics = calculate_raw_metrics(df_osm_raw, df_dwd_raw)
+    if raw_metrics:
+        print(f"   Rohdaten (±{RAW_PAIR_TOLERANCE}): {raw_metrics['n_observations']} Paare, "
+              f"MAE {raw_metrics['mae']:.2f} °C, Bias {raw_metrics['bias']:+.2f} °C, "
+              f"r {raw_metrics['correlation']:.3f}")
+        print("=" * 50)
+    
     # Schritt 6: Visualisierung
     create_visualization(merged, metrics, "temperature_comparison.png")
     
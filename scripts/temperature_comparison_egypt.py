@@ -10,7 +10,6 @@ Variable: Temperatur (°C)
 Sampling: 1h Mittelwert
 """
 
-import requests
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
@@ -19,6 +18,10 @@ from scipy import stats
 import warnings
 warnings.filterwarnings('ignore')
 
+from http_cache import cached_get_json
+from station_comparison import compare_pair, correlation_pvalue
+from synthetic_data import simulate_citizen_science_data
+
 # =============================================================================
 # KONFIGURATION
 # =============================================================================
@@ -35,6 +38,9 @@ END_DATE = "2025-12-14"
 CAIRO_LAT = 30.0444
 CAIRO_LON = 31.2357
 
+# ERA5 ist mit ca. 5 Tagen Verzögerung verfügbar
+ERA5_DELAY_DAYS = 5
+
 # Alternative: Alexandria
 ALEXANDRIA_LAT = 31.2001
 ALEXANDRIA_LON = 29.9187
@@ -93,52 +99,21 @@ def fetch_openmeteo_data(lat, lon, start_date, end_date):
     }
     
     print(f"\n→ Abrufe Open-Meteo ERA5 für {lat}°N, {lon}°E...")
-    response = requests.get(url, params=params)
     
-    if response.status_code == 200:
-        data = response.json()
-        df = pd.DataFrame({
-            'timestamp_utc': pd.to_datetime(data['hourly']['time']),
-            'temperature': data['hourly']['temperature_2m']
-        })
-        print(f"  ✓ {len(df)} Datenpunkte erhalten")
-        return df
-    else:
-        print(f"  ✗ Fehler: {response.status_code}")
+    # Abgeschlossene Zeiträume ändern sich nicht mehr -> ohne Revalidierung aus dem Cache
+    closed_range = pd.to_datetime(end_date) < pd.Timestamp.now() - pd.Timedelta(days=ERA5_DELAY_DAYS)
+    try:
+        data = cached_get_json(url, params=params, timeout=60, immutable=closed_range)
+    except Exception as e:
+        print(f"  ✗ Fehler: {e}")
         return None
-
-def simulate_citizen_science_data(reference_df, bias_mean=1.2, bias_std=0.5, noise_std=0.3):
-    """
-    Simuliert Citizen Science Daten basierend auf Referenzdaten.
-    
-    Typische Abweichungen von Low-Cost-Sensoren:
-    - Systematischer Bias: +0.5 bis +2.0°C (Urban Heat Island, Sensorplatzierung)
-    - Zufälliges Rauschen: ±0.3°C (Sensorrauschen)
-    - Gelegentliche Ausfälle: ~5% fehlende Werte
-    """
-    df = reference_df.copy()
-    
-    # Systematischer Bias (wärmer in städtischer Umgebung)
-    bias = np.random.normal(bias_mean, bias_std)
-    
-    # Zufälliges Rauschen
-    noise = np.random.normal(0, noise_std, len(df))
     
-    # Temperaturabhängiger Bias (stärker bei Hitze)
-    temp_factor = (df['temperature'] - df['temperature'].mean()) * 0.05
-    
-    df['temperature'] = df['temperature'] + bias + noise + temp_factor
-    
-    # Gelegentliche Ausfälle (~5%)
-    missing_idx = np.random.choice(len(df), size=int(len(df) * 0.05), replace=False)
-    df.loc[df.index[missing_idx], 'temperature'] = np.nan
-    
-    print(f"\n→ Simuliere Citizen Science Daten...")
-    print(f"  Systematischer Bias: {bias:.2f}°C")
-    print(f"  Rauschen (Std): {noise_std}°C")
-    print(f"  Ausfälle: {len(missing_idx)} ({len(missing_idx)/len(df)*100:.1f}%)")
-    
-    return df, bias
+    df = pd.DataFrame({
+        'timestamp_utc': pd.to_datetime(data['hourly']['time']),
+        'temperature': data['hourly']['temperature_2m']
+    })
+    print(f"  ✓ {len(df)} Datenpunkte erhalten")
+    return df
 
 # Daten abrufen
 print("\n3.1 Open-Meteo ERA5 (Referenz)")
@@ -302,10 +277,12 @@ print("-" * 40)
 
 diff = merged_clean['osm'] - merged_clean['era5']
 
-mae = np.mean(np.abs(diff))
-bias = np.mean(diff)
-rmse = np.sqrt(np.mean(diff**2))
-correlation, p_value = stats.pearsonr(merged_clean['era5'], merged_clean['osm'])
+pair = compare_pair(merged_clean['osm'], merged_clean['era5'])
+mae = pair['mae']
+bias = pair['bias']
+rmse = pair['rmse']
+correlation = pair['correlation']
+p_value = correlation_pvalue(correlation, pair['n_observations'])
 
 print(f"""
 ┌────────────────────┬────────────┬────────────────────────────────────┐
@@ -8,11 +8,13 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
-from scipy import stats
 from datetime import datetime
 import warnings
 warnings.filterwarnings('ignore')
 
+from columnar_store import read_measurements
+from station_comparison import compare_pair, correlation_pvalue
+
 # =============================================================================
 # KONFIGURATION
 # =============================================================================
@@ -44,13 +46,12 @@ print("SCHRITT 1: Lade Mobilithek Daten...")
 print("-" * 70)
 
 try:
-    df_mobilithek = pd.read_csv('data/historical/mobilithek_dormagen_7days.csv')
-
-    # Filter nur BME280 Sensoren (haben Temperatur)
-    df_mobilithek = df_mobilithek[df_mobilithek['sensor_type'] == 'bme280'].copy()
-
-    # Timestamp parsen
-    df_mobilithek['timestamp'] = pd.to_datetime(df_mobilithek['timestamp'])
+    # Nur BME280 Sensoren (haben Temperatur), nur Zeit und Temperatur lesen
+    df_mobilithek = read_measurements(
+        'sensor_community',
+        columns=['timestamp', 'temperature'],
+        filters=[('sensor_type', '==', 'bme280')]
+    )
 
     # Nur Zeilen mit Temperatur
     df_mobilithek = df_mobilithek[df_mobilithek['temperature'].notna()].copy()
@@ -135,12 +136,14 @@ mob = df_merged['temp_mobilithek'].values
 diff = osm - mob
 
 # Metriken
-mae = np.mean(np.abs(diff))
-rmse = np.sqrt(np.mean(diff**2))
-bias = np.mean(diff)
-correlation, p_value = stats.pearsonr(osm, mob)
-max_diff = np.max(np.abs(diff))
-std_diff = np.std(diff)
+pair = compare_pair(osm, mob)
+mae = pair['mae']
+rmse = pair['rmse']
+bias = pair['bias']
+correlation = pair['correlation']
+p_value = correlation_pvalue(correlation, pair['n_observations'])
+max_diff = pair['max_diff']
+std_diff = np.std(diff)  # Populations-Standardabweichung (ddof=0) wie bisher; pair['std_diff'] nutzt ddof=1
 
 print(f"MAE (Mittlere abs. Abweichung): {mae:.2f} °C")
 print(f"RMSE (Root Mean Square Error): {rmse:.2f} °C")
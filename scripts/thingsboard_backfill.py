@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+ThingsBoard History Backfill
+Loads the CSV exports in data/historical/ into ThingsBoard with their
+original timestamps. Rows are grouped per device into
+[{"ts": epoch_ms, "values": {...}}, ...] arrays, cut into size-bounded
+chunks and sent by a small worker pool (HTTP device API, or the MQTT
+gateway when available).
+
+Progress is checkpointed per source: the checkpoint is the newest
+timestamp up to which every chunk has been acknowledged, so an
+interrupted run resumes where it stopped (re-sent values overwrite the
+same ts/key in ThingsBoard, they are not duplicated).
+
+    python scripts/thingsboard_backfill.py                  # all sources
+    python scripts/thingsboard_backfill.py --source dormagen --workers 8
+    python scripts/thingsboard_backfill.py --reset          # ignore checkpoints
+"""
+
+import argparse
+import csv
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+
+import requests
+
+import http_client
+import instrumentation
+import thingsboard_gateway
+from json_state import load_state, save_state
+
+TB_URL = "http://localhost:8080"
+TB_CREDENTIALS_FILE = "config/thingsboard_credentials.json"
+STATE_FILE = "data/store/tb_backfill_state.json"
+
+DEFAULT_WORKERS = 4
+DEFAULT_CHUNK_BYTES = 60_000
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_RETRY_BACKOFF = 1.0     # seconds, doubled per attempt
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# CSV export -> ThingsBoard device; columns map to the telemetry keys the
+# live loader uses ("<sensor_type>_<unit>", see complete_data_loader.py)
+BACKFILL_SOURCES = {
+    'dormagen': {
+        'file': 'data/historical/mobilithek_dormagen_7days.csv',
+        'device': 'DWD_01975',
+        'timezone': 'UTC',
+        'columns': {
+            'P1': 'PM10_µg_m³',
+            'P2': 'PM2.5_µg_m³',
+            'temperature': 'Temperature_°C',
+            'humidity': 'Humidity_%',
+        },
+    },
+    'egypt': {
+        'file': 'data/historical/openmeteo_egypt_7days.csv',
+        'device': 'Egypt',
+        'timezone': 'Africa/Cairo',
+        'columns': {
+            'temperature_2m': 'Temperature_°C',
+            'relative_humidity_2m': 'Humidity_%',
+            'pressure_msl': 'Pressure_hPa',
+            'wind_speed_10m': 'Wind_Speed_km_h',
+            'wind_direction_10m': 'Wind_Direction_°',
+        },
+    },
+}
+
+
+# =============================================================================
+# RECORDS / CHUNKS
+# =============================================================================
+
+def read_records(config: dict, after_ts: int = None) -> list:
+    """
+    CSV rows -> [{"ts": epoch_ms, "values": {...}}] sorted by ts, rows with the
+    same timestamp merged. Rows at or before after_ts (epoch ms) are skipped.
+    """
+    tz = ZoneInfo(config['timezone'])
+    columns = config['columns']
+    by_ts = {}
+    with open(config['file'], newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            stamp = row.get('timestamp')
+            if not stamp:
+                continue
+            dt = datetime.fromisoformat(stamp.replace('Z', '+00:00'))
+            if dt.tzinfo is None:
+                dt = dt.replace(tzinfo=tz)
+            ts = thingsboard_gateway.to_epoch_ms(dt)
+            if after_ts is not None and ts <= after_ts:
+                continue
+            values = {}
+            for column, key in columns.items():
+                raw = row.get(column)
+                if raw in (None, ''):
+                    continue
+                try:
+                    value = float(raw)
+                except ValueError:
+                    continue
+                if math.isfinite(value):
+                    values[key] = value
+            if values:
+                by_ts.setdefault(ts, {}).update(values)
+    return [{"ts": ts, "values": values} for ts, values in sorted(by_ts.items())]
+
+
+def iter_chunks(records: list, max_bytes: int = DEFAULT_CHUNK_BYTES):
+    """
+    Cut ts-sorted records into JSON arrays of at most max_bytes.
+    Yields (payload, first_ts, last_ts, value_count).
+    """
+    parts, size, n_values = [], 2, 0
+    for record in records:
+        encoded = json.dumps(record, separators=(",", ":"), ensure_ascii=False)
+        needed = len(encoded.encode()) + 1
+        if parts and size + needed > max_bytes:
+            yield "[" + ",".join(parts) + "]", first_ts, last_ts, n_values
+            parts, size, n_values = [], 2, 0
+        if not parts:
+            first_ts = record["ts"]
+        parts.append(encoded)
+        size += needed
+        last_ts = record["ts"]
+        n_values += len(record["values"])
+    if parts:
+        yield "[" + ",".join(parts) + "]", first_ts, last_ts, n_values
+
+
+# =============================================================================
+# TRANSPORTS
+# =============================================================================
+
+class HttpSender:
+    """POST /api/v1/{token}/telemetry with retries on 429/5xx"""
+
+    def __init__(self, tokens: dict, url: str = TB_URL, workers: int = DEFAULT_WORKERS,
+                 max_retries: int = DEFAULT_MAX_RETRIES, retry_backoff: float = DEFAULT_RETRY_BACKOFF,
+                 timeout: int = 30):
+        self.tokens = tokens
+        self.url = url
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.timeout = timeout
+        # Retries stay in send(): the POST is idempotent (same ts/key) but urllib3 only retries GETs
+        self.session = http_client.create_session(retries=0, pool_size=workers, timeout=timeout,
+                                                  headers={"Content-Type": "application/json"})
+
+    def send(self, device: str, payload: str) -> bool:
+        token = self.tokens.get(device)
+        if not token:
+            print(f"   ⚠ No token for {device}")
+            return False
+        url = f"{self.url}/api/v1/{token}/telemetry"
+        body = payload.encode('utf-8')
+        for attempt in range(self.max_retries + 1):
+            try:
+                resp = self.session.post(url, data=body, timeout=self.timeout)
+                if resp.status_code < 300:
+                    return True
+                if resp.status_code not in RETRY_STATUS_CODES:
+                    print(f"   ✗ {device}: HTTP {resp.status_code} {resp.text[:200]}")
+                    return False
+                error = f"HTTP {resp.status_code}"
+            except requests.exceptions.RequestException as e:
+                error = str(e)
+            if attempt < self.max_retries:
+                instrumentation.record_retry('Thingsboard')
+                time.sleep(self.retry_backoff * (2 ** attempt))
+        print(f"   ✗ {device}: failed after {self.max_retries + 1} attempts: {error}")
+        return False
+
+    def close(self):
+        self.session.close()
+
+
+class GatewaySender:
+    """Same chunks over the MQTT gateway connection ({device: records})"""
+
+    def __init__(self, token: str):
+        self.publisher = thingsboard_gateway.get_publisher(token)
+
+    def send(self, device: str, payload: str) -> bool:
+        return self.publisher.send({device: json.loads(payload)})
+
+    def close(self):
+        self.publisher.close()
+
+
+# =============================================================================
+# BACKFILL
+# =============================================================================
+
+def backfill_source(name: str, config: dict, sender, state: dict,
+                    workers: int = DEFAULT_WORKERS, chunk_bytes: int = DEFAULT_CHUNK_BYTES) -> dict:
+    """
+    Send one CSV export; returns {"records", "values", "chunks", "failed", "checkpoint"}.
+    state[name]["last_ts"] is advanced over the leading run of acknowledged chunks.
+    """
+    device = config['device']
+    checkpoint = state.get(name, {}).get('last_ts')
+    records = read_records(config, after_ts=checkpoint)
+    result = {"records": len(records), "values": 0, "chunks": 0, "failed": 0, "checkpoint": checkpoint}
+    if not records:
+        return result
+
+    chunks = list(iter_chunks(records, chunk_bytes))
+    done = [False] * len(chunks)
+    next_pending = 0
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tb-backfill") as executor:
+        futures = {executor.submit(sender.send, device, payload): i
+                   for i, (payload, _, _, _) in enumerate(chunks)}
+        for future in as_completed(futures):
+            i = futures[future]
+            try:
+                ok = future.result()
+            except Exception as e:
+                print(f"   ✗ chunk {i}: {e}")
+                ok = False
+            if not ok:
+                result["failed"] += 1
+                continue
+            done[i] = True
+            result["chunks"] += 1
+            result["values"] += chunks[i][3]
+            if isinstance(sender, HttpSender):
+                instrumentation.record_points('Thingsboard', chunks[i][3])
+
+            # Checkpoint = last ts of the longest prefix of acknowledged chunks
+            advanced = False
+            while next_pending < len(chunks) and done[next_pending]:
+                next_pending += 1
+                advanced = True
+            if advanced:
+                state[name] = {"device": device, "last_ts": chunks[next_pending - 1][2]}
+                save_state(state, STATE_FILE)
+
+    result["checkpoint"] = state.get(name, {}).get('last_ts')
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill data/historical/ CSV exports into ThingsBoard")
+    parser.add_argument('--source', choices=sorted(BACKFILL_SOURCES) + ['all'], default='all')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help='concurrent requests')
+    parser.add_argument('--chunk-bytes', type=int, default=DEFAULT_CHUNK_BYTES, help='max payload per request')
+    parser.add_argument('--transport', choices=['auto', 'http', 'mqtt'], default='auto',
+                        help='auto = MQTT gateway if paho-mqtt and a gateway token are available')
+    parser.add_argument('--reset', action='store_true', help='ignore checkpoints and send everything')
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("THINGSBOARD HISTORY BACKFILL")
+    print("=" * 70)
+
+    try:
+        with open(TB_CREDENTIALS_FILE, 'r') as f:
+            tokens = json.load(f)
+    except FileNotFoundError:
+        print(f"✗ {TB_CREDENTIALS_FILE} not found (run scripts/thingsboard_setup.py first)")
+        sys.exit(1)
+
+    gateway_token = tokens.get(thingsboard_gateway.TB_GATEWAY_DEVICE)
+    use_mqtt = args.transport == 'mqtt' or (
+        args.transport == 'auto' and thingsboard_gateway.HAS_PAHO and bool(gateway_token))
+    if use_mqtt and not (thingsboard_gateway.HAS_PAHO and gateway_token):
+        print("✗ MQTT transport needs paho-mqtt and a gateway token in the credentials file")
+        sys.exit(1)
+    sender = GatewaySender(gateway_token) if use_mqtt else HttpSender(tokens, workers=args.workers)
+    print(f"Transport: {'MQTT gateway' if use_mqtt else 'HTTP'}, {args.workers} workers, "
+          f"chunks <= {args.chunk_bytes} bytes\n")
+
+    instrumentation.instrument_requests()
+    state = {} if args.reset else load_state(STATE_FILE)
+    names = sorted(BACKFILL_SOURCES) if args.source == 'all' else [args.source]
+
+    try:
+        for name in names:
+            config = BACKFILL_SOURCES[name]
+            if not os.path.exists(config['file']):
+                print(f"⚠ {name}: {config['file']} not found, skipped")
+                continue
+            print(f"📤 {name} -> {config['device']}")
+            start = time.perf_counter()
+            result = backfill_source(name, config, sender, state, args.workers, args.chunk_bytes)
+            elapsed = time.perf_counter() - start
+            if not result["records"]:
+                print("   ✓ nothing new since checkpoint")
+                continue
+            print(f"   ✓ {result['records']} timestamps, {result['values']} values in "
+                  f"{result['chunks']} chunk(s), {result['failed']} failed ({elapsed:.2f}s)")
+            if result["checkpoint"]:
+                checkpoint = datetime.fromtimestamp(result["checkpoint"] / 1000, timezone.utc)
+                print(f"   Checkpoint: {checkpoint.isoformat()}")
+    finally:
+        sender.close()
+
+    instrumentation.print_summary()
+
+
+if __name__ == "__main__":
+    main()
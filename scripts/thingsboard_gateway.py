@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+ThingsBoard Gateway Publisher
+Sends telemetry for many devices over one persistent MQTT connection using
+the ThingsBoard Gateway API (topic v1/gateway/telemetry):
+
+    {"DWD_01975": [{"ts": 1733011200000, "values": {"temperature": 4.2}}, ...],
+     "Egypt":     [{"ts": ..., "values": {...}}]}
+
+Devices are addressed by name and authenticated through the gateway
+device's access token, so one connection replaces one HTTP request per
+device and value timestamps are kept. Messages are split to stay below
+ThingsBoard's MQTT payload limit.
+
+Requires paho-mqtt (pip install paho-mqtt); the loaders fall back to the
+HTTP device API when it is missing or no gateway token is configured.
+"""
+
+import atexit
+import json
+import threading
+
+from influx_writer import to_epoch_ns
+import instrumentation
+
+try:
+    import paho.mqtt.client as mqtt
+    HAS_PAHO = True
+except ImportError:
+    HAS_PAHO = False
+
+TB_MQTT_HOST = "localhost"
+TB_MQTT_PORT = 1883
+
+# Name of the gateway device in config/thingsboard_credentials.json
+TB_GATEWAY_DEVICE = "Mikroklima_Gateway"
+
+TELEMETRY_TOPIC = "v1/gateway/telemetry"
+CONNECT_TOPIC = "v1/gateway/connect"
+
+# ThingsBoard's default MQTT max payload is 65536 bytes
+DEFAULT_MAX_PAYLOAD = 64_000
+
+
+def to_epoch_ms(timestamp) -> int:
+    """ISO string, datetime or epoch ns -> epoch milliseconds (naive = UTC)"""
+    return to_epoch_ns(timestamp) // 1_000_000
+
+
+def telemetry_record(timestamp, values: dict) -> dict:
+    return {"ts": to_epoch_ms(timestamp), "values": values}
+
+
+def build_messages(telemetry: dict, max_bytes: int = DEFAULT_MAX_PAYLOAD):
+    """
+    Split {device_name: [{"ts", "values"}, ...]} into JSON payloads of at
+    most max_bytes (a single oversized record is still sent on its own).
+    Yields (payload, record_count, value_count).
+    """
+    parts = {}    # device JSON key -> [encoded records]
+    size = 2      # "{}"
+    n_records = n_values = 0
+
+    def render():
+        return "{" + ",".join(f"{key}:[{','.join(records)}]" for key, records in parts.items()) + "}"
+
+    for device, records in telemetry.items():
+        key = json.dumps(device, ensure_ascii=False)
+        key_size = len(key.encode()) + 4  # key, ":[]" and the separating comma
+        for record in records:
+            encoded = json.dumps(record, separators=(",", ":"), ensure_ascii=False)
+            needed = len(encoded.encode()) + 1 + (0 if key in parts else key_size)
+            if parts and size + needed > max_bytes:
+                yield render(), n_records, n_values
+                parts, size, n_records, n_values = {}, 2, 0, 0
+                needed = len(encoded.encode()) + 1 + key_size
+            parts.setdefault(key, []).append(encoded)
+            size += needed
+            n_records += 1
+            n_values += len(record.get("values", {}))
+    if parts:
+        yield render(), n_records, n_values
+
+
+class GatewayPublisher:
+    """One persistent MQTT connection authenticated with the gateway token"""
+
+    def __init__(self, token: str, host: str = TB_MQTT_HOST, port: int = TB_MQTT_PORT,
+                 qos: int = 1, max_payload: int = DEFAULT_MAX_PAYLOAD,
+                 keepalive: int = 60, timeout: float = 10.0):
+        if not HAS_PAHO:
+            raise RuntimeError("paho-mqtt is not installed (pip install paho-mqtt)")
+        self.host = host
+        self.port = port
+        self.qos = qos
+        self.max_payload = max_payload
+        self.keepalive = keepalive
+        self.timeout = timeout
+        self.stats = {"messages": 0, "records": 0, "bytes": 0, "failed": 0}
+
+        try:
+            # paho-mqtt >= 2.0
+            self.client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
+        except AttributeError:
+            self.client = mqtt.Client()
+        self.client.username_pw_set(token)
+        self.client.on_connect = self._on_connect
+        self._connected = threading.Event()
+        self._lock = threading.Lock()
+        self._started = False
+
+    def _on_connect(self, client, userdata, flags, rc, properties=None):
+        if rc == 0:
+            self._connected.set()
+        else:
+            print(f"   ThingsBoard MQTT connect refused: {rc}")
+
+    def connect(self) -> bool:
+        """Open the connection (network loop runs in a background thread)"""
+        with self._lock:
+            if not self._started:
+                try:
+                    self.client.connect(self.host, self.port, keepalive=self.keepalive)
+                except OSError as e:
+                    print(f"   ThingsBoard MQTT: cannot connect to {self.host}:{self.port}: {e}")
+                    return False
+                self.client.loop_start()
+                self._started = True
+        return self._connected.wait(self.timeout)
+
+    def _publish(self, topic: str, payload: str) -> bool:
+        data = payload.encode("utf-8")
+        info = self.client.publish(topic, data, qos=self.qos)
+        try:
+            if self.qos:
+                info.wait_for_publish(self.timeout)
+            ok = info.rc == mqtt.MQTT_ERR_SUCCESS and (not self.qos or info.is_published())
+        except (RuntimeError, ValueError):
+            # Message dropped because the client is disconnected / queue full
+            ok = False
+        instrumentation.count("mqtt_messages_total", host=f"{self.host}:{self.port}", topic=topic,
+                              status="ok" if ok else "error")
+        instrumentation.count("mqtt_sent_bytes_total", len(data), host=f"{self.host}:{self.port}")
+        return ok
+
+    def connect_devices(self, device_names, device_type: str = "default"):
+        """Announce devices so ThingsBoard creates missing ones with the given type"""
+        if not self.connect():
+            return False
+        return all(self._publish(CONNECT_TOPIC, json.dumps({"device": name, "type": device_type}))
+                   for name in device_names)
+
+    def send(self, telemetry: dict) -> bool:
+        """
+        Publish {device_name: [{"ts": epoch_ms, "values": {...}}, ...]}.
+        Returns False if the connection failed or any message was not acknowledged.
+        """
+        if not self.connect():
+            print(f"   ThingsBoard MQTT: no connection to {self.host}:{self.port}")
+            return False
+        ok = True
+        for payload, n_records, n_values in build_messages(telemetry, self.max_payload):
+            if self._publish(TELEMETRY_TOPIC, payload):
+                self.stats["messages"] += 1
+                self.stats["records"] += n_records
+                self.stats["bytes"] += len(payload.encode("utf-8"))
+                instrumentation.record_points("Thingsboard", n_values)
+            else:
+                self.stats["failed"] += n_records
+                ok = False
+        return ok
+
+    def close(self):
+        with self._lock:
+            if self._started:
+                self.client.loop_stop()
+                self.client.disconnect()
+                self._started = False
+                self._connected.clear()
+
+
+_publisher = None
+_publisher_lock = threading.Lock()
+
+
+def get_publisher(token: str, **kwargs) -> GatewayPublisher:
+    """Return the process-wide publisher (created on first use, closed at exit)"""
+    global _publisher
+    with _publisher_lock:
+        if _publisher is None:
+            _publisher = GatewayPublisher(token, **kwargs)
+            atexit.register(_publisher.close)
+        return _publisher
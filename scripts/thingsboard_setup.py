@@ -1,18 +1,38 @@
 #!/usr/bin/env python3
 """
 Thingsboard Device Setup Script
-Creates devices and access tokens for the Mikroklima Hamburg project
+Creates devices and access tokens for the Mikroklima Hamburg project.
+
+Provisioning is a diff: one paged tenant-devices query lists what exists,
+only missing devices are created (concurrently), and the access tokens of
+all desired devices are fetched in parallel and merged into the
+credentials file. Re-running is safe and only creates what is missing.
+
+    python scripts/thingsboard_setup.py
+    # plus one device per sensor.community sensor around Dormagen (lat,lon,radius km)
+    python scripts/thingsboard_setup.py --sensor-community-area 51.0946,6.8407,5
 """
 
-import requests
+import argparse
 import json
+import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import http_client
 
 # Thingsboard configuration
 TB_HOST = "http://localhost:8080"
 TB_USERNAME = "tenant@thingsboard.org"
 TB_PASSWORD = "tenant"
 
+# Read by complete_data_loader.py / activate_all_devices.py
+CREDENTIALS_FILE = "config/thingsboard_credentials.json"
+
+PAGE_SIZE = 1000        # devices per tenant-devices page
+DEFAULT_WORKERS = 16    # concurrent create / credential requests
+REQUEST_TIMEOUT = 15
+
 # Device definitions
 DEVICES = [
     {
@@ -44,6 +64,13 @@ DEVICES = [
         "name": "Egypt",
         "label": "Egypt Weather Station",
         "type": "weather_station"
+    },
+    {
+        # MQTT gateway (v1/gateway/telemetry) used by the loaders when paho-mqtt is installed
+        "name": "Mikroklima_Gateway",
+        "label": "Mikroklima MQTT Gateway",
+        "type": "gateway",
+        "additionalInfo": {"gateway": True}
     }
 ]
 
@@ -59,7 +86,7 @@ def get_auth_token():
     }
     
     try:
-        response = requests.post(url, json=payload)
+        response = http_client.post(url, json=payload, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
         token = response.json()["token"]
         print("✓ Authentication successful")
@@ -69,83 +96,168 @@ def get_auth_token():
         sys.exit(1)
 
 
-def create_device(token, device_info):
-    """Create a device in Thingsboard"""
-    url = f"{TB_HOST}/api/device"
-    headers = {
+def make_session(token, workers=DEFAULT_WORKERS):
+    """Authenticated session whose pool fits the worker count (keep-alive per worker)"""
+    return http_client.create_session(pool_size=workers, timeout=REQUEST_TIMEOUT, headers={
         "Content-Type": "application/json",
         "X-Authorization": f"Bearer {token}"
-    }
-    
+    })
+
+
+def fetch_existing_devices(session, host=TB_HOST):
+    """All tenant devices as {name: device}, one paged query"""
+    devices = {}
+    page = 0
+    while True:
+        response = session.get(f"{host}/api/tenant/devices",
+                               params={"pageSize": PAGE_SIZE, "page": page, "sortProperty": "name"},
+                               timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        data = response.json()
+        for device in data.get("data", []):
+            devices[device["name"]] = device
+        if not data.get("hasNext"):
+            return devices
+        page += 1
+
+
+def lookup_device(session, name):
+    """Existing device by exact name (used after a create conflict)"""
+    response = session.get(f"{TB_HOST}/api/tenant/devices", params={"deviceName": name},
+                           timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    data = response.json()
+    # Single Device object; tolerate a page ({"data": [...]}) as well
+    if "data" in data:
+        return next((d for d in data["data"] if d.get("name") == name), None)
+    return data if data.get("id") else None
+
+
+def create_device(session, device_info):
+    """Create a device in Thingsboard; returns the device (existing one on conflict) or None"""
     payload = {
         "name": device_info["name"],
         "label": device_info["label"],
         "type": device_info["type"]
     }
+    if "additionalInfo" in device_info:
+        payload["additionalInfo"] = device_info["additionalInfo"]
     
     try:
-        response = requests.post(url, headers=headers, json=payload)
+        response = session.post(f"{TB_HOST}/api/device", json=payload, timeout=REQUEST_TIMEOUT)
+        if response.status_code in (400, 409) and "exist" in response.text.lower():
+            # Created concurrently by someone else since the diff
+            return lookup_device(session, device_info["name"])
         response.raise_for_status()
-        device = response.json()
-        print(f"✓ Created device: {device_info['label']}")
-        return device
-    except requests.exceptions.HTTPError as e:
-        if e.response.status_code == 409:
-            print(f"⚠ Device already exists: {device_info['label']}")
-            # Get existing device
-            search_url = f"{TB_HOST}/api/tenant/devices?deviceName={device_info['name']}"
-            response = requests.get(search_url, headers=headers)
-            return response.json()
-        else:
-            print(f"✗ Failed to create device {device_info['label']}: {e}")
-            return None
-
-
-def get_device_credentials(token, device_id):
+        return response.json()
+    except Exception as e:
+        print(f"✗ Failed to create device {device_info['label']}: {e}")
+        return None
+
+
+def get_device_credentials(session, device_id):
     """Get device access token"""
-    url = f"{TB_HOST}/api/device/{device_id}/credentials"
-    headers = {
-        "X-Authorization": f"Bearer {token}"
-    }
-    
     try:
-        response = requests.get(url, headers=headers)
+        response = session.get(f"{TB_HOST}/api/device/{device_id}/credentials", timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
-        credentials = response.json()
-        return credentials.get("credentialsId")
+        return response.json().get("credentialsId")
     except Exception as e:
-        print(f"✗ Failed to get credentials: {e}")
+        print(f"✗ Failed to get credentials for {device_id}: {e}")
         return None
 
 
+def sensor_community_devices(area):
+    """One device definition per sensor.community sensor in 'lat,lon,radius_km'"""
+    from archive_downloader import find_area_sensors
+    lat, lon, radius = (float(x) for x in area.split(","))
+    sensor_ids = find_area_sensors(lat, lon, radius)
+    return [
+        {
+            "name": f"SensorCommunity_{sensor_id}",
+            "label": f"sensor.community Sensor {sensor_id}",
+            "type": "air_quality"
+        }
+        for sensor_id in sorted(sensor_ids)
+    ]
+
+
+def provision(session, desired, workers=DEFAULT_WORKERS):
+    """
+    Make sure every desired device exists.
+
+    Returns (credentials_map, stats): {name: access_token} and counts of
+    existing, created and failed devices.
+    """
+    existing = fetch_existing_devices(session)
+    missing = [d for d in desired if d["name"] not in existing]
+    stats = {"existing": len(desired) - len(missing), "created": 0, "failed": 0}
+    print(f"   {len(existing)} devices in tenant, {stats['existing']} of {len(desired)} desired already exist")
+    
+    devices = {d["name"]: existing[d["name"]] for d in desired if d["name"] in existing}
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tb-setup") as executor:
+        if missing:
+            print(f"\n📱 Creating {len(missing)} devices ({workers} parallel)...\n")
+            for device_info, device in zip(missing, executor.map(lambda d: create_device(session, d), missing)):
+                if device:
+                    devices[device_info["name"]] = device
+                    stats["created"] += 1
+                    print(f"✓ Created device: {device_info['label']}")
+                else:
+                    stats["failed"] += 1
+        
+        print(f"\n🔑 Fetching {len(devices)} access tokens...")
+        names = list(devices)
+        tokens = executor.map(lambda name: get_device_credentials(session, devices[name]["id"]["id"]), names)
+        credentials_map = {name: token for name, token in zip(names, tokens) if token}
+    
+    return credentials_map, stats
+
+
+def save_credentials(credentials_map, path=CREDENTIALS_FILE):
+    """Merge into the credentials file (tokens of other devices are kept)"""
+    try:
+        with open(path, 'r') as f:
+            merged = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        merged = {}
+    merged.update(credentials_map)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(merged, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+    return merged
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Provision Thingsboard devices and access tokens")
+    parser.add_argument('--sensor-community-area', metavar='LAT,LON,RADIUS_KM',
+                        help='also provision one device per sensor.community sensor in this area')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help='concurrent create / credential requests')
+    args = parser.parse_args()
+    
     print("\n" + "="*70)
     print("THINGSBOARD DEVICE SETUP")
     print("Mikroklima Hamburg Project")
     print("="*70 + "\n")
     
+    desired = list(DEVICES)
+    if args.sensor_community_area:
+        area_devices = sensor_community_devices(args.sensor_community_area)
+        print(f"📡 {len(area_devices)} sensor.community sensors in area {args.sensor_community_area}")
+        desired.extend(area_devices)
+    
     # Authenticate
     token = get_auth_token()
+    session = make_session(token, args.workers)
     
-    # Create devices and collect credentials
-    credentials_map = {}
-    
-    print("\n📱 Creating devices...\n")
-    for device_info in DEVICES:
-        device = create_device(token, device_info)
-        if device:
-            device_id = device["id"]["id"]
-            access_token = get_device_credentials(token, device_id)
-            if access_token:
-                credentials_map[device_info["name"]] = access_token
-                print(f"   Token: {access_token[:20]}...")
-    
-    # Save credentials to file
-    credentials_file = "thingsboard_credentials.json"
-    with open(credentials_file, 'w') as f:
-        json.dump(credentials_map, f, indent=2)
+    print("\n🔍 Comparing desired devices with tenant...")
+    credentials_map, stats = provision(session, desired, args.workers)
+    merged = save_credentials(credentials_map)
     
-    print(f"\n✓ Credentials saved to {credentials_file}")
+    print(f"\n✓ {stats['created']} created, {stats['existing']} already existed, {stats['failed']} failed")
+    print(f"✓ {len(credentials_map)} tokens saved to {CREDENTIALS_FILE} ({len(merged)} total)")
     print("\n" + "="*70)
     print("✓ Setup complete!")
     print("="*70)
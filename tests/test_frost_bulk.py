@@ -0,0 +1,23 @@
+"""frost_bulk.iter_chunks: chunk boundaries and invalid chunk sizes"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+from frost_bulk import iter_chunks
+
+
+def test_iter_chunks_splits_across_datastreams():
+    observations = {1: [("t", v) for v in range(3)], 2: [("t", v) for v in range(4)]}
+    chunks = [[(ds_id, start, len(rows)) for ds_id, start, rows in chunk]
+              for chunk in iter_chunks(observations, 3)]
+    assert chunks == [[(1, 0, 3)], [(2, 0, 3)], [(2, 3, 1)]]
+
+
+@pytest.mark.parametrize("chunk_size", [0, -5])
+def test_iter_chunks_rejects_non_positive_size(chunk_size):
+    with pytest.raises(ValueError):
+        list(iter_chunks({1: [("t", 1.0)]}, chunk_size))
@@ -0,0 +1,111 @@
+"""One loader cycle where some sources return nothing or fail"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'scripts'))
+
+import complete_data_loader as loader
+from cycle_engine import run_cycle
+from measurement import MeasurementBatch, station
+from online_metrics import LiveComparison, PartialStore
+
+# 2026-01-10T12:00:00Z
+TS_NS = 1_768_046_400_000_000_000
+TS_MS = TS_NS // 1_000_000
+
+
+def _batch():
+    batch = MeasurementBatch()
+    batch.append(station('Test', 'Box 1', 53.55, 9.99), 'Temperature', '°C', 4.2, '2026-01-10T12:00:00Z')
+    return batch
+
+
+def _failing():
+    raise ConnectionError("no network")
+
+
+class FakeSource:
+    def __init__(self, fetch, timeout=5):
+        self.fetch_latest = fetch
+        self.timeout = timeout
+
+
+class FakeWriter:
+    stats = {'points_flushed': 0, 'points_failed': 0, 'retries': 0}
+
+    def write(self, *args, **kwargs):
+        pass
+
+    def flush(self):
+        pass
+
+
+def test_run_cycle_reports_empty_and_failed_sources():
+    cycle = run_cycle({'ok': (_batch, 5), 'empty': (MeasurementBatch, 5), 'broken': (_failing, 5)},
+                      {'Sink': lambda source, data: True})
+    reports = cycle['sources']
+    assert reports['ok']['status'] == 'ok'
+    assert len(reports['ok']['measurements']) == 1
+    assert reports['ok']['pushes']['Sink']['status'] == 'ok'
+    assert reports['empty']['status'] == 'empty'
+    assert reports['broken']['status'].startswith('error')
+    assert not reports['empty']['pushes'] and not reports['broken']['pushes']
+
+
+def test_load_data_cycle_with_empty_and_failing_source(monkeypatch, capsys):
+    monkeypatch.setattr(loader, 'SOURCES', {
+        'ok': FakeSource(_batch),
+        'empty': FakeSource(MeasurementBatch),
+        'broken': FakeSource(_failing),
+    })
+    monkeypatch.setattr(loader, 'PUSHERS', {'Sink': lambda source, data: True})
+    monkeypatch.setattr(loader, 'plausibility_filter', None)
+    monkeypatch.setattr(loader, 'get_influx_writer', FakeWriter)
+
+    loader.load_data_cycle()
+
+    assert "Cycle complete - 1 total measurements" in capsys.readouterr().out
+
+
+def _hourly_batch(source, values):
+    """One Temperature reading per hour, 10 minutes past, starting 12:10 UTC"""
+    batch = MeasurementBatch()
+    st = station(source, f'{source} Box', 53.55, 9.99)
+    for hour, value in enumerate(values):
+        batch.append(st, 'Temperature', '°C', value, TS_NS + (hour * 60 + 10) * 60 * 1_000_000_000)
+    return batch
+
+
+def test_influx_lines_use_epoch_ns():
+    lines = loader.influx_lines(_batch())
+    assert len(lines) == 1
+    assert lines[0].startswith('environment,')
+    assert lines[0].endswith(f' {TS_NS}')
+
+
+def test_tb_telemetry_records_use_epoch_ms():
+    records = loader.tb_telemetry_records(_batch())
+    assert records == [{"ts": TS_MS, "values": {"Temperature_°C": 4.2}}]
+
+
+def test_run_source_job_feeds_live_comparison(monkeypatch, tmp_path):
+    source_a, source_b = loader.COMPARISON_PAIRS[0]
+    monkeypatch.setattr(loader, 'SOURCES', {
+        source_a: FakeSource(lambda: _hourly_batch(source_a, [4.0, 5.0])),
+        source_b: FakeSource(lambda: _hourly_batch(source_b, [3.0, 4.5])),
+    })
+    monkeypatch.setattr(loader, 'PUSHERS', {'Sink': lambda source, data: True})
+    monkeypatch.setattr(loader, 'plausibility_filter', None)
+    live = LiveComparison(loader.COMPARISON_PAIRS, PartialStore(str(tmp_path / 'partials.json')))
+
+    loader.run_source_job(source_a, live)
+    loader.run_source_job(source_b, live)
+
+    # The 13:10 readings close the 12:00 hour of both stations
+    metrics = live.metrics()[f"{source_a} vs {source_b}"]
+    assert metrics["n_observations"] == 1
+    assert metrics["bias"] == 1.0
+    assert list(live.store.partials[f"{source_a} vs {source_b}"]) == ["2026-01-10"]